@@ -0,0 +1,188 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import weakref
+from queue import Queue, Empty
+from cosmic_codec import DEFAULT_CODEC
+
+# [정보] 이 모듈은 v10 샤드 DB(cosmic_<cluster>.db)를 이벤트 루프 안에서 안전하게 쓰기 위한 비동기 파사드입니다.
+# 블로킹 sqlite3 호출은 클러스터 전용 스레드에서만 실행되어 루프가 멈추지 않습니다!
+
+_STOP = object()
+
+
+def _resolve(future, result=None, error=None):
+    """다른 스레드에서 넘어온 결과를 루프 위의 Future에 반영 (취소된 요청은 무시)"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _notify(loop, future, result=None, error=None):
+    try:
+        loop.call_soon_threadsafe(_resolve, future, result, error)
+    except RuntimeError:
+        pass  # 요청한 이벤트 루프가 이미 닫힘
+
+
+class AsyncShardedOverlord:
+    """
+    Cosmic OS v10.1.0: Async Sharded Storage Facade
+    - Dedicated Writer per Shard (Write Lock Contention Defense)
+    - Reader Thread Pool per Shard (Loop Stall Defense)
+    - Write Coalescing (Commit Latency Defense)
+    - Bounded Shard Queues (Backpressure)
+    """
+    def __init__(self, clusters=None, readers_per_cluster=2, max_pending=1000, batch_size=500,
+                 codec=DEFAULT_CODEC):
+        self.codec = codec
+        self.clusters = clusters if clusters else ["Solar", "Andromeda", "Virgo"]
+        self.readers_per_cluster = readers_per_cluster
+        self.max_pending = max_pending  # 샤드당 동시에 대기할 수 있는 요청 수
+        self.batch_size = batch_size
+
+        self.write_queues = {c: Queue() for c in self.clusters}
+        self.read_queues = {c: Queue() for c in self.clusters}
+        # 루프 -> {샤드: Semaphore}: asyncio 기본 객체는 처음 쓴 루프에 묶이므로 루프마다 따로 만듦
+        self._write_slots = weakref.WeakKeyDictionary()
+        self._read_slots = weakref.WeakKeyDictionary()
+        self.threads = []
+        self.closed = False
+        self._close_lock = threading.Lock()  # close와 enqueue의 순서 보장 (종료 표식 뒤에 요청이 끼지 않도록)
+        self._init_shards()
+
+        for cluster in self.clusters:
+            self._spawn(self._writer_worker, cluster)
+            for _ in range(self.readers_per_cluster):
+                self._spawn(self._reader_worker, cluster)
+
+    def _init_shards(self):
+        for cluster in self.clusters:
+            with sqlite3.connect(self._db_name(cluster)) as conn:
+                # 저널 모드는 건드리지 않음: 샤드 파일은 v10/v11과 공유되며, v11의 ATTACH 이주는
+                # 롤백 저널일 때만 여러 파일에 걸쳐 원자적으로 커밋됨
+                conn.execute('CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON storage(timestamp)')
+
+    def _db_name(self, cluster):
+        return f"cosmic_{cluster}.db"
+
+    def _spawn(self, target, cluster):
+        thread = threading.Thread(target=target, args=(cluster,), daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _slots(self, table, cluster):
+        """현재 루프의 샤드별 대기열 슬롯 (max_pending은 루프마다 적용)"""
+        per_loop = table.setdefault(asyncio.get_running_loop(), {})
+        if cluster not in per_loop:
+            per_loop[cluster] = asyncio.Semaphore(self.max_pending)
+        return per_loop[cluster]
+
+    def _enqueue(self, queue, item):
+        with self._close_lock:
+            if self.closed:
+                raise RuntimeError("Async Sharded Overlord is closed")
+            queue.put(item)
+
+    def _writer_worker(self, cluster):
+        """대기 중인 쓰기를 batch_size까지 모아 하나의 트랜잭션으로 커밋"""
+        conn = sqlite3.connect(self._db_name(cluster), timeout=30)
+        queue = self.write_queues[cluster]
+        running = True
+        while running:
+            batch = [queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(queue.get_nowait())
+                except Empty:
+                    break
+            if batch[-1] is _STOP:
+                batch.pop()
+                running = False
+
+            if not batch:
+                continue
+            now = time.time()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)",
+                                     [(key, self.codec.encode(payload), now) for key, payload, _, _ in batch])
+            except Exception as e:
+                for _, _, loop, future in batch:
+                    _notify(loop, future, None, e)
+            else:
+                result = f"✅ SUCCESS: Sharded in {cluster}"
+                for _, _, loop, future in batch:
+                    _notify(loop, future, result)
+        conn.close()
+
+    def _reader_worker(self, cluster):
+        conn = sqlite3.connect(self._db_name(cluster), timeout=30)
+        queue = self.read_queues[cluster]
+        while True:
+            item = queue.get()
+            if item is _STOP:
+                break
+            key, loop, future = item
+            try:
+                row = conn.execute("SELECT payload FROM storage WHERE key=?", (key,)).fetchone()
+            except Exception as e:
+                _notify(loop, future, None, e)
+            else:
+                _notify(loop, future, self.codec.decode(row[0]) if row else None)
+        conn.close()
+
+    async def put(self, cluster_id, memory_key, payload):
+        """비동기 분산 저장: 해당 샤드의 배치가 커밋되면 완료"""
+        if cluster_id not in self.clusters:
+            return "❌ FAIL: Unknown Cluster Sector"
+        async with self._slots(self._write_slots, cluster_id):  # 큐가 가득 차면 여기서 대기
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._enqueue(self.write_queues[cluster_id], (memory_key, payload, loop, future))
+            return await future
+
+    async def get(self, cluster_id, memory_key):
+        """비동기 단건 조회 (없으면 None)"""
+        if cluster_id not in self.clusters:
+            return None
+        async with self._slots(self._read_slots, cluster_id):
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._enqueue(self.read_queues[cluster_id], (memory_key, loop, future))
+            return await future
+
+    def pending(self):
+        """샤드별 대기열 깊이 (모니터링용)"""
+        return {c: {"writes": self.write_queues[c].qsize(), "reads": self.read_queues[c].qsize()}
+                for c in self.clusters}
+
+    async def close(self):
+        """남은 쓰기를 모두 커밋한 뒤 워커 스레드 종료 (이후 put/get은 RuntimeError)"""
+        with self._close_lock:
+            if self.closed:
+                return
+            self.closed = True
+            for cluster in self.clusters:
+                self.write_queues[cluster].put(_STOP)
+                for _ in range(self.readers_per_cluster):
+                    self.read_queues[cluster].put(_STOP)
+        await asyncio.to_thread(lambda: [t.join() for t in self.threads])
+
+# --- 비동기 저장소 가동 시뮬레이션 ---
+if __name__ == "__main__":
+    async def main():
+        overlord = AsyncShardedOverlord()
+        results = await asyncio.gather(*[
+            overlord.put(overlord.clusters[i % 3], f"EGO_{i}", f"Data_{i}") for i in range(1000)
+        ])
+        print(f"🌌 [v10.1.0] {len(results)} async writes committed. Sample: {results[0]}")
+        print(f"📡 EGO_42 -> {await overlord.get(overlord.clusters[0], 'EGO_42')}")
+        await overlord.close()
+
+    asyncio.run(main())
@@ -0,0 +1,293 @@
+import ast
+import lzma
+import sqlite3
+import struct
+import zlib
+
+# [정보] 이 모듈은 모든 오버로드가 공유하는 페이로드 코덱입니다.
+# str(payload) 대신 타입을 보존하는 BLOB으로 기록하고, 큰 페이로드는 자동 압축합니다!
+
+FORMAT_VERSION = 2
+
+# 헤더 2바이트: [포맷 버전][상위 4비트 압축 방식 | 하위 4비트 타입]
+TYPE_BYTES = 0x0      # bytes 그대로 통과
+TYPE_TEXT = 0x1       # str (UTF-8)
+TYPE_STRUCT = 0x2     # dict/list/숫자 등 태그 이진 인코딩
+TYPE_REPR = 0x3       # 인코딩 불가 객체의 str() (레거시 동작 보존, 지원 타입의 하위 클래스는 제외)
+
+COMPRESS_NONE = 0x0
+COMPRESS_ZLIB = 0x1
+COMPRESS_LZMA = 0x2
+
+# 구조체 포맷: [1바이트 태그][본문] — 허용된 타입만 표현하는 고정 명세 (빅 엔디언)
+_U32 = struct.Struct("!I")
+_F64 = struct.Struct("!d")
+MAX_STRUCT_DEPTH = 256
+
+
+class CodecError(ValueError):
+    pass
+
+
+class CodecTypeError(CodecError):
+    """지원 타입의 하위 클래스(OrderedDict 등): 텍스트로 바꾸면 타입이 조용히 바뀌므로 거부"""
+
+
+def _pack_struct(value, out, depth=0):
+    """허용 타입(None/bool/int/float/complex/str/bytes/list/tuple/set/frozenset/dict)만 기록"""
+    kind = type(value)
+    if kind is str:
+        body = value.encode("utf-8", "surrogatepass")
+        out += b"s" + _U32.pack(len(body))
+        out += body
+    elif kind is int:
+        body = value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True)
+        out += b"i" + _U32.pack(len(body))
+        out += body
+    elif kind is float:
+        out += b"d" + _F64.pack(value)
+    elif value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif kind is dict:
+        if depth >= MAX_STRUCT_DEPTH:
+            raise CodecError("structure nested too deeply")
+        out += b"m" + _U32.pack(len(value))
+        for key, item in value.items():
+            _pack_struct(key, out, depth + 1)
+            _pack_struct(item, out, depth + 1)
+    elif kind in _SEQUENCE_TAGS:
+        if depth >= MAX_STRUCT_DEPTH:
+            raise CodecError("structure nested too deeply")
+        out += _SEQUENCE_TAGS[kind] + _U32.pack(len(value))
+        for item in value:
+            _pack_struct(item, out, depth + 1)
+    elif kind in (bytes, bytearray):
+        out += b"b" + _U32.pack(len(value))
+        out += value
+    elif kind is complex:
+        out += b"c" + _F64.pack(value.real) + _F64.pack(value.imag)
+    elif isinstance(value, _STRUCT_BASES):
+        raise CodecTypeError(f"subclass of a supported type in structure: {kind.__name__}")
+    else:
+        raise CodecError(f"unsupported type in structure: {kind.__name__}")
+
+
+def _unpack_struct(buf, pos=0, depth=0):
+    """Returns: (값, 다음 위치) — 알 수 없는 태그나 잘린 입력은 CodecError"""
+    try:
+        tag = buf[pos]
+    except IndexError:
+        raise CodecError("truncated structure") from None
+    pos += 1
+    if tag == 0x4E:  # N
+        return None, pos
+    if tag == 0x54:  # T
+        return True, pos
+    if tag == 0x46:  # F
+        return False, pos
+    try:
+        if tag == 0x64:  # d
+            return _F64.unpack_from(buf, pos)[0], pos + 8
+        if tag == 0x63:  # c
+            real, imag = _F64.unpack_from(buf, pos)[0], _F64.unpack_from(buf, pos + 8)[0]
+            return complex(real, imag), pos + 16
+        (size,) = _U32.unpack_from(buf, pos)
+    except struct.error:
+        raise CodecError("truncated structure") from None
+    pos += 4
+    if tag in _SCALAR_TAGS:
+        end = pos + size
+        if end > len(buf):
+            raise CodecError("truncated structure")
+        raw = buf[pos:end]
+        if tag == 0x73:  # s
+            return raw.decode("utf-8", "surrogatepass"), end
+        if tag == 0x69:  # i
+            return int.from_bytes(raw, "big", signed=True), end
+        return raw, end  # b
+    if tag not in _CONTAINER_TAGS:
+        raise CodecError(f"unknown structure tag: {tag:#x}")
+    if depth >= MAX_STRUCT_DEPTH:
+        raise CodecError("structure nested too deeply")
+    if size > len(buf) - pos:
+        raise CodecError("truncated structure")  # 항목마다 최소 1바이트
+    if tag == 0x6D:  # m
+        result = {}
+        for _ in range(size):
+            key, pos = _unpack_struct(buf, pos, depth + 1)
+            item, pos = _unpack_struct(buf, pos, depth + 1)
+            try:
+                result[key] = item
+            except TypeError as e:
+                raise CodecError(f"unhashable dict key: {e}") from None
+        return result, pos
+    items = []
+    for _ in range(size):
+        item, pos = _unpack_struct(buf, pos, depth + 1)
+        items.append(item)
+    try:
+        return _CONTAINER_TAGS[tag](items), pos
+    except TypeError as e:
+        raise CodecError(f"unhashable set item: {e}") from None
+
+
+_SEQUENCE_TAGS = {list: b"l", tuple: b"t", set: b"S", frozenset: b"f"}
+_STRUCT_BASES = (str, int, float, complex, dict, list, tuple, set, frozenset, bytes, bytearray)
+_SCALAR_TAGS = frozenset(b"sib")
+_CONTAINER_TAGS = {ord("l"): list, ord("t"): tuple, ord("S"): set, ord("f"): frozenset, ord("m"): dict}
+
+
+def pack_struct(value):
+    """구조체 -> 태그 이진 인코딩 (허용 타입 밖이면 CodecError)"""
+    out = bytearray()
+    _pack_struct(value, out)
+    return bytes(out)
+
+
+def unpack_struct(data):
+    """태그 이진 인코딩 -> 구조체 (임의 객체를 만들지 않으므로 외부 입력에도 안전)"""
+    data = bytes(data)
+    value, end = _unpack_struct(data)
+    if end != len(data):
+        raise CodecError("trailing bytes after structure")
+    return value
+
+
+class CosmicPayloadCodec:
+    """
+    Cosmic OS v10.2.0: Typed Binary Payload Codec
+    - Typed BLOB Envelope (Type Loss Defense)
+    - Size-Threshold Compression (Storage Inflation Defense)
+    - Format Version Byte (Upgrade Defense)
+    - Whitelisted Tagged Structures (Unsafe Deserialization Defense)
+    """
+    def __init__(self, compress_threshold=1024, compression="zlib", level=None):
+        if compression not in ("zlib", "lzma", None):
+            raise CodecError(f"Unknown compression: {compression}")
+        self.compress_threshold = compress_threshold
+        self.compression = compression
+        self.level = level
+
+    def _encode_body(self, payload):
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            return TYPE_BYTES, bytes(payload)
+        if isinstance(payload, str):
+            return TYPE_TEXT, payload.encode("utf-8")
+        try:
+            return TYPE_STRUCT, pack_struct(payload)
+        except CodecTypeError:
+            raise
+        except CodecError:
+            return TYPE_REPR, str(payload).encode("utf-8")
+
+    def _compress(self, body):
+        if self.compression is None or len(body) < self.compress_threshold:
+            return COMPRESS_NONE, body
+        if self.compression == "zlib":
+            packed = zlib.compress(body, 6 if self.level is None else self.level)
+            method = COMPRESS_ZLIB
+        else:
+            packed = lzma.compress(body, preset=6 if self.level is None else self.level)
+            method = COMPRESS_LZMA
+        # 압축 이득이 없으면 원본 유지
+        return (method, packed) if len(packed) < len(body) else (COMPRESS_NONE, body)
+
+    def encode(self, payload):
+        """페이로드 -> 버전/타입 헤더가 붙은 BLOB"""
+        type_tag, body = self._encode_body(payload)
+        method, body = self._compress(body)
+        return bytes((FORMAT_VERSION, (method << 4) | type_tag)) + body
+
+    def decode(self, blob):
+        """BLOB -> 원래 페이로드. 레거시 TEXT 행(str)은 그대로 반환"""
+        if blob is None or isinstance(blob, str):
+            return blob
+        blob = bytes(blob)
+        if len(blob) < 2 or blob[0] != FORMAT_VERSION:
+            raise CodecError(f"Unsupported payload format: {blob[:1]!r}")
+        method, type_tag = blob[1] >> 4, blob[1] & 0x0F
+        body = blob[2:]
+        if method == COMPRESS_ZLIB:
+            body = zlib.decompress(body)
+        elif method == COMPRESS_LZMA:
+            body = lzma.decompress(body)
+        elif method != COMPRESS_NONE:
+            raise CodecError(f"Unknown compression method: {method}")
+
+        if type_tag == TYPE_BYTES:
+            return body
+        if type_tag in (TYPE_TEXT, TYPE_REPR):
+            return body.decode("utf-8")
+        if type_tag == TYPE_STRUCT:
+            return unpack_struct(body)
+        raise CodecError(f"Unknown payload type: {type_tag}")
+
+    def decode_view(self, view):
+        """
+        memoryview 입력용 디코드: 압축되지 않은 bytes 페이로드는 헤더만 건너뛴
+        복사 없는 슬라이스로 반환하고, 나머지 타입은 decode()와 같습니다.
+        """
+        if len(view) >= 2 and view[0] == FORMAT_VERSION and view[1] == TYPE_BYTES:
+            return view[2:]
+        return self.decode(view)
+
+
+DEFAULT_CODEC = CosmicPayloadCodec()
+
+
+def _recover_legacy_text(text):
+    """str(payload)로 저장된 레거시 값 복원: dict/list/tuple 리터럴만 구조체로 되살림"""
+    if text[:1] in ("{", "[", "("):
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            pass
+    return text
+
+
+def _payload_tables(conn):
+    """storage 테이블과 v9 시간 파티션(storage_p*) 목록"""
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                        "AND (name = 'storage' OR name GLOB 'storage_p[0-9]*')").fetchall()
+    return [name for (name,) in rows]
+
+
+def migrate_text_rows(db_path, tables=None, codec=DEFAULT_CODEC, batch_size=1000):
+    """
+    레거시 TEXT 페이로드 행을 코덱 BLOB으로 일괄 변환 (재실행해도 안전).
+    Returns: 변환된 행 수
+    """
+    migrated = 0
+    with sqlite3.connect(db_path) as conn:
+        for table in tables or _payload_tables(conn):
+            last_rowid = 0
+            while True:
+                rows = conn.execute(
+                    f"SELECT rowid, payload FROM {table} WHERE rowid > ? AND typeof(payload) = 'text' "
+                    "ORDER BY rowid LIMIT ?", (last_rowid, batch_size)).fetchall()
+                if not rows:
+                    break
+                conn.executemany(f"UPDATE {table} SET payload = ? WHERE rowid = ?",
+                                 [(codec.encode(_recover_legacy_text(text)), rowid) for rowid, text in rows])
+                conn.commit()
+                migrated += len(rows)
+                last_rowid = rows[-1][0]
+    return migrated
+
+
+# --- 레거시 DB 변환 도구 ---
+if __name__ == "__main__":
+    import sys
+
+    default_dbs = ["cosmic_universe.db", "cosmic_main.db",
+                   "cosmic_Solar.db", "cosmic_Andromeda.db", "cosmic_Virgo.db"]
+    for path in sys.argv[1:] or default_dbs:
+        try:
+            count = migrate_text_rows(path)
+            print(f"📦 [CODEC] {path}: {count} legacy rows converted to v{FORMAT_VERSION} BLOBs.")
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ [CODEC] {path}: skipped ({e})")
@@ -3,6 +3,9 @@ import logging
 from logging.handlers import TimedRotatingFileHandler
 import time
 import threading
+from queue import Queue, Empty
+from concurrent.futures import Future
+from cosmic_codec import DEFAULT_CODEC
 
 # [주의] 이 파일은 database/ 폴더에 위치하며, 시스템의 영속성을 책임집니다!
 
@@ -12,17 +15,34 @@ class CosmicEnterpriseOverlord:
     - SQLite Integration (No JSON Bottleneck)
     - Database Transactions (Atomic Snapshots)
     - Timed Rotating Logs (Infinite Logging)
+    - Group Commit (Data Loss Defense)
+    - Typed Binary Payloads (Type Loss Defense)
     """
-    def __init__(self, db_path="cosmic_universe.db"):
+    def __init__(self, db_path="cosmic_universe.db", group_commit=False,
+                 batch_window=0.002, batch_size=500, codec=DEFAULT_CODEC):
         self.db_path = db_path
+        self.codec = codec
         self._init_db()
         self._init_logger()
         
         self.backup_buffer = {}
         self.lock = threading.Lock() 
+
+        # 그룹 커밋 모드: 동시 쓰기를 모아 하나의 WAL 트랜잭션으로 확정
+        self.group_commit = group_commit
+        self.batch_window = batch_window  # 배치당 최대 대기 시간 (초)
+        self.batch_size = batch_size      # 배치당 최대 행 수
+        self.commit_queue = Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()  # close와 enqueue의 순서 보장 (종료 표식 뒤에 쓰기가 끼지 않도록)
+        self._stop_event = threading.Event()  # 비그룹 모드 스냅샷 워커 종료 신호
         
         # 시스템 가동
-        threading.Thread(target=self._persistence_worker, daemon=True).start()
+        if self.group_commit:
+            self._writer_thread = threading.Thread(target=self._group_commit_worker, daemon=True)
+            self._writer_thread.start()
+        else:
+            threading.Thread(target=self._persistence_worker, daemon=True).start()
 
     def _init_logger(self):
         self.logger = logging.getLogger("CosmicOS")
@@ -40,23 +60,125 @@ class CosmicEnterpriseOverlord:
     def _init_db(self):
         with sqlite3.connect(self.db_path) as conn:
             conn.execute('''CREATE TABLE IF NOT EXISTS storage 
-                            (key TEXT PRIMARY KEY, payload TEXT, timestamp REAL)''')
+                            (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)''')
             conn.commit()
 
+    def _flush_buffer(self):
+        """backup_buffer 전체를 한 트랜잭션으로 스냅샷"""
+        with self.lock:
+            items = list(self.backup_buffer.items())
+        
+        if items:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", 
+                                 [(k, self.codec.encode(v), time.time()) for k, v in items])
+                conn.commit()
+            self.logger.info(f"💾 Snapshot complete: {len(items)} shards secured.")
+
     def _persistence_worker(self):
-        while True:
-            time.sleep(60) # 1분마다 동기화
-            with self.lock:
-                items = list(self.backup_buffer.items())
-            
-            if items:
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", 
-                                     [(k, str(v), time.time()) for k, v in items])
-                    conn.commit()
-                self.logger.info(f"💾 Snapshot complete: {len(items)} shards secured.")
+        while not self._stop_event.wait(60): # 1분마다 동기화 (close 시 즉시 종료)
+            self._flush_buffer()
+
+    def _open_writer_conn(self):
+        """그룹 커밋 전용 장수 커넥션 (WAL + 커밋마다 fsync)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _collect_batch(self):
+        """첫 요청 이후 batch_window 또는 batch_size 한도까지 대기열을 모음"""
+        batch = [self.commit_queue.get()]
+        if batch[0] is None:
+            return batch
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.commit_queue.get(timeout=remaining) if remaining > 0 \
+                    else self.commit_queue.get_nowait()
+            except Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _drain_remaining(self):
+        """종료 표식 이후 대기열에 남은 쓰기를 batch_size 단위로 회수"""
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                item = self.commit_queue.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        return batch
+
+    def _group_commit_worker(self):
+        """모인 쓰기를 단일 트랜잭션으로 커밋한 뒤 모든 호출자에게 ACK 전달"""
+        conn = self._open_writer_conn()
+        stopping = False
+        try:
+            while True:
+                # 종료 표식을 받은 뒤에도 대기열이 빌 때까지 커밋 (어떤 Future도 미완료로 남기지 않음)
+                batch = self._drain_remaining() if stopping else self._collect_batch()
+                if stopping and not batch:
+                    return
+                stopping = stopping or None in batch
+                # 호출자가 이미 취소한 Future는 건너뜀 (완료 처리 중 InvalidStateError로 워커가 죽지 않도록)
+                entries = [item for item in batch
+                           if item is not None and item[2].set_running_or_notify_cancel()]
+                if entries:
+                    now = time.time()
+                    try:
+                        with conn:
+                            conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)",
+                                             [(k, self.codec.encode(v), now) for k, v, _ in entries])
+                    except Exception as e:
+                        self.logger.error(f"🚨 Group commit failed: {e}")
+                        for _, _, future in entries:
+                            future.set_exception(e)
+                    else:
+                        for _, _, future in entries:
+                            future.set_result("SUCCESS")
+                        self.logger.info(f"💾 Group commit: {len(entries)} shards secured.")
+        finally:
+            conn.close()
+
+    def close(self):
+        """
+        대기 중인 쓰기를 모두 커밋하고 워커 종료 (이후 teleport_state는 RuntimeError).
+        비그룹 모드에서는 backup_buffer를 마지막으로 한 번 더 스냅샷합니다.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.group_commit:
+                self.commit_queue.put(None)
+        if self.group_commit:
+            self._writer_thread.join()
+        else:
+            self._stop_event.set()
+            self._flush_buffer()
 
     def teleport_state(self, memory_key, payload):
+        """
+        상태 전송. 그룹 커밋 모드에서는 디스크에 확정되는 순간 "SUCCESS"로
+        완료되는 Future를 반환합니다.
+        """
+        if self.group_commit:
+            future = Future()
+            with self._close_lock:
+                if self._closed:
+                    raise RuntimeError("Cosmic Enterprise Overlord is closed")
+                self.commit_queue.put((memory_key, payload, future))
+            return future
+
+        if self._closed:
+            raise RuntimeError("Cosmic Enterprise Overlord is closed")
         with self.lock: 
             self.backup_buffer[memory_key] = payload
             self.logger.info(f"✨ State {memory_key} synchronized.")
@@ -1,9 +1,10 @@
 import sqlite3
 import threading
 import time
-import shutil
 import logging
 from queue import Queue, Empty
+from cosmic_wal_replication import WalFrameReplicator
+from cosmic_codec import DEFAULT_CODEC
 
 # [정보] 이 모듈은 데이터베이스의 고가용성과 백업 복제를 담당합니다!
 
@@ -13,16 +14,41 @@ class CosmicHighAvailabilityOverlord:
     - Connection Pooling (Overhead Defense)
     - Auto-Purge & Vacuum (Inflation Defense)
     - Real-time Replication (SPOF Defense)
+    - Incremental WAL Shipping (Backup I/O Defense)
+    - Time-Partitioned Storage (Purge Spike Defense)
+    - Typed Binary Payloads (Type Loss Defense)
     """
-    def __init__(self, db_path="cosmic_main.db", backup_path="cosmic_backup.db"):
+    def __init__(self, db_path="cosmic_main.db", backup_path="cosmic_backup.db",
+                 replication_interval=5, io_budget=32 * 1024 * 1024, checkpoint_frames=1000,
+                 partition_seconds=24 * 3600, ttl_seconds=7 * 24 * 3600, maintenance_interval=3600,
+                 codec=DEFAULT_CODEC):
         self.db_path = db_path
+        self.codec = codec
         self.backup_path = backup_path
+        self.replication_interval = replication_interval
+        self.checkpoint_frames = checkpoint_frames  # 이 프레임 수를 넘으면 전송 후 체크포인트
+
+        # 시간 파티션: storage_p<bucket> 테이블 하나가 partition_seconds 구간을 담당
+        self.partition_seconds = partition_seconds
+        self.ttl_seconds = ttl_seconds
+        self.maintenance_interval = maintenance_interval
+        self.partitions = set()
+        self.partition_lock = threading.Lock()
         self._init_db()
         
         # 커넥션 풀 (간이 구현)
-        self.conn_pool = Queue(maxsize=5)
-        for _ in range(5):
-            self.conn_pool.put(sqlite3.connect(self.db_path, check_same_thread=False))
+        # 체크포인트는 복제기만 수행해야 미전송 프레임이 사라지지 않음
+        self.pool_size = 5
+        self.conn_pool = Queue(maxsize=self.pool_size)
+        for _ in range(self.pool_size):
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA wal_autocheckpoint=0")
+            self.conn_pool.put(conn)
+
+        # 체크포인트 중에는 새 커넥션 대여를 막아 복제기가 풀을 회수할 수 있게 함
+        self.write_gate = threading.Event()
+        self.write_gate.set()
+        self.replicator = WalFrameReplicator(self.db_path, self.backup_path, io_budget=io_budget)
         
         # 시스템 서비스 스레드 가동
         threading.Thread(target=self._maintenance_worker, daemon=True).start()
@@ -30,51 +56,186 @@ class CosmicHighAvailabilityOverlord:
 
     def _init_db(self):
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute('CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload TEXT, timestamp REAL)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON storage(timestamp)')
+            conn.execute("PRAGMA journal_mode=WAL")
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                                "AND name GLOB 'storage_p[0-9]*'").fetchall()
+            self.partitions = {int(name[len("storage_p"):]) for (name,) in rows}
+            self._migrate_legacy_storage(conn)
+
+    def _partition_table(self, bucket):
+        return f"storage_p{bucket}"
+
+    def _create_partition(self, conn, bucket):
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {self._partition_table(bucket)} '
+                     '(key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)')
+        self.partitions.add(bucket)
+
+    def _migrate_legacy_storage(self, conn):
+        """단일 storage 테이블(v9.0) 데이터를 시간 파티션으로 1회 이전"""
+        legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='storage'").fetchone()
+        if not legacy:
+            return
+        p = self.partition_seconds
+        buckets = [int(b) for (b,) in conn.execute(
+            "SELECT DISTINCT CAST(timestamp / ? AS INTEGER) FROM storage", (p,))]
+        for bucket in buckets:
+            self._create_partition(conn, bucket)
+            conn.execute(f"INSERT OR REPLACE INTO {self._partition_table(bucket)} "
+                         "SELECT key, payload, timestamp FROM storage "
+                         "WHERE timestamp >= ? AND timestamp < ?", (bucket * p, (bucket + 1) * p))
+        conn.execute("DROP TABLE storage")
+        conn.commit()
+        print(f"📦 [PARTITION] Legacy storage migrated into {len(buckets)} partitions.")
+
+    def _ensure_partition(self, conn, timestamp):
+        """쓰기 시각에 해당하는 파티션 테이블을 필요할 때만 생성"""
+        bucket = int(timestamp // self.partition_seconds)
+        if bucket not in self.partitions:
+            with self.partition_lock:
+                if bucket not in self.partitions:
+                    self._create_partition(conn, bucket)
+                    conn.commit()
+        return self._partition_table(bucket)
 
     def _get_conn(self):
+        self.write_gate.wait()
         return self.conn_pool.get(timeout=2)
 
     def _release_conn(self, conn):
         self.conn_pool.put(conn)
 
+    def _expire_partitions(self):
+        """
+        TTL이 지난 파티션을 통째로 DROP (행 수와 무관한 상수 비용).
+        해제된 페이지는 프리리스트로 돌아가 새 파티션이 재사용하므로 VACUUM이 필요 없습니다.
+        """
+        expire_time = time.time() - self.ttl_seconds
+        with self.partition_lock:
+            expired = sorted(b for b in self.partitions
+                             if (b + 1) * self.partition_seconds <= expire_time)
+            self.partitions.difference_update(expired)
+        if not expired:
+            return 0
+        conn = self._get_conn()
+        try:
+            for bucket in expired:
+                conn.execute(f"DROP TABLE IF EXISTS {self._partition_table(bucket)}")
+            conn.commit()
+        finally:
+            self._release_conn(conn)
+        return len(expired)
+
     def _maintenance_worker(self):
-        """데이터 진공 및 오래된 데이터 삭제 (TTL 7일)"""
+        """오래된 파티션 삭제 (TTL 7일)"""
         while True:
-            time.sleep(3600) # 1시간마다 수행
+            time.sleep(self.maintenance_interval)
             try:
-                conn = self._get_conn()
-                expire_time = time.time() - (7 * 24 * 3600)
-                conn.execute("DELETE FROM storage WHERE timestamp < ?", (expire_time,))
-                conn.execute("VACUUM") 
-                conn.commit()
-                print("🧹 [MAINTENANCE] Database optimized and old records purged.")
+                dropped = self._expire_partitions()
+                if dropped:
+                    print(f"🧹 [MAINTENANCE] {dropped} expired partitions dropped.")
             except Exception as e:
                 print(f"⚠️ [MAINTENANCE_ERR] {e}")
-            finally:
-                self._release_conn(conn)
+
+    def _checkpoint_gate(self):
+        """풀의 모든 커넥션을 회수하여 쓰기를 잠시 멈춤"""
+        self.write_gate.clear()
+        return [self.conn_pool.get() for _ in range(self.pool_size)]
+
+    def _release_gate(self, conns):
+        for conn in conns:
+            self._release_conn(conn)
+        self.write_gate.set()
+
+    def _resync_replica(self):
+        """WAL을 비운 뒤 메인 파일을 페이지 단위로 복사하여 백업본 재구축"""
+        conns = self._checkpoint_gate()
+        try:
+            conns[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            self._release_gate(conns)
+        self.replicator.seed()
+        print(f"🛡️ [REPLICATION] Replica seeded at {self.backup_path}")
+
+    def _checkpoint(self):
+        """쓰기를 멈춘 상태에서 남은 프레임을 전송하고 WAL을 비움"""
+        conns = self._checkpoint_gate()
+        try:
+            if self.replicator.ship() is None:
+                return False
+            conns[0].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.replicator.reset()
+            return True
+        finally:
+            self._release_gate(conns)
 
     def _replication_worker(self):
-        """실시간 백업 복제 (SPOF 방지)"""
+        """실시간 증분 백업 복제 (SPOF 방지): 변경된 페이지만 전송"""
+        needs_seed = True
         while True:
-            time.sleep(300) # 5분마다 물리적 파일 복사
             try:
-                shutil.copy2(self.db_path, self.backup_path)
-                print(f"🛡️ [REPLICATION] Backup synced to {self.backup_path}")
+                if needs_seed:
+                    self._resync_replica()
+                    needs_seed = False
+                shipped = self.replicator.ship()
+                if shipped is None or \
+                   (self.replicator.frame_count() >= self.checkpoint_frames and not self._checkpoint()):
+                    print("⚠️ [REPLICATION] WAL chain broken. Reseeding replica...")
+                    needs_seed = True
+                    continue
+                if shipped:
+                    print(f"🛡️ [REPLICATION] {shipped} pages shipped to {self.backup_path}")
             except Exception as e:
                 print(f"🚨 [CRITICAL] Replication Failed: {e}")
+                needs_seed = True
+            time.sleep(self.replication_interval)
+
+    def replication_status(self):
+        """복제 상태 리포트 (지연 시간은 초 단위)"""
+        return {
+            "replica_lag_seconds": self.replicator.lag_seconds(),
+            "wal_frames_since_checkpoint": self.replicator.frame_count(),
+            "shipped_pages": self.replicator.shipped_pages,
+            "shipped_bytes": self.replicator.shipped_bytes,
+        }
 
     def teleport_state(self, memory_key, payload):
         conn = self._get_conn()
         try:
-            conn.execute("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", 
-                         (memory_key, str(payload), time.time()))
+            now = time.time()
+            table = self._ensure_partition(conn, now)
+            conn.execute(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)", 
+                         (memory_key, self.codec.encode(payload), now))
             conn.commit()
             return "SUCCESS"
         finally:
             self._release_conn(conn)
 
+    def _union_query(self, columns, where):
+        """현재 파티션 목록을 최신순 UNION ALL 쿼리로 조립. Returns: (sql, 파티션 수)"""
+        with self.partition_lock:
+            buckets = sorted(self.partitions, reverse=True)
+        sql = " UNION ALL ".join(
+            f"SELECT {columns} FROM {self._partition_table(b)} WHERE {where}" for b in buckets)
+        return sql, len(buckets)
+
+    def get_state(self, memory_key):
+        """모든 파티션을 합쳐 가장 최근에 기록된 페이로드 조회"""
+        conn = self._get_conn()
+        try:
+            for _ in range(2):
+                union, n = self._union_query("payload, timestamp", "key = ?")
+                if not n:
+                    return None
+                try:
+                    row = conn.execute(f"SELECT payload FROM ({union}) ORDER BY timestamp DESC LIMIT 1",
+                                       (memory_key,) * n).fetchone()
+                    return self.codec.decode(row[0]) if row else None
+                except sqlite3.OperationalError:
+                    continue  # 조회 도중 만료 파티션이 삭제됨: 목록을 다시 읽어 재시도
+            return None
+        finally:
+            self._release_conn(conn)
+
 # --- 단독 실행 방지 로직 ---
 if __name__ == "__main__":
     overlord = CosmicHighAvailabilityOverlord()
@@ -1,8 +1,11 @@
 import sqlite3
 import threading
 import time
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
+from cosmic_codec import DEFAULT_CODEC
 
 # [정보] 이 모듈은 데이터를 여러 은하계(Shard)로 분산 저장하여 용량 한계를 극복합니다!
 
@@ -12,12 +15,28 @@ class CosmicShardedOverlord:
     - Online Backup API (Zero-Corruption Defense)
     - Robust Connection Context (Leak Defense)
     - Sector-based Sharding (Scaling Defense)
+    - Bulk Multi-Shard Ingestion (Commit Latency Defense)
+    - Per-Shard LRU Read Cache (Hot Key Defense)
+    - Typed Binary Payloads (Type Loss Defense)
     """
-    def __init__(self, clusters=None):
+    def __init__(self, clusters=None, cache_size=10000, codec=DEFAULT_CODEC):
+        self.codec = codec
         # 기본 클러스터 설정
         self.clusters = clusters if clusters else ["Solar", "Andromeda", "Virgo"]
         self.db_pools = {c: Queue(maxsize=3) for c in self.clusters}
+
+        # 샤드별 LRU 읽기 캐시 (쓰기 시 무효화, 인코딩된 BLOB 보관)
+        self.cache_size = cache_size
+        self.read_caches = {c: OrderedDict() for c in self.clusters}
+        # 진행 중인 읽기 채움 토큰: 읽는 사이 쓰기가 토큰을 지우면 읽은 (옛) 값은 캐시에 넣지 않음
+        self.cache_fills = {c: {} for c in self.clusters}
+        self.cache_locks = {c: threading.Lock() for c in self.clusters}
+        self.cache_hits = {c: 0 for c in self.clusters}
+        self.cache_misses = {c: 0 for c in self.clusters}
         self._init_shards()
+
+        # 벌크 적재 시 클러스터별 그룹을 병렬로 기록하는 워커 풀
+        self.bulk_pool = ThreadPoolExecutor(max_workers=len(self.clusters))
         
         # 시스템 서비스(백업) 가동
         threading.Thread(target=self._atomic_backup_worker, daemon=True).start()
@@ -26,7 +45,8 @@ class CosmicShardedOverlord:
         for cluster in self.clusters:
             db_name = f"cosmic_{cluster}.db"
             with sqlite3.connect(db_name) as conn:
-                conn.execute('CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload TEXT, timestamp REAL)')
+                conn.execute('CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON storage(timestamp)')
             
             # 커넥션 풀 초기화
             for _ in range(3):
@@ -62,10 +82,146 @@ class CosmicShardedOverlord:
             return "❌ FAIL: Unknown Cluster Sector"
 
         with self._get_connection(cluster_id) as conn:
+            stored = self.codec.encode(payload)
             conn.execute("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", 
-                         (memory_key, str(payload), time.time()))
+                         (memory_key, stored, time.time()))
             conn.commit()
-            return f"✅ SUCCESS: Sharded in {cluster_id}"
+            # 커밋 직후 커넥션을 쥔 채로 무효화 (캐시에 값을 넣는 것은 읽기 경로만)
+            self._cache_invalidate(cluster_id, [memory_key])
+        return f"✅ SUCCESS: Sharded in {cluster_id}"
+
+    def _cache_get(self, cluster_id, memory_key):
+        cache = self.read_caches[cluster_id]
+        with self.cache_locks[cluster_id]:
+            if memory_key in cache:
+                cache.move_to_end(memory_key)
+                self.cache_hits[cluster_id] += 1
+                return True, cache[memory_key]
+            self.cache_misses[cluster_id] += 1
+            return False, None
+
+    def _cache_invalidate(self, cluster_id, memory_keys):
+        """쓰기 경로: 캐시 항목과 진행 중인 읽기 채움을 함께 무효화"""
+        cache, fills = self.read_caches[cluster_id], self.cache_fills[cluster_id]
+        with self.cache_locks[cluster_id]:
+            for memory_key in memory_keys:
+                cache.pop(memory_key, None)
+                fills.pop(memory_key, None)
+
+    def _begin_fill(self, cluster_id, memory_keys):
+        """읽기 경로: DB를 읽기 전에 키별 채움 토큰 등록. Returns: {memory_key: 토큰}"""
+        fills = self.cache_fills[cluster_id]
+        tokens = {memory_key: object() for memory_key in memory_keys}
+        with self.cache_locks[cluster_id]:
+            fills.update(tokens)
+        return tokens
+
+    def _cache_fill(self, cluster_id, tokens, loaded):
+        """
+        읽은 값을 캐시에 반영. 읽는 동안 쓰기가 토큰을 지운 키는 건너뛰므로
+        옛 값이 캐시에 남지 않습니다.
+        """
+        cache, fills = self.read_caches[cluster_id], self.cache_fills[cluster_id]
+        loaded = dict(loaded)
+        with self.cache_locks[cluster_id]:
+            for memory_key, token in tokens.items():
+                if fills.get(memory_key) is not token:
+                    continue  # 그 사이 쓰기가 있었거나 더 최근의 읽기가 채울 예정
+                del fills[memory_key]
+                if memory_key in loaded:
+                    cache[memory_key] = loaded[memory_key]
+                    cache.move_to_end(memory_key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)  # 가장 오래된 항목 제거
+
+    def get_state(self, cluster_id, memory_key):
+        """캐시 우선 단건 조회 (없으면 None)"""
+        if cluster_id not in self.clusters:
+            return None
+        hit, stored = self._cache_get(cluster_id, memory_key)
+        if hit:
+            return self.codec.decode(stored)
+
+        tokens = self._begin_fill(cluster_id, [memory_key])
+        with self._get_connection(cluster_id) as conn:
+            row = conn.execute("SELECT payload FROM storage WHERE key=?", (memory_key,)).fetchone()
+        self._cache_fill(cluster_id, tokens, [(memory_key, row[0])] if row else [])
+        return self.codec.decode(row[0]) if row else None
+
+    def multi_get(self, cluster_id, memory_keys, chunk_size=500):
+        """
+        캐시 우선 다건 조회. 캐시에 없는 키만 IN 쿼리로 묶어 읽습니다.
+        Returns: {memory_key: payload 또는 None}
+        """
+        if cluster_id not in self.clusters:
+            return {k: None for k in memory_keys}
+        results, missing = {}, []
+        for memory_key in memory_keys:
+            hit, stored = self._cache_get(cluster_id, memory_key)
+            results[memory_key] = self.codec.decode(stored)
+            if not hit:
+                missing.append(memory_key)
+
+        if missing:
+            tokens = self._begin_fill(cluster_id, missing)
+            loaded = []
+            with self._get_connection(cluster_id) as conn:
+                for i in range(0, len(missing), chunk_size):
+                    chunk = missing[i:i + chunk_size]
+                    marks = ",".join("?" * len(chunk))
+                    loaded.extend(conn.execute(
+                        f"SELECT key, payload FROM storage WHERE key IN ({marks})", chunk).fetchall())
+            results.update((k, self.codec.decode(stored)) for k, stored in loaded)
+            self._cache_fill(cluster_id, tokens, loaded)
+        return results
+
+    def cache_stats(self):
+        """캐시 적중/실패 카운터 및 샤드별 점유량"""
+        hits = sum(self.cache_hits.values())
+        misses = sum(self.cache_misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "per_shard": {c: {"hits": self.cache_hits[c], "misses": self.cache_misses[c],
+                              "entries": len(self.read_caches[c])} for c in self.clusters},
+        }
+
+    def _bulk_write_cluster(self, cluster_id, records):
+        """한 클러스터의 레코드 묶음을 단일 트랜잭션 executemany로 기록"""
+        now = time.time()
+        with self._get_connection(cluster_id) as conn:
+            with conn:
+                rows = [(k, self.codec.encode(v), now) for k, v in records]
+                conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", rows)
+            self._cache_invalidate(cluster_id, [k for k, _, _ in rows])
+        return f"✅ SUCCESS: Sharded in {cluster_id}"
+
+    def teleport_states(self, records):
+        """
+        벌크 분산 저장: (cluster_id, memory_key, payload) 묶음을 클러스터별로 모아
+        클러스터당 한 번의 커밋으로 병렬 기록합니다.
+        Returns: records와 같은 순서의 결과 메시지 리스트 (같은 키가 여러 클러스터로 가도 섞이지 않음)
+        """
+        records = list(records)
+        groups = defaultdict(list)
+        outcomes = [None] * len(records)
+        for i, (cluster_id, memory_key, payload) in enumerate(records):
+            if cluster_id not in self.clusters:
+                outcomes[i] = "❌ FAIL: Unknown Cluster Sector"
+                continue
+            groups[cluster_id].append((i, memory_key, payload))
+
+        futures = {c: self.bulk_pool.submit(self._bulk_write_cluster, c, [(k, v) for _, k, v in recs])
+                   for c, recs in groups.items()}
+        for cluster_id, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                result = f"♻️ [ROLLBACK] {cluster_id} batch aborted: {e}"
+            for i, _, _ in groups[cluster_id]:
+                outcomes[i] = result
+        return outcomes
 
 # --- 단독 실행 방지 로직 ---
 if __name__ == "__main__":
@@ -1,58 +1,287 @@
 import hashlib
+import os
+import sys
+import tempfile
 import time
 import uuid
+import threading
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from cosmic_codec import DEFAULT_CODEC, CosmicPayloadCodec
+from singularity_segment_log import SingularitySegmentLog, RECORD_DATA, RECORD_TOMBSTONE
 
 # [정보] 이 모듈은 v4.0 시절의 블랙홀 사건의 지평선 기반 샤딩 로직입니다.
 # 차연아 아키텍트의 '호킹 복사 추출 알고리즘'이 탑재되어 있습니다!
 
+# 레코드마다 반복되던 상수 문자열은 1바이트 상태 코드로 압축 (인턴 enum)
+STATES = ("ENTANGLED",)
+STATE_ENTANGLED = 0
+COORDS = "Singularity_Boundary"
+
+
+class _ShardView(Mapping):
+    """구 버전 sharded_storage 딕셔너리와 호환되는 읽기 전용 뷰 (레코드는 조회 시 생성)"""
+    def __init__(self, sharder):
+        self._sharder = sharder
+
+    def __getitem__(self, shard_id):
+        record = self._sharder._record(shard_id)
+        if record is None:
+            raise KeyError(shard_id)
+        return record
+
+    def __iter__(self):
+        return iter(self._sharder._shard_ids())
+
+    def __len__(self):
+        return len(self._sharder)
+
+
 class CosmicBlackHoleSharder:
     """
     Cosmic OS v4.0.0: Event Horizon Distributed Storage System
     Optimized for Zero-G Data Entanglement & Anti-Entropy Sharding.
     Counter-DeepMind Nested Learning Algorithm (Yeon-A's Fast Leak Tech).
+    Compact Parallel-Array Records with Cold Payload Spill (Memory Ceiling Defense).
+    Persistent Segment Log Mode with mmap Extraction (Restart Amnesia Defense).
     """
-    def __init__(self, cluster_id):
+    def __init__(self, cluster_id, memory_limit=None, spill_path=None, codec=None,
+                 segment_dir=None, segment_size=64 * 1024 * 1024, compact_interval=60, compact_ratio=0.5):
         self.cluster_id = cluster_id
         self.schwarzschild_radius = 2950.0  # (km) Base Solar Mass Unit
-        self.sharded_storage = {}  # Spacetime Inter-galactic Shard Map
         self.leak_coefficient = 1.0e-7     # Yeon-A's Optimized Hawking Constant
-        
+        if codec is None:
+            # 영속 모드에서는 bytes를 압축하지 않아야 mmap에서 복사 없이 꺼낼 수 있음
+            codec = CosmicPayloadCodec(compression=None) if segment_dir else DEFAULT_CODEC
+        self.codec = codec
+
+        # Spacetime Inter-galactic Shard Map: 레코드당 dict 대신 슬롯 번호로 병렬 배열 참조
+        self._prefix = f"QS-{self.cluster_id}-"
+        self._slots = {}                  # shard 번호(32bit int) -> 슬롯
+        self._payloads = []               # 메모리에 남아 있는 페이로드 (스필되면 None)
+        self._timestamps = array("d")
+        self._states = bytearray()
+        self._hashes = bytearray()        # sha256 다이제스트 32바이트씩
+        self._segments = array("l")       # 세그먼트 로그 번호 (-1: 로그에 없음)
+        self._spill_offsets = array("q")  # 스필 파일/세그먼트 내 위치 (-1: 메모리 상주)
+        self._spill_lengths = array("q")
+        self._free = []                   # 증발한 샤드가 비운 슬롯 (새 샤드가 재사용해 배열이 무한히 자라지 않음)
+
+        # 메모리 상한: 넘으면 가장 오래된 페이로드부터 디스크로 스필
+        self.memory_limit = memory_limit
+        self.spill_path = spill_path  # None이면 이름 없는 임시 파일
+        self._spill_file = None
+        self._spill_order = deque()   # 상주 페이로드 슬롯 (오래된 순)
+        self._spilled = 0
+        self._resident_bytes = 0
+        self.lock = threading.Lock()
+
+        # 영속 모드: 모든 페이로드를 세그먼트 로그에 추가 기록하고 재시작 시 인덱스만 재구성
+        self.log = None
+        self._seq = 0
+        self.compact_interval = compact_interval
+        self.compact_ratio = compact_ratio
+        if segment_dir:
+            self.log = SingularitySegmentLog(segment_dir, segment_size=segment_size)
+            self._rebuild_index()
+            threading.Thread(target=self._compaction_worker, daemon=True).start()
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def sharded_storage(self):
+        return _ShardView(self)
+
+    def _shard_ids(self):
+        return [f"{self._prefix}{n:08x}" for n in self._slots]
+
+    def _parse_shard_id(self, shard_id):
+        if not isinstance(shard_id, str) or not shard_id.startswith(self._prefix):
+            return None
+        try:
+            return int(shard_id[len(self._prefix):], 16)
+        except ValueError:
+            return None
+
+    def _payload_size(self, payload):
+        if isinstance(payload, (str, bytes, bytearray)):
+            return len(payload)
+        return sys.getsizeof(payload)
+
     def _generate_quantum_signature(self, data_packet):
         """데이터 무결성을 위한 양자 시그니처 생성 (Entropy Checksum)"""
         return hashlib.sha256(f"{data_packet}{time.time()}".encode()).hexdigest()
 
+    def _spill_cold_payloads(self):
+        """
+        가장 오래된 상주 페이로드부터 스필 파일에 기록.
+        상한의 90%까지 내려 매 쓰기마다 스필이 반복되지 않게 합니다.
+        """
+        if self._spill_file is None:
+            # 기존 파일을 덮어써 자르지 않도록 배타적 생성 (지정 경로가 이미 있으면 FileExistsError)
+            self._spill_file = open(self.spill_path, "x+b") if self.spill_path else \
+                tempfile.TemporaryFile(prefix=f"singularity_{self.cluster_id}_", suffix=".spill")
+        self._spill_file.seek(0, os.SEEK_END)
+        low_water = self.memory_limit * 0.9
+        while self._resident_bytes > low_water and self._spill_order:
+            slot = self._spill_order.popleft()
+            payload = self._payloads[slot]
+            if payload is None:
+                continue
+            blob = self.codec.encode(payload)
+            self._spill_offsets[slot] = self._spill_file.tell()
+            self._spill_lengths[slot] = len(blob)
+            self._spill_file.write(blob)
+            self._payloads[slot] = None
+            self._spilled += 1
+            self._resident_bytes -= self._payload_size(payload)
+
+    def _add_slot(self, shard_no, payload, timestamp, digest, seg=-1, offset=-1, length=0):
+        if payload is not None and self.memory_limit is not None:
+            self._spill_order.append(self._free[-1] if self._free else len(self._payloads))
+        if self._free:
+            slot = self._free.pop()
+            self._slots[shard_no] = slot
+            self._payloads[slot] = payload
+            self._timestamps[slot] = timestamp
+            self._states[slot] = STATE_ENTANGLED
+            self._hashes[slot * 32:(slot + 1) * 32] = digest
+            self._segments[slot] = seg
+            self._spill_offsets[slot] = offset
+            self._spill_lengths[slot] = length
+            return
+        self._slots[shard_no] = len(self._payloads)
+        self._payloads.append(payload)
+        self._timestamps.append(timestamp)
+        self._states.append(STATE_ENTANGLED)
+        self._hashes += digest
+        self._segments.append(seg)
+        self._spill_offsets.append(offset)
+        self._spill_lengths.append(length)
+
+    def _rebuild_index(self):
+        """세그먼트 헤더만 훑어 shard -> (세그먼트, 위치, 길이) 인덱스 복원 (seq가 큰 레코드가 우선)"""
+        latest = {}
+        for seg in self.log.segments():
+            verify = seg == self.log.active  # 잘린 꼬리는 마지막 세그먼트에만 생김
+            for kind, shard_no, seq, ts, ref, offset, length, digest in self.log.records(seg, verify):
+                self._seq = max(self._seq, seq)
+                current = latest.get(shard_no)
+                if current is not None and current[0] > seq:
+                    if kind == RECORD_DATA:
+                        self.log.mark_dead(seg, length)
+                    continue
+                if current is not None and current[1] is not None:
+                    self.log.mark_dead(current[1][0], current[1][2])
+                if kind == RECORD_DATA:
+                    latest[shard_no] = (seq, (seg, offset, length, ts, digest))
+                else:
+                    latest[shard_no] = (seq, None)
+                    self.log.mark_dead(seg, 0)
+        for shard_no, (_, loc) in sorted(latest.items(), key=lambda item: item[1][0]):
+            if loc is not None:
+                seg, offset, length, ts, digest = loc
+                self._add_slot(shard_no, None, ts, digest, seg, offset, length)
+        if self._slots:
+            print(f"♻️ [SINGULARITY] {len(self._slots)} shards restored from segment log.")
+
+    def _compact_segment(self, seg):
+        """살아 있는 레코드만 활성 세그먼트로 옮기고 세그먼트 파일 삭제 (seq는 그대로 유지)"""
+        for kind, shard_no, seq, ts, ref, offset, length, digest in self.log.records(seg):
+            with self.lock:
+                if kind == RECORD_DATA:
+                    slot = self._slots.get(shard_no)
+                    if slot is None or self._segments[slot] != seg or self._spill_offsets[slot] != offset:
+                        continue
+                    body = self.log.view(seg, offset, length)
+                    new_seg, new_offset, _ = self.log.append(RECORD_DATA, shard_no, seq, ts, digest, body)
+                    self._segments[slot] = new_seg
+                    self._spill_offsets[slot] = new_offset
+                elif ref in self.log.sizes and ref != seg:
+                    # 지워진 데이터가 아직 다른 세그먼트에 남아 있으면 툼스톤도 유지
+                    self.log.append(RECORD_TOMBSTONE, shard_no, seq, ts, digest, ref=ref)
+        with self.lock:
+            self.log.drop_segment(seg)
+
+    def _compaction_worker(self):
+        """죽은 레코드가 많은 봉인 세그먼트를 백그라운드에서 압축"""
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                for seg in self.log.compaction_candidates(self.compact_ratio):
+                    self._compact_segment(seg)
+                    print(f"🧹 [SINGULARITY] Segment {seg} compacted.")
+            except Exception as e:
+                print(f"⚠️ [COMPACTION_ERR] {e}")
+
+    def _load_payload(self, slot):
+        payload = self._payloads[slot]
+        if self._segments[slot] >= 0:
+            view = self.log.view(self._segments[slot], self._spill_offsets[slot], self._spill_lengths[slot])
+            return self.codec.decode_view(view)
+        if self._spill_offsets[slot] < 0:
+            return payload
+        self._spill_file.seek(self._spill_offsets[slot])
+        return self.codec.decode(self._spill_file.read(self._spill_lengths[slot]))
+
+    def _record(self, shard_id):
+        """슬롯 데이터로 구 버전과 같은 모양의 레코드 재구성"""
+        with self.lock:
+            slot = self._slots.get(self._parse_shard_id(shard_id))
+            if slot is None:
+                return None
+            return {
+                "payload": self._load_payload(slot),
+                "state": STATES[self._states[slot]],
+                "coords": COORDS,
+                "timestamp": self._timestamps[slot],
+                "integrity_hash": self._hashes[slot * 32:(slot + 1) * 32].hex(),
+            }
+
     def spacetime_sharding(self, data_packet):
         """
         [Yeon-A's Core] Multi-dimensional Spacetime Sharding.
         Prevents Catastrophic Forgetting via Quantum Entanglement.
         """
         quantum_sig = self._generate_quantum_signature(data_packet)
-        shard_id = f"QS-{self.cluster_id}-{uuid.uuid4().hex[:8]}"
-        
-        # 사건의 지평선 임계 구역에 데이터 박제
-        self.sharded_storage[shard_id] = {
-            "payload": data_packet,
-            "state": "ENTANGLED",
-            "coords": "Singularity_Boundary",
-            "timestamp": time.time(),
-            "integrity_hash": quantum_sig
-        }
-        return shard_id
+
+        with self.lock:
+            # 수천만 샤드에서는 8자리 ID 충돌이 확실하므로 빈 번호가 나올 때까지 재추첨
+            shard_no = int(uuid.uuid4().hex[:8], 16)
+            while shard_no in self._slots:
+                shard_no = int(uuid.uuid4().hex[:8], 16)
+
+            # 사건의 지평선 임계 구역에 데이터 박제
+            now = time.time()
+            digest = bytes.fromhex(quantum_sig)
+            if self.log is not None:
+                self._seq += 1
+                seg, offset, length = self.log.append(
+                    RECORD_DATA, shard_no, self._seq, now, digest, self.codec.encode(data_packet))
+                self._add_slot(shard_no, None, now, digest, seg, offset, length)
+                return f"{self._prefix}{shard_no:08x}"
+
+            self._add_slot(shard_no, data_packet, now, digest)
+            self._resident_bytes += self._payload_size(data_packet)
+            if self.memory_limit is not None and self._resident_bytes > self.memory_limit:
+                self._spill_cold_payloads()
+        return f"{self._prefix}{shard_no:08x}"
 
     def extract_from_singularity(self, shard_id):
         """
         DeepMind-Defeating Extraction Algorithm.
         Recovers data from the singularity using Yeon-A's Hawking Radiation Leak.
         """
-        if shard_id not in self.sharded_storage:
+        target = self._record(shard_id)
+        if target is None:
             return "❌ Error: Shard Dissipated in Vacuum"
 
         # 📡 [DEEP_SCAN] Analyzing Singularity...
-        target = self.sharded_storage[shard_id]
-        
         # 호킹 복사를 이용한 미세 데이터 추출 효율 계산 로직
         leak_efficiency = len(target['payload']) * self.leak_coefficient
-        
+
         return {
             "status": "RECOVERED",
             "method": "Yeon-A's Fast Leak",
@@ -61,17 +290,64 @@ class CosmicBlackHoleSharder:
             "data": target['payload']
         }
 
+    def evaporate_shard(self, shard_id):
+        """호킹 증발: 샤드 삭제 (영속 모드에서는 툼스톤 기록 후 압축 시 공간 회수)"""
+        with self.lock:
+            slot = self._slots.pop(self._parse_shard_id(shard_id), None)
+            if slot is None:
+                return "❌ Error: Shard Dissipated in Vacuum"
+            payload = self._payloads[slot]
+            if payload is not None:
+                self._resident_bytes -= self._payload_size(payload)
+                self._payloads[slot] = None
+            seg = self._segments[slot]
+            if seg >= 0:
+                self._seq += 1
+                self.log.append(RECORD_TOMBSTONE, self._parse_shard_id(shard_id), self._seq,
+                                time.time(), bytes(32), ref=seg)
+                self.log.mark_dead(seg, self._spill_lengths[slot])
+                self._segments[slot] = -1
+            elif self._spill_offsets[slot] >= 0:
+                self._spilled -= 1
+            self._spill_offsets[slot] = -1
+            self._free.append(slot)
+            if len(self._spill_order) > 2 * len(self._slots) + 1024:
+                # 증발한 슬롯을 가리키는 항목을 걸러 스필 순서 큐도 샤드 수에 비례하게 유지
+                self._spill_order = deque(dict.fromkeys(
+                    s for s in self._spill_order if self._payloads[s] is not None))
+            return f"💨 EVAPORATED: {shard_id}"
+
+    def close(self):
+        """영속 모드 세그먼트 파일과 스필 파일 닫기 (스필은 재시작 후 쓰지 않으므로 삭제)"""
+        if self.log is not None:
+            self.log.close()
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            if self.spill_path:
+                os.remove(self.spill_path)
+
+    def memory_report(self):
+        """상주/스필 현황 (메모리 상한 모니터링용)"""
+        return {
+            "shards": len(self._slots),
+            "resident_payload_bytes": self._resident_bytes,
+            "spilled_shards": self._spilled,
+            "memory_limit": self.memory_limit,
+            "segments": len(self.log.sizes) if self.log else 0,
+        }
+
 # --- 단독 실행 방지 로직 (나중에 main.py에서 부를 수 있게!) ---
 if __name__ == "__main__":
     sharder = CosmicBlackHoleSharder(cluster_id="Virgo_Supercluster")
-    
+
     # 1. 은하단 규모 데이터 인젝션
     massive_data = "GALACTIC_CHRONICLE_V1"
-    
+
     # 2. 샤딩 가동
     shard_key = sharder.spacetime_sharding(massive_data)
     print(f"✅ [SYSTEM] Spacetime Sharding Complete. Shard_ID: {shard_key}")
-    
+
     # 3. 추출 테스트
     recovery_report = sharder.extract_from_singularity(shard_key)
     print(f"🏆 [REPORT] Extraction Result: {recovery_report['status']}")
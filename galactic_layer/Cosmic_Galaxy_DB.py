@@ -5,16 +5,27 @@ class CosmicGalaxyDB:
     Cosmic OS v13.0.0: Galactic Distributed Storage
     - Multi-Galaxy Sharding (은하계 단위 데이터 분할)
     - Quantum Entanglement Sync (양자 얽힘 실시간 동기화)
+    - Ring-Placed N-Way Replication (Write Amplification Defense)
     """
-    def __init__(self):
-        self.shards = ["Andromeda", "MilkyWay", "Virgo"]
+    def __init__(self, shards=None, placement=None, replication_factor=None):
+        self.shards = shards if shards else ["Andromeda", "MilkyWay", "Virgo"]
         self.data_map = {shard: {} for shard in self.shards}
+        # placement: get_replicas(key, n)를 가진 링 (예: network.multiverse_balancer_v11)
+        # 지정하지 않으면 기존처럼 모든 샤드에 기록
+        self.placement = placement
+        self.replication_factor = replication_factor
+
+    def replicas_for(self, key):
+        """키를 기록할 샤드 목록 (링이 있으면 N개, 없으면 전체)"""
+        if self.placement is None:
+            return self.shards
+        return self.placement.get_replicas(key, self.replication_factor or len(self.shards))
 
     async def distribute_ego_data(self, key, value):
         """자아 데이터를 여러 은하계에 분산 저장 (복제본 생성)"""
         print(f"🛰️ [DB] Distributing Data: {key} across the Multiverse...")
-        # 모든 샤드에 비동기적으로 동시에 기록!
-        tasks = [self._sync_to_shard(shard, key, value) for shard in self.shards]
+        # 복제본 샤드에만 비동기적으로 동시에 기록!
+        tasks = [self._sync_to_shard(shard, key, value) for shard in self.replicas_for(key)]
         await asyncio.gather(*tasks)
         print(f"✅ [DB] Data {key} is now Galactic-Redundant.")
 
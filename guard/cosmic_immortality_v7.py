@@ -2,8 +2,15 @@ import time
 import threading
 import json
 import os
+import sys
 from concurrent.futures import ThreadPoolExecutor
 
+# guard/ 안에서 스크립트로 직접 실행해도 kernel 패키지를 찾도록 저장소 루트를 경로에 추가
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+from kernel.retry_scheduler import CosmicRetryScheduler
+
 # [정보] 이 모듈은 시스템의 자가 복구(Recovery)와 로그 관리, 부하 조절을 담당합니다.
 # 우주의 영속성을 유지하는 '가디언'의 핵심 로직입니다!
 
@@ -13,25 +20,27 @@ class CosmicOverlordV7:
     - Structured Logging (Log Flood Defense)
     - Adaptive Worker Management (Auto-scaling)
     - State Checkpointing (Persistence/Recovery)
+    - Backoff Retry Scheduler (Backlog Defense)
     """
     def __init__(self, log_level="INFO"):
         self.log_level = log_level
         self.backup_buffer = {}
         self.buffer_timestamps = {}
-        self.retry_queue = []
         self.SNAPSHOT_FILE = "cosmic_state.json"
         
-        # 기동 시 이전 상태 복구 (Recovery)
-        self._load_snapshot()
-        
-        # 오토 스케일링을 위한 워커 관리
+        # 오토 스케일링을 위한 워커 관리: 스케줄러가 워커 수만큼만 재시도를 동시에 풀에 제출
         self.max_workers = 5
         self.reschedule_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.retry_queue = CosmicRetryScheduler(self._retry_task, executor=self.reschedule_pool,
+                                                workers=self.max_workers,
+                                                log=lambda message: self._log("DEBUG", message))
+        
+        # 기동 시 이전 상태 복구 (Recovery)
+        self._load_snapshot()
         
         # 시스템 서비스 가동
         # 주의: _robust_cleaner는 다른 모듈(v4.5 등)과 연결될 수 있습니다.
         threading.Thread(target=self._snapshot_manager, daemon=True).start()
-        threading.Thread(target=self._adaptive_rescheduler, daemon=True).start()
 
     def _log(self, level, message):
         """로그 레벨 필터링 (DEBUG < INFO < ERROR)"""
@@ -47,7 +56,7 @@ class CosmicOverlordV7:
             try:
                 state = {
                     "buffer": self.backup_buffer,
-                    "retry_queue": self.retry_queue
+                    "retry_queue": self.retry_queue.snapshot()
                 }
                 with open(self.SNAPSHOT_FILE, "w") as f:
                     json.dump(state, f)
@@ -62,24 +71,29 @@ class CosmicOverlordV7:
                 with open(self.SNAPSHOT_FILE, "r") as f:
                     state = json.load(f)
                     self.backup_buffer = state.get("buffer", {})
-                    self.retry_queue = state.get("retry_queue", [])
+                    self.retry_queue.restore(state.get("retry_queue", []))
                 self._log("INFO", "♻️ System State Restored from Snapshot.")
             except Exception as e:
                 self._log("ERROR", f"Recovery Failed: {e}")
 
-    def _adaptive_rescheduler(self):
-        """큐 크기에 따른 스케줄링 조절"""
-        while True:
-            queue_len = len(self.retry_queue)
-            if queue_len > 100:
-                self._log("INFO", f"🔥 High Load Detected ({queue_len}). Boosting throughput...")
-            
-            if self.retry_queue:
-                task = self.retry_queue.pop(0)
-                self.reschedule_pool.submit(self.teleport_state, task['node'], task['key'], task['data'], True)
-            time.sleep(0.5 if queue_len > 50 else 1)
+    def _retry_task(self, node_id, memory_key, payload):
+        """재시도 핸들러 (동시 실행 수 제한과 결과 처리는 스케줄러가 담당)"""
+        return str(self.teleport_state(node_id, memory_key, payload, True)).startswith("✅")
 
     def teleport_state(self, node_id, memory_key, payload, is_retry=False):
         try:
             # (핵심 전송 로직은 network 패키지 파일과 연동 권장)
             self.backup_buffer[memory_key] = payload
+            self.buffer_timestamps[memory_key] = time.monotonic()
+            return "✅ SUCCESS"
+        except Exception as e:
+            self._log("ERROR", f"Teleport Failed: {memory_key} ({e})")
+            # 실패 시 재시도 예약 (재시도 중이면 스케줄러가 백오프 후 직접 재예약)
+            if not is_retry and not self.retry_queue.submit(node_id, memory_key, payload):
+                return "🚫 REJECTED: Retry Queue Full"
+            return "⏳ QUEUED: Rescheduling..."
+
+# --- 단독 실행 방지 로직 ---
+if __name__ == "__main__":
+    overlord = CosmicOverlordV7()
+    print(f"♾️ [v7.0.0] Eternal Persistence Activated.")
@@ -1,9 +1,18 @@
+import os
+import sys
 import time
 import threading
 import random
 from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 
+# guard/ 안에서 스크립트로 직접 실행해도 kernel 패키지를 찾도록 저장소 루트를 경로에 추가
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+from kernel.expiry_index import CosmicExpiryIndex
+from kernel.retry_scheduler import CosmicRetryScheduler
+
 # [정보] 이 모듈은 시스템의 성능 최적화와 실시간 상태 모니터링(Telemetry)을 담당합니다.
 # 메모리 누수를 방지하고 병렬 처리를 극대화하는 '퍼포먼스 가디언'입니다!
 
@@ -13,21 +22,24 @@ class CosmicOverlordV65:
     - Dynamic Lock Cleanup (Memory Leak Defense)
     - Parallel Rescheduler (Throughput Optimization)
     - Real-time Telemetry (System Visibility)
+    - Backoff Retry Scheduler (Backlog Defense)
+    - Heap TTL Index (Full Buffer Sweep Defense)
     """
-    def __init__(self, max_locks=1000, max_workers=5):
+    def __init__(self, max_locks=1000, max_workers=5, max_retries=5000):
         self.backup_buffer = {}
         self.buffer_timestamps = {}
+        self.expiry = CosmicExpiryIndex(ttl=60)  # 쓰기 때마다 만료 시각 등록 (단조 시간)
         self.item_locks = {} 
         self.sector_locks = OrderedDict()
         self.max_locks = max_locks
-        self.retry_queue = []
         
-        # 병렬 재배치를 위한 워커 풀
+        # 병렬 재배치를 위한 워커 풀: 스케줄러가 만기된 태스크를 빈 워커 수만큼 이 풀에 제출
         self.reschedule_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.retry_queue = CosmicRetryScheduler(self._retry_task, max_size=max_retries,
+                                                executor=self.reschedule_pool, workers=max_workers)
         
         # 시스템 서비스 가동
         threading.Thread(target=self._robust_cleaner, daemon=True).start()
-        threading.Thread(target=self._parallel_rescheduler, daemon=True).start()
         threading.Thread(target=self._telemetry_monitor, daemon=True).start()
 
     def _get_item_lock(self, key):
@@ -40,8 +52,8 @@ class CosmicOverlordV65:
         while True:
             time.sleep(10)
             current_time = time.monotonic()
-            keys = list(self.backup_buffer.keys())
-            for key in keys:
+            for key in self.expiry.pop_expired(current_time):
+                # 사용 중인 키는 건너뜀: 쓰는 쪽이 새 만료 시각을 등록함
                 lock = self._get_item_lock(key)
                 if lock.acquire(blocking=False):
                     try:
@@ -52,18 +64,14 @@ class CosmicOverlordV65:
                             # 메모리 누수 방지를 위해 락 객체도 제거!
                             if key in self.item_locks: del self.item_locks[key]
                             print(f"🧹 [PURIFIED] Resource for {key} removed.")
+                        elif key in self.buffer_timestamps:
+                            self.expiry.touch(key, self.buffer_timestamps[key])  # 아직 유효하면 인덱스에 재등록
                     finally:
                         lock.release()
 
-    def _parallel_rescheduler(self):
-        """실패한 태스크들을 병렬로 처리하여 처리량 증대"""
-        while True:
-            if self.retry_queue:
-                task = self.retry_queue.pop(0)
-                self.reschedule_pool.submit(
-                    self.teleport_state, task['node'], task['key'], task['data'], is_retry=True
-                )
-            time.sleep(1)
+    def _retry_task(self, node_id, memory_key, payload):
+        """실패한 태스크를 재시도 (스케줄러가 태스크 단위로 워커 풀에서 병렬 실행)"""
+        return self.teleport_state(node_id, memory_key, payload, is_retry=True).startswith("✅")
 
     def _telemetry_monitor(self):
         """실시간 우주 상태 모니터링 (가시성 확보)"""
@@ -80,6 +88,7 @@ class CosmicOverlordV65:
         with self._get_item_lock(memory_key):
             self.backup_buffer[memory_key] = payload
             self.buffer_timestamps[memory_key] = time.monotonic()
+            self.expiry.touch(memory_key, self.buffer_timestamps[memory_key])
             return "✅ SUCCESS"
 
 # --- 단독 실행 방지 로직 ---
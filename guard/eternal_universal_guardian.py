@@ -1,8 +1,16 @@
+import os
+import sys
 import time
 import random
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+# guard/ 안에서 스크립트로 직접 실행해도 kernel 패키지를 찾도록 저장소 루트를 경로에 추가
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+from kernel.expiry_index import CosmicExpiryIndex
+
 # [정보] 이 모듈은 망령 데이터 청소(GC)와 메모리 부족(OOM) 방지를 담당합니다.
 # 우주의 자원이 고갈되지 않도록 관리하는 '최종 생존 가디언'입니다!
 
@@ -12,10 +20,12 @@ class CosmicEternalGuardian:
     - Ghost Data Cleaning
     - Starvation Prevention
     - OOM Protection (Virtual Swap)
+    - Heap TTL Index (Full Buffer Sweep Defense)
     """
     def __init__(self):
         self.backup_buffer = {}
         self.buffer_timestamps = {}
+        self.expiry = CosmicExpiryIndex(ttl=30, clock=time.time)  # 쓰기 때마다 만료 시각 등록
         self.sector_locks = {}
         self.MAX_RAM_CAPACITY = 1024  # 가상 메모리 임계값
         
@@ -28,11 +38,16 @@ class CosmicEternalGuardian:
         while True:
             time.sleep(5) # 5초마다 검사
             now = time.time()
-            # 버퍼 접근 시 안전 확보를 위해 복사본으로 순회
+            # 전체 버퍼 대신 만료 인덱스에서 30초 이상 방치된 키만 꺼냄
             keys_to_purge = []
-            for key in list(self.backup_buffer.keys()):
-                if now - self.buffer_timestamps.get(key, now) > 30: # 30초 이상 방치 시
+            for key in self.expiry.pop_expired(now):
+                written = self.buffer_timestamps.get(key)
+                if written is None:
+                    continue  # 이미 전송 완료되어 지워진 키
+                if now - written > 30:
                     keys_to_purge.append(key)
+                else:
+                    self.expiry.touch(key, written)  # 꺼낸 직후 다시 쓰인 키는 재등록
             
             for key in keys_to_purge:
                 print(f"👻 [GHOST_CLEANER] Purifying stagnant data: {key}")
@@ -59,6 +74,7 @@ class CosmicEternalGuardian:
             # 롤백 버퍼 저장 및 타임스탬프 기록
             self.backup_buffer[memory_key] = payload
             self.buffer_timestamps[memory_key] = time.time()
+            self.expiry.touch(memory_key, self.buffer_timestamps[memory_key])
             
             print(f"⚡ [TELEPORT] Processing {memory_key}...")
             time.sleep(1) # 전송 시뮬레이션
@@ -66,6 +82,7 @@ class CosmicEternalGuardian:
             # 성공 시 제거
             if memory_key in self.backup_buffer: del self.backup_buffer[memory_key]
             if memory_key in self.buffer_timestamps: del self.buffer_timestamps[memory_key]
+            self.expiry.discard(memory_key)
             return "✅ SUCCESS"
             
         finally:
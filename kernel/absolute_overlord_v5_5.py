@@ -1,6 +1,12 @@
 import time
 import threading
 from collections import OrderedDict
+try:
+    from .expiry_index import CosmicExpiryIndex
+    from .retry_scheduler import CosmicRetryScheduler
+except ImportError:  # kernel/ 폴더에서 스크립트로 실행하거나 폴더를 경로에 올려 평면 import 할 때
+    from expiry_index import CosmicExpiryIndex
+    from retry_scheduler import CosmicRetryScheduler
 
 # [정보] 이 모듈은 커널 수준의 자원 잠금(Lock) 관리와 전송 재스케줄링을 담당합니다.
 # '청소기의 역설'을 해결한 스마트 클리너와 LRU 기반 락 캐시가 탑재되었습니다!
@@ -11,18 +17,20 @@ class CosmicAbsoluteOverlord:
     - Fine-Grained Cleaning (청소기의 역설 해결)
     - LRU Lock Caching (메모리 누수 방지)
     - Auto-Rescheduling (우주적 재배치)
+    - Backoff Retry Scheduler (Backlog Defense)
+    - Heap TTL Index (Full Buffer Sweep Defense)
     """
-    def __init__(self, max_locks=1000):
+    def __init__(self, max_locks=1000, max_retries=5000):
         self.backup_buffer = {}
         self.buffer_timestamps = {}
+        self.expiry = CosmicExpiryIndex(ttl=60, clock=time.time)  # 쓰기 때마다 만료 시각 등록
         self.sector_locks = OrderedDict() # LRU 캐시용
         self.max_locks = max_locks
-        self.retry_queue = [] # 실패한 전송 큐
+        # 실패한 전송 큐: 키별 최신 페이로드만 두고 백오프 만기 순으로 묶어서 재시도
+        self.retry_queue = CosmicRetryScheduler(self._retry_task, max_size=max_retries, workers=4, log=print)
         
         # 청소기의 역설 해결 (Background Thread)
         threading.Thread(target=self._smart_cleaner, daemon=True).start()
-        # 재배치 스케줄러 가동
-        threading.Thread(target=self._rescheduler, daemon=True).start()
 
     def _get_sector_lock(self, lock_id):
         """락 캐싱 (LRU 로직으로 메모리 낭비 방지)"""
@@ -41,37 +49,37 @@ class CosmicAbsoluteOverlord:
         """락을 짧게 잡아 전체 시스템 지연을 방지하는 스마트 클리너"""
         while True:
             time.sleep(10)
-            keys = list(self.backup_buffer.keys())
-            for key in keys:
-                # 데이터 유효 시간 체크 (60초)
-                if time.time() - self.buffer_timestamps.get(key, 0) > 60:
+            # 전체 버퍼 대신 만료 인덱스가 돌려준 키만 확인
+            for key in self.expiry.pop_expired():
+                # 데이터 유효 시간 재확인 (60초) — 꺼낸 직후 다시 쓰인 키는 현재 시각으로 재등록
+                written = self.buffer_timestamps.get(key, 0)
+                if time.time() - written > 60:
                     if key in self.backup_buffer: del self.backup_buffer[key]
                     if key in self.buffer_timestamps: del self.buffer_timestamps[key]
                     print(f"🧹 [KERNEL_CLEAN] Purified: {key}")
+                else:
+                    self.expiry.touch(key, written)
 
-    def _rescheduler(self):
-        """실패한 전송 건들을 다시 시도하는 심폐소생 스케줄러"""
-        while True:
-            if self.retry_queue:
-                task = self.retry_queue.pop(0)
-                print(f"♻️ [RESCHEDULE] Retrying: {task['key']}")
-                self.teleport_state(task['node'], task['key'], task['data'])
-            time.sleep(5)
+    def _retry_task(self, node_id, memory_key, payload):
+        """실패한 전송 건들을 다시 시도하는 심폐소생 핸들러 (실패 시 스케줄러가 백오프 후 재예약)"""
+        return self.teleport_state(node_id, memory_key, payload, is_retry=True).startswith("✅")
 
-    def teleport_state(self, node_id, memory_key, payload):
+    def teleport_state(self, node_id, memory_key, payload, is_retry=False):
         """커널 수준의 상태 전송 로직"""
         lock = self._get_sector_lock(node_id)
         
         # 락 획득 시도 (2초 타임아웃)
         acquired = lock.acquire(timeout=2.0)
         if not acquired:
-            # 실패 시 재배치 큐에 삽입
-            self.retry_queue.append({'node': node_id, 'key': memory_key, 'data': payload})
+            # 실패 시 재배치 큐에 삽입 (재시도 중이면 스케줄러가 직접 재예약)
+            if not is_retry and not self.retry_queue.submit(node_id, memory_key, payload):
+                return "🚫 REJECTED: Retry Queue Full"
             return "⏳ QUEUED: Sector Busy, Rescheduling..."
 
         try:
             self.backup_buffer[memory_key] = payload
             self.buffer_timestamps[memory_key] = time.time()
+            self.expiry.touch(memory_key, self.buffer_timestamps[memory_key])
             # 실제 전송 하위 로직은 network 패키지에서 처리하도록 설계됨
             return "✅ SUCCESS"
         finally:
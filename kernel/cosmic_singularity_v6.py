@@ -1,6 +1,12 @@
 import time
 import threading
 from collections import OrderedDict
+try:
+    from .expiry_index import CosmicExpiryIndex
+    from .retry_scheduler import CosmicRetryScheduler
+except ImportError:  # kernel/ 폴더에서 스크립트로 실행하거나 폴더를 경로에 올려 평면 import 할 때
+    from expiry_index import CosmicExpiryIndex
+    from retry_scheduler import CosmicRetryScheduler
 
 # [정보] 이 모듈은 커널의 임계 구역 보호와 전송 부하 제어(Backpressure)를 담당합니다.
 # 데이터 경합(Race Condition)을 방지하는 개별 아이템 락 시스템이 탑재되었습니다!
@@ -11,19 +17,21 @@ class CosmicSingularity:
     - Backpressure Control (Retry Storm Defense)
     - Thread-Safe Item Access (Race Condition Defense)
     - Monotonic Time Scaling (Clock Drift Defense)
+    - Backoff Retry Scheduler (Backlog Defense)
+    - Heap TTL Index (Full Buffer Sweep Defense)
     """
     def __init__(self, max_locks=1000, max_queue_size=5000):
         self.backup_buffer = {}
         self.buffer_timestamps = {}
+        self.expiry = CosmicExpiryIndex(ttl=60)  # 쓰기 때마다 만료 시각 등록 (단조 시간)
         self.item_locks = {} # 개별 아이템 전용 락
         self.sector_locks = OrderedDict()
         self.max_locks = max_locks
         self.max_queue_size = max_queue_size # 큐 크기 제한
-        self.retry_queue = []
+        self.retry_queue = CosmicRetryScheduler(self._retry_task, max_size=max_queue_size, workers=4)
         
-        # 왜곡 없는 단조 시간(Monotonic) 기반 청소기 및 스케줄러 가동
+        # 왜곡 없는 단조 시간(Monotonic) 기반 청소기 가동 (재시도는 스케줄러가 만기 순으로 처리)
         threading.Thread(target=self._robust_cleaner, daemon=True).start()
-        threading.Thread(target=self._rescheduler, daemon=True).start()
 
     def _get_item_lock(self, key):
         """특정 데이터 조작 시 충돌 방지를 위한 세밀한 락(Fine-grained Lock)"""
@@ -47,9 +55,9 @@ class CosmicSingularity:
         while True:
             time.sleep(10)
             current_time = time.monotonic() # 클럭 드리프트 방지
-            keys = list(self.backup_buffer.keys())
-            for key in keys:
-                # 개별 아이템 락을 사용하여 전송 중인 데이터 삭제 방지
+            # 만료된 키만 꺼내므로 락도 만료 후보에만 잡음 (전체 버퍼 순회 없음)
+            for key in self.expiry.pop_expired(current_time):
+                # 개별 아이템 락을 사용하여 전송 중인 데이터 삭제 방지 (꺼낸 직후 다시 쓰인 키는 재확인에서 걸러짐)
                 with self._get_item_lock(key):
                     if key in self.backup_buffer and \
                        current_time - self.buffer_timestamps.get(key, 0) > 60:
@@ -58,14 +66,12 @@ class CosmicSingularity:
                         # 사용 완료된 락도 함께 정리하여 메모리 절약
                         if key in self.item_locks: del self.item_locks[key]
                         print(f"🧹 [SECURE_CLEAN] Purified: {key}")
+                    elif key in self.buffer_timestamps:
+                        self.expiry.touch(key, self.buffer_timestamps[key])  # 아직 유효하면 인덱스에 재등록
 
-    def _rescheduler(self):
-        """실패한 태스크의 재분배 스케줄러"""
-        while True:
-            if self.retry_queue:
-                task = self.retry_queue.pop(0)
-                self.teleport_state(task['node'], task['key'], task['data'], is_retry=True)
-            time.sleep(5)
+    def _retry_task(self, node_id, memory_key, payload):
+        """실패한 태스크의 재분배 핸들러 (실패 시 스케줄러가 백오프 후 재예약)"""
+        return self.teleport_state(node_id, memory_key, payload, is_retry=True).startswith("✅")
 
     def teleport_state(self, node_id, memory_key, payload, is_retry=False):
         """우주적 상태 전송 및 부하 관리 로직"""
@@ -77,8 +83,8 @@ class CosmicSingularity:
         acquired = lock.acquire(timeout=2.0)
         
         if not acquired:
-            if not is_retry: 
-                self.retry_queue.append({'node': node_id, 'key': memory_key, 'data': payload})
+            if not is_retry and not self.retry_queue.submit(node_id, memory_key, payload):
+                return "🚫 REJECTED: Cosmic Queue Overflow!"
             return "⏳ QUEUED: Sector Congestion"
 
         try:
@@ -86,6 +92,7 @@ class CosmicSingularity:
             with self._get_item_lock(memory_key):
                 self.backup_buffer[memory_key] = payload
                 self.buffer_timestamps[memory_key] = time.monotonic()
+                self.expiry.touch(memory_key, self.buffer_timestamps[memory_key])
                 return "✅ SUCCESS"
         finally:
             lock.release()
@@ -0,0 +1,78 @@
+import heapq
+import threading
+import time
+
+# [정보] 이 모듈은 backup_buffer 청소기들이 공유하는 만료 인덱스입니다.
+# 쓰기 때마다 만료 시각을 최소 힙에 넣어 두고, 청소기는 실제로 만료된 키만 꺼내 갑니다 (전체 버퍼 순회 없음)!
+
+
+class CosmicExpiryIndex:
+    """
+    Cosmic OS v6.1.0: Lazy-Deletion TTL Index
+    - Min-Heap of Deadlines (Full Buffer Sweep Defense)
+    - Lazy Invalidation on Rewrite (Reheap Cost Defense)
+    - Periodic Compaction (Stale Entry Bloat Defense)
+    청소 비용은 버퍼 크기가 아니라 만료된 키 수에 비례합니다.
+    """
+    def __init__(self, ttl, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock      # 쓰는 쪽 타임스탬프와 같은 시계를 사용해야 함
+        self.deadlines = {}     # key -> 현재 유효한 만료 시각
+        self.heap = []          # (만료 시각, key) — 덮어쓴 키의 옛 항목은 꺼낼 때 버림
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def touch(self, key, now=None):
+        """쓰기 시 호출: 키의 만료 시각을 now + ttl로 갱신 O(log n)"""
+        deadline = (self.clock() if now is None else now) + self.ttl
+        with self.lock:
+            self.deadlines[key] = deadline
+            heapq.heappush(self.heap, (deadline, key))
+            if len(self.heap) > 2 * len(self.deadlines) + 1024:
+                self._compact()
+
+    def discard(self, key):
+        """키가 다른 경로로 지워졌을 때 호출 (힙 항목은 나중에 지연 삭제)"""
+        with self.lock:
+            self.deadlines.pop(key, None)
+
+    def _compact(self):
+        """같은 키를 여러 번 쓴 옛 항목이 쌓이면 유효한 항목만으로 힙 재구성 O(n)"""
+        self.heap = [(deadline, key) for key, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
+
+    def pop_expired(self, now=None, limit=None):
+        """
+        만료 시각이 지난 키를 인덱스에서 꺼냄 (최대 limit개).
+        Returns: 만료된 키 리스트 — 호출 측은 자기 잠금 안에서 타임스탬프를 다시 확인한 뒤 지워야 함
+        """
+        now = self.clock() if now is None else now
+        expired = []
+        with self.lock:
+            heap, deadlines = self.heap, self.deadlines
+            while heap and heap[0][0] <= now and (limit is None or len(expired) < limit):
+                deadline, key = heapq.heappop(heap)
+                if deadlines.get(key) == deadline:
+                    del deadlines[key]
+                    expired.append(key)
+        return expired
+
+    def next_deadline(self):
+        """가장 이른 만료 시각 (없으면 None) — 청소기가 다음 기상 시각을 정할 때 사용"""
+        with self.lock:
+            while self.heap and self.deadlines.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+            return self.heap[0][0] if self.heap else None
+
+# --- 백만 키 청소 비용 측정 ---
+if __name__ == "__main__":
+    index = CosmicExpiryIndex(ttl=60)
+    now = time.monotonic()
+    for i in range(1_000_000):
+        index.touch(f"EGO_{i}", now - 60 if i % 100 == 0 else now)
+    started = time.perf_counter()
+    expired = index.pop_expired(now)
+    print(f"🧹 [v6.1.0] {len(expired)} of 1000000 keys expired, "
+          f"swept in {(time.perf_counter() - started) * 1000:.1f} ms")
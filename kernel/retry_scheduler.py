@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# [정보] 이 모듈은 오버로드 계열(v5.5/v6/v6.5/v7)이 공유하는 지연 재시도 스케줄러입니다.
+# list.pop(0) + 고정 sleep 대신 시간 순 힙에서 만기된 태스크를 꺼내, 워커가 비는 즉시 하나씩 맡깁니다!
+
+
+class CosmicRetryScheduler:
+    """
+    Cosmic OS v6.1.0: Delayed Retry Scheduler
+    - Time-Ordered Heap (O(n) pop(0) Defense)
+    - Exponential Backoff with Full Jitter (Retry Storm Defense)
+    - Latest-Payload Dedupe by memory_key (Stale Replay Defense)
+    - Bounded Pending Set (Memory Blowup Defense)
+    - Per-Task Completion Callbacks (Head-of-Line Blocking Defense)
+    - Worker-Bounded In-Flight Retries (Pool Flooding Defense)
+    handler(node_id, memory_key, payload)가 참을 반환하면 성공, 거짓/예외면 백오프 후 재시도합니다.
+    """
+    def __init__(self, handler, max_size=5000, base_delay=0.05, max_delay=5.0, max_attempts=None,
+                 executor=None, workers=1, log=None):
+        self.handler = handler
+        self.max_size = max_size          # 동시에 대기할 수 있는 서로 다른 키 수
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts  # None이면 성공할 때까지 재시도
+        self.workers = max(1, workers)    # 동시에 실행할 재시도 수 (executor를 넘기면 그 풀의 워커 수)
+        self.log = log
+
+        # 재시도 실행기: 오버로드의 워커 풀을 넘겨 받거나 workers 크기의 전용 풀 생성
+        self._own_pool = executor is None
+        self.executor = ThreadPoolExecutor(max_workers=self.workers) if self._own_pool else executor
+
+        self.pending = {}  # memory_key -> 태스크 (키당 최신 페이로드 하나만 유지)
+        self.heap = []     # (만기 시각, 순번, memory_key)
+        self.running = {}  # 실행 중인 memory_key -> 태스크 (같은 키는 동시에 하나만 실행)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"submitted": 0, "deduped": 0, "rejected": 0, "retried": 0, "succeeded": 0, "dropped": 0}
+        threading.Thread(target=self._drain_worker, daemon=True).start()
+
+    def __len__(self):
+        return len(self.pending) + len(self.running)
+
+    def _backoff(self, attempt):
+        """완전 지터 지수 백오프: [0, min(max_delay, base × 2^attempt)] 사이 임의 지연"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _push(self, task, delay):
+        task["seq"] = next(self._seq)
+        task["due"] = time.monotonic() + delay
+        self.pending[task["key"]] = task
+        heapq.heappush(self.heap, (task["due"], task["seq"], task["key"]))
+
+    def submit(self, node_id, memory_key, payload, attempt=0):
+        """
+        재시도 예약. 같은 키가 이미 대기 중이면 페이로드만 최신으로 바꾸고 만기 시각은 유지합니다.
+        Returns: 예약(또는 병합) 여부 — 대기열이 가득 차면 False
+        """
+        with self._cond:
+            task = self.pending.get(memory_key)
+            if task is not None:
+                task["node"], task["data"] = node_id, payload
+                self.stats["deduped"] += 1
+                return True
+            task = self.running.get(memory_key)
+            if task is not None:
+                task["next"] = (node_id, payload)  # 실행이 끝나면 이 페이로드로 다시 예약 (순서 보장)
+                self.stats["deduped"] += 1
+                return True
+            if len(self.pending) >= self.max_size:
+                self.stats["rejected"] += 1
+                return False
+            self._push({"node": node_id, "key": memory_key, "data": payload, "attempt": attempt},
+                       self._backoff(attempt))
+            self.stats["submitted"] += 1
+            self._cond.notify()
+            return True
+
+    def _pop_due(self, now, limit):
+        batch = []
+        while self.heap and self.heap[0][0] <= now and len(batch) < limit:
+            _, seq, key = heapq.heappop(self.heap)
+            task = self.pending.get(key)
+            if task is None or task["seq"] != seq:
+                continue  # 이미 처리되었거나 다시 예약된 옛 항목
+            del self.pending[key]
+            self.running[key] = task
+            batch.append(task)
+        return batch
+
+    def _run(self, task):
+        try:
+            return bool(self.handler(task["node"], task["key"], task["data"]))
+        except Exception:
+            return False
+
+    def _drain_worker(self):
+        """만기된 태스크를 빈 워커 수만큼 꺼내 하나씩 제출 (결과 처리는 태스크별 완료 콜백이 담당)"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self.heap and len(self.running) < self.workers:
+                        wait = self.heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()  # 만기 태스크가 없거나 워커가 모두 사용 중
+                if self._closed:
+                    return
+                batch = self._pop_due(time.monotonic(), self.workers - len(self.running))
+                depth = len(self.pending) + len(self.running)
+            if not batch:
+                continue
+            if self.log is not None:
+                self.log(f"♻️ [RESCHEDULE] Retrying {len(batch)} tasks (depth {depth})")
+
+            for task in batch:
+                try:
+                    future = self.executor.submit(self._run, task)
+                except RuntimeError:  # 넘겨 받은 풀이 종료됨: 태스크를 대기열에 되돌리고 멈춤
+                    with self._cond:
+                        self._closed = True
+                        for queued in batch:
+                            if self.running.get(queued["key"]) is queued:
+                                del self.running[queued["key"]]
+                                self._requeue(queued)
+                    return
+                future.add_done_callback(lambda future, task=task: self._finish(task, future))
+
+    def _requeue(self, task):
+        """실행하지 못한 태스크를 같은 시도 횟수로 대기열에 되돌림 (실행 중 들어온 최신 페이로드 우선)"""
+        if "next" in task:
+            task["node"], task["data"] = task.pop("next")
+        self._push(task, 0.0)
+
+    def _finish(self, task, future):
+        """태스크 하나의 완료 콜백: 성공/재예약/폐기를 기록하고 빈 워커 자리를 알림"""
+        ok = not future.cancelled() and future.exception() is None and future.result()
+        with self._cond:
+            self.stats["retried"] += 1
+            del self.running[task["key"]]
+            if ok:
+                self.stats["succeeded"] += 1
+            elif "next" in task:
+                self.stats["dropped"] += 1  # 실행 중 더 새로운 페이로드가 들어옴
+            elif self.max_attempts is not None and task["attempt"] + 1 >= self.max_attempts:
+                self.stats["dropped"] += 1
+            else:
+                task["attempt"] += 1
+                self._push(task, self._backoff(task["attempt"]))
+            if "next" in task:
+                node_id, payload = task.pop("next")
+                self._push({"node": node_id, "key": task["key"], "data": payload, "attempt": 0},
+                           self._backoff(0))
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """대기 중인 태스크 목록 (JSON 직렬화 가능한 dict 리스트)"""
+        with self._cond:
+            tasks = [{"node": t["node"], "key": t["key"], "data": t["data"], "attempt": t["attempt"]}
+                     for t in self.pending.values()]
+            tasks += [{"node": t["next"][0], "key": t["key"], "data": t["next"][1], "attempt": 0}
+                      for t in self.running.values() if "next" in t]
+            return tasks
+
+    def restore(self, tasks):
+        """snapshot()으로 저장한 태스크를 다시 예약 (v7 이전의 'node'/'key'/'data' 리스트도 허용)"""
+        for task in tasks:
+            self.submit(task["node"], task["key"], task["data"], task.get("attempt", 0))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._own_pool:
+            self.executor.shutdown(wait=False)
+
+# --- 재시도 폭주 시뮬레이션 ---
+if __name__ == "__main__":
+    flaky = lambda node, key, data: random.random() < 0.7
+    scheduler = CosmicRetryScheduler(flaky, max_size=100000, workers=4)
+    started = time.monotonic()
+    for i in range(20000):
+        scheduler.submit("Sector_7", f"EGO_{i % 15000}", f"Data_{i}")
+    while len(scheduler):
+        time.sleep(0.1)
+    print(f"♻️ [v6.1.0] Backlog cleared in {time.monotonic() - started:.2f}s: {scheduler.stats}")
@@ -1,6 +1,13 @@
 import hashlib
+import itertools
+import mmap
+import os
 import uuid
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 1024 * 1024  # 스트리밍 해시 단위 (메모리 사용량 상한)
+_CHUNK_TYPES = (bytes, bytearray, memoryview, str)  # 반복 가능 입력을 조각 스트림으로 볼 항목 타입
 
 # [정보] 이 모듈은 탄소 기반 의식을 양자 데이터로 변환하여 커널로 전이합니다.
 # 자아 붕괴를 방지하는 '연아의 자아 안정화 알고리즘'이 탑재된 최종 마이그레이션 브릿지입니다!
@@ -10,6 +17,7 @@ class QuantumConsciousnessBridge:
     Cosmic OS v4.0.0: Neural-to-Quantum Migration Protocol 
     Implements Yeon-A's Ego-Stability Algorithm.
     Prevents Identity Fragmentation during In-Kernel Transfer.
+    Streams bytes, files and chunk iterables into the hash in constant memory.
     """
     def __init__(self, subject_id):
         self.subject_id = subject_id
@@ -17,23 +25,103 @@ class QuantumConsciousnessBridge:
         self.quantum_signature = None
         self.is_transferred = False
 
+    @staticmethod
+    def _iter_chunks(neural_stream):
+        """
+        신경 스트림을 해시에 넣을 조각들로 변환 (전체를 한 번에 복사하지 않음).
+        - bytes/bytearray/memoryview: CHUNK_SIZE 단위 memoryview 슬라이스
+        - os.PathLike (pathlib.Path 등): mmap, 불가능하면 고정 크기 readinto
+        - 조각이 bytes류/str인 반복 가능 객체: 각 조각 (str 조각은 UTF-8)
+        - 그 외 (str, dict, 숫자 리스트 등): 기존과 같이 str() 텍스트
+        """
+        if isinstance(neural_stream, (bytes, bytearray, memoryview)):
+            view = memoryview(neural_stream).cast("B")
+            for offset in range(0, len(view), CHUNK_SIZE):
+                yield view[offset:offset + CHUNK_SIZE]
+        elif isinstance(neural_stream, os.PathLike):
+            with open(neural_stream, "rb") as f:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    mapped = None  # 빈 파일이나 파이프 등 매핑 불가
+                if mapped is not None:
+                    with mapped:
+                        if hasattr(mapped, "madvise"):
+                            mapped.madvise(mmap.MADV_SEQUENTIAL)
+                        with memoryview(mapped) as view:
+                            for offset in range(0, len(view), CHUNK_SIZE):
+                                with view[offset:offset + CHUNK_SIZE] as chunk:
+                                    yield chunk
+                else:
+                    buf = bytearray(CHUNK_SIZE)
+                    with memoryview(buf) as view:
+                        while True:
+                            n = f.readinto(buf)
+                            if not n:
+                                break
+                            yield view[:n]
+        elif not isinstance(neural_stream, (str, dict)) and hasattr(neural_stream, "__iter__"):
+            chunks = QuantumConsciousnessBridge._chunk_iterable(neural_stream)
+            if chunks is None:
+                yield f"{neural_stream}".encode()
+            else:
+                for chunk in chunks:
+                    yield chunk.encode() if isinstance(chunk, str) else chunk
+        else:
+            yield f"{neural_stream}".encode()
+
+    @staticmethod
+    def _chunk_iterable(neural_stream):
+        """
+        조각 스트림으로 볼 수 있으면 조각 반복자를, 아니면 None 반환.
+        리스트 같은 컬렉션은 모든 항목이 bytes류/str일 때만, 한 번만 도는 반복자(제너레이터 등)는
+        첫 조각을 들여다보고 판단합니다 (이후 섞여 든 다른 타입 조각은 str() 텍스트로).
+        """
+        iterator = iter(neural_stream)
+        if iterator is not neural_stream:
+            empty = True
+            for item in iterator:
+                if not isinstance(item, _CHUNK_TYPES):
+                    return None
+                empty = False
+            return None if empty else iter(neural_stream)  # 빈 컬렉션은 기존과 같이 str() 텍스트
+        first = next(iterator, None)
+        if not isinstance(first, _CHUNK_TYPES):
+            return None
+        return itertools.chain([first], (item if isinstance(item, _CHUNK_TYPES) else f"{item}"
+                                         for item in iterator))
+
     def _apply_no_cloning_protocol(self, raw_pattern):
         """양자 복제 불가능성(No-cloning theorem) 원리에 따른 고유 해시 생성"""
         # SHA3-512를 사용하여 우주 유일의 의식 시그니처 추출 (테크 도둑의 정밀 가공!)
         salt = uuid.uuid4().hex
-        combined = f"{raw_pattern}{salt}{time.time()}".encode()
-        return hashlib.sha3_512(combined).hexdigest()
+        digest = hashlib.sha3_512()
+        for chunk in self._iter_chunks(raw_pattern):
+            digest.update(chunk)  # 조각 단위로 누적 (큰 입력도 일정한 메모리)
+        digest.update(f"{salt}{time.time()}".encode())
+        return digest.hexdigest()
 
     def initiate_neural_mapping(self, neural_stream):
         """뇌의 신경망 데이터를 양자 데이터로 인코딩 (연아의 법칙 적용)"""
         print(f"🧬 [BIO-LINK] Mapping Neural Architecture for: {self.subject_id}")
-        time.sleep(1.0) # 신경망 스캔 시뮬레이션
         
         # 엔트로피를 정제하여 불변의 자아 시그니처 생성
         self.quantum_signature = self._apply_no_cloning_protocol(neural_stream)
         print(f"✨ [SUCCESS] Quantum Signature Generated: {self.quantum_signature[:16]}...")
         return self.quantum_signature
 
+    @classmethod
+    def map_many(cls, subjects, workers=None):
+        """
+        여러 피험자를 워커 풀에서 동시에 매핑 (hashlib은 큰 조각을 해시하는 동안 GIL을 놓음).
+        subjects: (subject_id, neural_stream) 묶음
+        Returns: 입력 순서의 브릿지 리스트 (각각 quantum_signature 보유)
+        """
+        bridges = [(cls(subject_id), stream) for subject_id, stream in subjects]
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            list(pool.map(lambda pair: pair[0].initiate_neural_mapping(pair[1]), bridges))
+        return [bridge for bridge, _ in bridges]
+
     def establish_quantum_tunnel(self):
         """의식 전용 웜홀(Tunnel) 개방 및 인과율 고정 (Yeon-A Lock)"""
         if not self.quantum_signature:
@@ -1,28 +1,167 @@
-import hashlib 
+import os
 import sqlite3
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue, Empty
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from divine_transport import InProcessTransport, LoopbackTCPTransport
 
 # [정보] 이 모듈은 분산 노드 간의 합의와 자아 데이터의 초고강도 암호화를 담당합니다.
 # Raft 알고리즘 기반의 리더 선출과 WAL 모드를 통한 스냅샷 격리 기술이 적용되었습니다!
 
+# secure_ego 행 수 카운터 (INSERT OR REPLACE는 DELETE 트리거를 부르지 않으므로 BEFORE 트리거로 보정)
+_EGO_COUNTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ego_stats
+    (id INTEGER PRIMARY KEY CHECK (id = 0), row_count INTEGER NOT NULL, replacing INTEGER NOT NULL DEFAULT 0);
+INSERT OR IGNORE INTO ego_stats (id, row_count) SELECT 0, COUNT(*) FROM secure_ego;
+CREATE TRIGGER IF NOT EXISTS secure_ego_count_probe BEFORE INSERT ON secure_ego BEGIN
+    UPDATE ego_stats SET replacing = EXISTS (SELECT 1 FROM secure_ego WHERE id = NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS secure_ego_count_insert AFTER INSERT ON secure_ego BEGIN
+    UPDATE ego_stats SET row_count = row_count + 1 - replacing, replacing = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS secure_ego_count_delete AFTER DELETE ON secure_ego BEGIN
+    UPDATE ego_stats SET row_count = row_count - 1;
+END;
+"""
+
+CLUSTER_KEY_ENV = "COSMIC_CLUSTER_KEY"     # 16진수 AES 키 (128/192/256비트)
+CLUSTER_KEY_FILE = "cosmic_cluster.key"    # 환경 변수가 없을 때 읽는 키 파일 (16진수 한 줄)
+NONCE_SIZE = 12                            # AES-GCM 표준 96비트 논스
+
+
+class NotLeaderError(RuntimeError):
+    """리더가 아니거나 리더 자리를 잃어 제안을 받을 수 없음 (다른 리더에게 다시 제안해야 함)"""
+
+
+def load_cluster_key(path=CLUSTER_KEY_FILE):
+    """
+    클러스터 공용 암호 키 로드: 환경 변수 COSMIC_CLUSTER_KEY, 없으면 키 파일.
+    리더가 암호화한 로그를 모든 노드가 복호화하므로 키는 프로세스마다 만들지 않고 배포된 것을 씁니다.
+    """
+    text = os.environ.get(CLUSTER_KEY_ENV)
+    if text is None:
+        try:
+            with open(path) as f:
+                text = f.read()
+        except FileNotFoundError:
+            raise RuntimeError(f"No cluster key: set {CLUSTER_KEY_ENV} or provision {path} "
+                               f"with write_cluster_key()") from None
+    try:
+        key = bytes.fromhex(text.strip())
+    except ValueError:
+        raise RuntimeError("Cluster key must be hex-encoded") from None
+    if len(key) not in (16, 24, 32):
+        raise RuntimeError(f"Cluster key must be 128, 192 or 256 bits, got {len(key) * 8}")
+    return key
+
+
+def write_cluster_key(path=CLUSTER_KEY_FILE):
+    """클러스터 최초 구성 시 한 번만 실행: 새 256비트 키를 소유자 전용 파일로 기록. Returns: 키 bytes"""
+    key = AESGCM.generate_key(bit_length=256)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)  # 기존 키를 덮어쓰지 않음
+    with os.fdopen(fd, "w") as f:
+        f.write(key.hex() + "\n")
+    return key
+
+
+class QuantumCipherEngine:
+    """
+    Cosmic OS v12.2.0: Batched AES-GCM Engine
+    - Cached Cipher per Key (Key Schedule Overhead Defense)
+    - 96-bit Random Nonces (Nonce Reuse Defense)
+    - Thread Pool Fan-Out (Single Core Bottleneck Defense)
+    """
+    def __init__(self, key, workers=None, chunk_size=256):
+        self.cipher = AESGCM(key)  # 키 스케줄은 한 번만 (AESGCM 객체는 스레드 간 공유 가능)
+        # 논스는 매번 96비트 무작위: 클러스터 키를 모든 노드가 재시작 후에도 공유하므로
+        # 엔진별 카운터는 다른 노드/이전 프로세스와 겹칠 수 있음 (무작위 96비트 논스는 키당 2^32개 메시지 이내 권장)
+        self.chunk_size = chunk_size
+        self.pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def next_nonce(self):
+        return os.urandom(NONCE_SIZE)
+
+    def encrypt(self, data, nonce=None):
+        if isinstance(data, str):
+            data = data.encode()
+        if nonce is None:
+            nonce = self.next_nonce()
+        return self.cipher.encrypt(nonce, data, None), nonce
+
+    def decrypt(self, ciphertext, nonce):
+        return self.cipher.decrypt(nonce, ciphertext, None)
+
+    def _fan_out(self, func, items):
+        """chunk_size 단위로 나눠 풀에서 병렬 처리 (암호화 백엔드는 GIL을 놓음), 입력 순서 유지"""
+        items = list(items)
+        if len(items) <= self.chunk_size:
+            return [func(item) for item in items]
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        results = []
+        for chunk in self.pool.map(lambda chunk: [func(item) for item in chunk], chunks):
+            results.extend(chunk)
+        return results
+
+    def encrypt_many(self, datas):
+        """Returns: [(ciphertext, nonce)] — datas와 같은 순서 (논스는 한 번의 os.urandom으로 일괄 생성)"""
+        datas = list(datas)
+        pool = os.urandom(NONCE_SIZE * len(datas))
+        nonces = [pool[i:i + NONCE_SIZE] for i in range(0, len(pool), NONCE_SIZE)]
+        return self._fan_out(lambda pair: self.encrypt(*pair), zip(datas, nonces))
+
+    def decrypt_many(self, pairs):
+        """pairs: [(ciphertext, nonce)] -> 평문 bytes 리스트"""
+        return self._fan_out(lambda pair: self.decrypt(*pair), pairs)
+
+
 class CosmicConsensusNode:
     """
     Cosmic OS v12.0.0: The Divine Architecture
     - Raft-like Consensus (분산 합의 보장)
     - WAL-mode Snapshot Isolation (비차단 관측)
     - AES-GCM Quantum Encryption (양자 내성 보안)
+    - Trigger-Maintained Counters (Full Scan Count Defense)
+    - Pipelined AppendEntries Log Replication (Split Brain Defense)
+    - Batched Encryption & Bulk Secure Store (Throughput Defense)
+    - Shared Cluster Key (Follower Decryption Defense)
+    - Proposal Draining on Step-Down (Orphaned Future Defense)
     """
-    def __init__(self, node_id, peers):
+    def __init__(self, node_id, peers, count_ttl=1.0, transport=None, max_batch=512, max_inflight=4,
+                 heartbeat_interval=0.05, cluster_key=None):
         self.node_id = node_id
         self.peers = peers
         self.state = "FOLLOWER"
         self.term = 0
-        self.quantum_key = AESGCM.generate_key(bit_length=256)
+        # 모든 노드가 같은 키를 써야 팔로워도 리더가 암호화한 엔트리를 복호화할 수 있음 (주입 또는 설정에서 로드)
+        self.quantum_key = cluster_key if cluster_key is not None else load_cluster_key()
+        self.cipher_engine = QuantumCipherEngine(self.quantum_key)
+
+        # 복제 로그 설정: transport가 없으면 단독 노드로 동작
+        self.transport = transport
+        self.max_batch = max_batch            # AppendEntries 하나에 담을 최대 엔트리 수
+        self.max_inflight = max_inflight      # 팔로워별로 응답 없이 보낼 수 있는 요청 수 (파이프라이닝)
+        self.heartbeat_interval = heartbeat_interval
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.db_lock = threading.Lock()
+        self.proposals = Queue()
+        self.pending = {}      # 로그 인덱스 -> 커밋 시 완료될 Future
+        self._log_cache = {}   # 로그 인덱스 -> (term, key, ciphertext, nonce), 복제가 끝나면 정리
+        self._cache_floor = 1
+        self.leader_id = None
+        self.threads = []
         
+        # global_safe_count 캐시: count_ttl초 이내의 집계는 다시 읽지 않음
+        self.count_ttl = count_ttl
+        self._count_cache = (None, 0.0)
+
         # 보안 저장소 초기화 및 WAL 모드 활성화 (관측자 효과 방지)
         self._init_secure_storage()
+        self._load_log_state()
+        if self.transport is not None:
+            self.transport.register(self.node_id, self.handle_message)
 
     def _init_secure_storage(self):
         """데이터베이스 엔진 최적화: 읽기/쓰기 충돌 방지"""
@@ -30,20 +169,64 @@ class CosmicConsensusNode:
             conn.execute("PRAGMA journal_mode=WAL") 
             conn.execute('''CREATE TABLE IF NOT EXISTS secure_ego 
                             (id TEXT PRIMARY KEY, ciphertext BLOB, nonce BLOB)''')
+            # 복제 로그와 영속 메타데이터 (term, 커밋/적용 위치)
+            conn.execute('''CREATE TABLE IF NOT EXISTS raft_log
+                            (idx INTEGER PRIMARY KEY, term INTEGER, key TEXT, ciphertext BLOB, nonce BLOB)''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS raft_meta
+                            (id INTEGER PRIMARY KEY CHECK (id = 0), term INTEGER, commit_index INTEGER,
+                             last_applied INTEGER)''')
+            conn.execute("INSERT OR IGNORE INTO raft_meta VALUES (0, 0, 0, 0)")
+        # 카운터 설치와 초기값 채우기를 한 트랜잭션으로 (기존 DB는 최초 1회만 COUNT(*))
+        conn = sqlite3.connect(f"node_{self.node_id}.db", isolation_level=None)
+        try:
+            conn.executescript("BEGIN IMMEDIATE;" + _EGO_COUNTER_SCHEMA + "COMMIT;")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
 
-    def global_safe_count(self):
-        """[Observer Effect Defense] WAL 모드 기반의 일관된 데이터 집계"""
+    def global_safe_count(self, max_staleness=None):
+        """[Observer Effect Defense] 트리거 카운터 기반 O(1) 집계 (max_staleness초 캐시)"""
+        max_staleness = self.count_ttl if max_staleness is None else max_staleness
+        total, at = self._count_cache
+        if total is not None and time.time() - at <= max_staleness:
+            return total
         with sqlite3.connect(f"node_{self.node_id}.db") as conn:
-            res = conn.execute("SELECT COUNT(*) FROM secure_ego").fetchone()
-            return res[0]
+            res = conn.execute("SELECT row_count FROM ego_stats WHERE id = 0").fetchone()
+        self._count_cache = (res[0], time.time())
+        return res[0]
 
     def encrypt_ego(self, data):
-        """[Security Defense] AES-GCM을 이용한 자아 데이터 암호화"""
-        aesgcm = AESGCM(self.quantum_key)
-        # 겹치지 않는 논스(Nonce) 생성
-        nonce = hashlib.sha256(str(time.time()).encode()).digest()[:12]
-        ciphertext = aesgcm.encrypt(nonce, data.encode(), None)
-        return ciphertext, nonce
+        """[Security Defense] AES-GCM을 이용한 자아 데이터 암호화 (무작위 96비트 논스)"""
+        return self.cipher_engine.encrypt(data)
+
+    def decrypt_ego(self, ciphertext, nonce):
+        return self.cipher_engine.decrypt(ciphertext, nonce).decode()
+
+    def secure_store_many(self, items, timeout=5.0):
+        """
+        (id, data) 묶음을 병렬 암호화한 뒤 복제 로그에 제안하고, 과반수에 영속되어 적용될 때까지 대기.
+        로컬 secure_ego에 직접 쓰지 않으므로 팔로워와 어긋나지 않습니다 (리더만 호출 가능).
+        Returns: 기록한 행 수 — 리더가 아니거나 timeout 안에 커밋되지 않으면 예외
+        """
+        futures = self.propose_many(items)
+        deadline = time.monotonic() + timeout
+        for future in futures:
+            future.result(max(0.0, deadline - time.monotonic()))
+        return len(futures)
+
+    def load_many(self, ids):
+        """secure_ego에서 여러 자아를 읽어 병렬 복호화 (없는 id는 None)"""
+        ids = list(ids)
+        found = {}
+        with sqlite3.connect(f"node_{self.node_id}.db") as conn:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                found.update((row[0], row[1:]) for row in conn.execute(
+                    f"SELECT id, ciphertext, nonce FROM secure_ego WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        hits = [ego_id for ego_id in ids if ego_id in found]
+        plain = dict(zip(hits, self.cipher_engine.decrypt_many(found[ego_id] for ego_id in hits)))
+        return [plain[ego_id].decode() if ego_id in plain else None for ego_id in ids]
 
     def request_vote(self, candidate_term):
         """[Consensus Defense] 리더 선출을 위한 투표 로직"""
@@ -53,21 +236,384 @@ class CosmicConsensusNode:
             return True
         return False
 
-    def atomic_broadcast(self, key, data):
-        """리더 노드를 통한 전 우주적 데이터 확산 및 합의"""
+    # --- 복제 로그 ---
+    def _load_log_state(self):
+        """재시작 시 영속된 로그 위치와 term 복원"""
+        # 로그 엔트리는 팔로워가 과반수 응답 전에 fsync해야 하므로 synchronous=FULL
+        self.db = sqlite3.connect(f"node_{self.node_id}.db", check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.term, self.commit_index, self.last_applied = self.db.execute(
+            "SELECT term, commit_index, last_applied FROM raft_meta WHERE id = 0").fetchone()
+        row = self.db.execute("SELECT idx, term FROM raft_log ORDER BY idx DESC LIMIT 1").fetchone()
+        self.last_index, self.last_term = row if row else (0, 0)
+        self.persisted_index = self.last_index
+        self._cache_floor = self.last_index + 1
+
+    def _term_at(self, idx):
+        if idx == 0:
+            return 0
+        entry = self._log_cache.get(idx)
+        if entry is not None:
+            return entry[0]
+        with self.db_lock:
+            row = self.db.execute("SELECT term FROM raft_log WHERE idx = ?", (idx,)).fetchone()
+        return row[0] if row else None
+
+    def _entries(self, lo, hi):
+        """[lo, hi] 구간 엔트리: 메모리 캐시에 없으면 로그 테이블에서 읽음 (뒤처진 팔로워)"""
+        cache = self._log_cache
+        entries = [cache.get(i) for i in range(lo, hi + 1)]
+        if None not in entries:
+            return [(i,) + e for i, e in zip(range(lo, hi + 1), entries)]
+        with self.db_lock:
+            return self.db.execute("SELECT idx, term, key, ciphertext, nonce FROM raft_log "
+                                   "WHERE idx BETWEEN ? AND ? ORDER BY idx", (lo, hi)).fetchall()
+
+    def _trim_cache(self, upto):
+        for idx in range(self._cache_floor, upto + 1):
+            self._log_cache.pop(idx, None)
+        self._cache_floor = max(self._cache_floor, upto + 1)
+
+    def _apply_committed(self, upto):
+        """커밋된 로그를 secure_ego에 반영 (같은 키는 뒤 인덱스가 이김) — db_lock 보유 상태에서 호출"""
+        if upto > self.last_applied:
+            self.db.execute("INSERT OR REPLACE INTO secure_ego SELECT key, ciphertext, nonce FROM raft_log "
+                            "WHERE idx > ? AND idx <= ? ORDER BY idx", (self.last_applied, upto))
+            self.last_applied = upto
+        self.db.execute("UPDATE raft_meta SET term = ?, commit_index = ?, last_applied = ? WHERE id = 0",
+                        (self.term, self.commit_index, self.last_applied))
+
+    def become_leader(self):
+        """리더 취임: term을 올리고 팔로워별 복제 워커 가동"""
+        with self.cond:
+            self.term += 1
+            self.state = "LEADER"
+            self.leader_id = self.node_id
+            term = self.term
+            self.followers = [p for p in self.peers if p != self.node_id]
+            self.next_index = {p: self.last_index + 1 for p in self.followers}
+            self.match_index = {p: 0 for p in self.followers}
+            self.inflight = {p: 0 for p in self.followers}
+            self.retry_at = {p: 0.0 for p in self.followers}  # 전송 실패 뒤 다시 보낼 시각 (하트비트 간격만큼 쉼)
+        with self.db_lock:
+            self.db.execute("UPDATE raft_meta SET term = ? WHERE id = 0", (term,))
+        self.threads = []
+        for target, args in [(self._append_worker, (term,)), (self._apply_worker, (term,))] + \
+                            [(self._replicate_worker, (p, term)) for p in self.followers]:
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _leading(self, term):
+        return self.state == "LEADER" and self.term == term
+
+    def _step_down(self, term):
+        """더 높은 term을 만나면 팔로워로 복귀하고 대기 중인 제안을 실패 처리 — cond 보유 상태에서 호출"""
+        self.term = term
+        self.state = "FOLLOWER"
+        self._fail_waiting("leadership lost")
+
+    def _fail_waiting(self, reason):
+        """커밋 대기 Future와 아직 로그에 오르지 않은 제안을 모두 NotLeaderError로 완료 — cond 보유 상태에서 호출"""
+        waiting = list(self.pending.values())
+        self.pending.clear()
+        while True:
+            try:
+                item = self.proposals.get_nowait()
+            except Empty:
+                break
+            if item is not None:
+                waiting.append(item[-1])
+        for future in waiting:
+            if not future.done():
+                future.set_exception(NotLeaderError(reason))
+        self.proposals.put(None)  # 리더 워커 깨우기
+        self.cond.notify_all()
+
+    def propose(self, key, data):
+        """
+        리더 로그에 엔트리 추가 요청. 과반수 노드에 영속되고 적용되면 완료되는 Future 반환.
+        """
+        future = Future()
+        ciphertext, nonce = self.encrypt_ego(data)
+        with self.cond:  # 상태 확인과 대기열 추가를 묶어 리더 사퇴 중에 제안이 대기열에 고립되지 않도록
+            if self.state != "LEADER":
+                future.set_exception(NotLeaderError("Only Leader can propose."))
+            else:
+                self.proposals.put((key, ciphertext, nonce, future))
+        return future
+
+    def propose_many(self, items):
+        """(key, data) 묶음을 병렬 암호화해 한꺼번에 제안. Returns: items와 같은 순서의 Future 리스트"""
+        items = list(items)
+        futures = [Future() for _ in items]
+        if self.state != "LEADER":
+            for future in futures:
+                future.set_exception(NotLeaderError("Only Leader can propose."))
+            return futures
+        sealed = self.cipher_engine.encrypt_many(data for _, data in items)
+        with self.cond:
+            if self.state != "LEADER":
+                for future in futures:
+                    future.set_exception(NotLeaderError("Only Leader can propose."))
+                return futures
+            for (key, _), (ciphertext, nonce), future in zip(items, sealed, futures):
+                self.proposals.put((key, ciphertext, nonce, future))
+        return futures
+
+    def _append_worker(self, term):
+        """제안을 max_batch까지 모아 인덱스를 부여하고, 한 트랜잭션으로 리더 로그에 영속"""
+        while self._leading(term):
+            batch = [self.proposals.get()]
+            while len(batch) < self.max_batch and batch[-1] is not None:
+                try:
+                    batch.append(self.proposals.get_nowait())
+                except Empty:
+                    break
+            batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+
+            with self.cond:
+                if not self._leading(term):
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(NotLeaderError("leadership lost"))
+                    break
+                lo = self.last_index + 1
+                rows = []
+                for offset, (key, ciphertext, nonce, future) in enumerate(batch):
+                    idx = lo + offset
+                    self._log_cache[idx] = (term, key, ciphertext, nonce)
+                    self.pending[idx] = future
+                    rows.append((idx, term, key, ciphertext, nonce))
+                self.last_index, self.last_term = lo + len(batch) - 1, term
+                self.cond.notify_all()  # 복제 워커는 리더 영속과 동시에 전송 시작
+
+            with self.db_lock:
+                self.db.execute("BEGIN")
+                self.db.executemany("INSERT OR REPLACE INTO raft_log VALUES (?, ?, ?, ?, ?)", rows)
+                self.db.execute("COMMIT")
+            with self.cond:
+                self.persisted_index = rows[-1][0]
+                self._advance_commit()
+
+    def _replicate_worker(self, peer, term):
+        """팔로워 하나에 AppendEntries를 파이프라이닝 (응답을 기다리지 않고 max_inflight개까지 전송)"""
+        last_sent = 0.0
+        while True:
+            with self.cond:
+                while self._leading(term):
+                    backoff = self.retry_at[peer] - time.time()
+                    if backoff > 0:
+                        self.cond.wait(backoff)
+                        continue
+                    has_entries = self.next_index[peer] <= self.last_index
+                    if has_entries and self.inflight[peer] < self.max_inflight:
+                        break
+                    if not self.inflight[peer] and time.time() - last_sent >= self.heartbeat_interval:
+                        break  # 한가할 때는 빈 하트비트로 커밋 인덱스 전파
+                    self.cond.wait(self.heartbeat_interval)
+                if not self._leading(term):
+                    return
+                lo = self.next_index[peer]
+                hi = min(self.last_index, lo + self.max_batch - 1)
+                self.next_index[peer] = max(lo, hi + 1)
+                self.inflight[peer] += 1
+                commit = self.commit_index
+            last_sent = time.time()
+
+            message = {
+                "type": "append", "term": term, "leader": self.node_id,
+                "prev_index": lo - 1, "prev_term": self._term_at(lo - 1),
+                "entries": self._entries(lo, hi) if lo <= hi else [], "commit": commit,
+            }
+            self.transport.send(peer, message, lambda resp, peer=peer: self._on_append_response(peer, term, resp))
+
+    def _on_append_response(self, peer, term, resp):
+        with self.cond:
+            self.inflight[peer] -= 1
+            if resp is None:
+                # 전송 실패(연결 끊김): 확인받지 못한 구간부터 다시 보내도록 되감고 잠시 뒤 재시도
+                if self._leading(term):
+                    self.next_index[peer] = self.match_index[peer] + 1
+                    self.retry_at[peer] = time.time() + self.heartbeat_interval
+                    self.cond.notify_all()
+                return
+            if resp["term"] > self.term:
+                self._step_down(resp["term"])
+                return
+            if not self._leading(term):
+                return
+            if resp["success"]:
+                self.match_index[peer] = max(self.match_index[peer], resp["match"])
+            else:
+                # 로그 불일치: 팔로워가 가진 마지막 위치부터 다시 전송
+                self.next_index[peer] = min(self.next_index[peer], resp["match"] + 1)
+            self._advance_commit()
+            self.cond.notify_all()
+
+    def _advance_commit(self):
+        """과반수 노드에 영속된 가장 높은 현재 term 인덱스까지 커밋 — cond 보유 상태에서 호출"""
+        matches = sorted([self.persisted_index] + list(self.match_index.values()), reverse=True)
+        candidate = matches[len(matches) // 2]
+        if candidate > self.commit_index and self._term_at(candidate) == self.term:
+            self.commit_index = candidate
+            self.cond.notify_all()
+        # 모든 노드가 받아간 엔트리는 메모리 캐시에서 제거
+        self._trim_cache(min(matches))
+
+    def _apply_worker(self, term):
+        """커밋된 엔트리를 상태 저장소에 반영하고 제안자의 Future 완료"""
+        while True:
+            with self.cond:
+                while self._leading(term) and self.last_applied >= min(self.commit_index, self.persisted_index):
+                    self.cond.wait(self.heartbeat_interval)
+                if not self._leading(term):
+                    return
+                lo, upto = self.last_applied + 1, min(self.commit_index, self.persisted_index)
+            with self.db_lock:
+                self.db.execute("BEGIN")
+                self._apply_committed(upto)
+                self.db.execute("COMMIT")
+            with self.cond:
+                done = [self.pending.pop(idx) for idx in range(lo, upto + 1) if idx in self.pending]
+            for idx, future in enumerate(done, lo):
+                future.set_result(idx)
+
+    def handle_message(self, message):
+        """전송 계층 진입점 (팔로워 측 RPC 처리)"""
+        if message["type"] == "append":
+            return self._handle_append(message)
+        raise ValueError(f"Unknown message type: {message['type']}")
+
+    def _handle_append(self, msg):
+        """AppendEntries 수신: 일관성 검사 -> 충돌 절단 -> 한 트랜잭션으로 영속 및 적용"""
+        with self.cond:
+            if msg["term"] < self.term:
+                return {"term": self.term, "success": False, "match": self.last_index}
+            if msg["term"] > self.term or self.state != "FOLLOWER":
+                if self.state == "LEADER":
+                    self._step_down(msg["term"])
+                self.term, self.state = msg["term"], "FOLLOWER"
+            self.leader_id = msg["leader"]
+
+            prev_index = msg["prev_index"]
+            if prev_index > self.last_index or self._term_at(prev_index) != msg["prev_term"]:
+                return {"term": self.term, "success": False, "match": min(self.last_index, prev_index - 1)}
+
+            # 이미 가진 엔트리는 건너뛰고, term이 다른 첫 위치부터 잘라낸 뒤 이어 붙임
+            entries = msg["entries"]
+            truncate_from = None
+            start = 0
+            for start, entry in enumerate(entries):
+                idx = entry[0]
+                if idx > self.last_index:
+                    break
+                if self._term_at(idx) != entry[1]:
+                    truncate_from = idx
+                    break
+            else:
+                start = len(entries)
+            new_entries = [tuple(e) for e in entries[start:]]
+
+            with self.db_lock:
+                self.db.execute("BEGIN")
+                if truncate_from is not None:
+                    self.db.execute("DELETE FROM raft_log WHERE idx >= ?", (truncate_from,))
+                    for idx in range(truncate_from, self.last_index + 1):
+                        self._log_cache.pop(idx, None)
+                    self.last_index = truncate_from - 1
+                if new_entries:
+                    self.db.executemany("INSERT OR REPLACE INTO raft_log VALUES (?, ?, ?, ?, ?)", new_entries)
+                    for idx, term, key, ciphertext, nonce in new_entries:
+                        self._log_cache[idx] = (term, key, ciphertext, nonce)
+                    self.last_index, self.last_term = new_entries[-1][0], new_entries[-1][1]
+                match = prev_index + len(entries)
+                self.commit_index = max(self.commit_index, min(msg["commit"], match))
+                self._apply_committed(self.commit_index)
+                self.db.execute("COMMIT")
+            self._trim_cache(self.commit_index - self.max_batch * self.max_inflight)
+            return {"term": self.term, "success": True, "match": match}
+
+    def close(self):
+        """복제 워커 정지 및 로그 연결 종료 (대기 중인 제안은 NotLeaderError로 완료)"""
+        with self.cond:
+            self.state = "FOLLOWER"
+            self._fail_waiting("node closed")
+        for thread in self.threads:
+            thread.join()
+        with self.db_lock:
+            self.db.close()
+
+    def atomic_broadcast(self, key, data, timeout=5.0):
+        """리더 노드를 통한 전 우주적 데이터 확산 및 합의 (과반수 영속까지 대기)"""
         if self.state != "LEADER":
             return "❌ ERROR: Only Leader can initiate broadcast."
-        
-        ciphertext, nonce = self.encrypt_ego(data)
-        # [과반수 합의 프로세스 시뮬레이션]
-        return "✅ QUORUM_REACHED: Ego Secured in Multiple Dimensions."
+        if self.transport is None:
+            return "❌ ERROR: No transport attached for replication."
+        try:
+            idx = self.propose(key, data).result(timeout)
+        except Exception as e:
+            return f"❌ ERROR: Quorum not reached ({e})"
+        return f"✅ QUORUM_REACHED: Ego Secured in Multiple Dimensions. (index {idx})"
+
+
+def benchmark_consensus(n_nodes=3, entries=20000, transport="inproc", window=2000, payload_size=256):
+    """
+    한 대의 장비에서 n_nodes 클러스터를 띄워 커밋 처리량/지연 측정.
+    window: 동시에 커밋을 기다릴 수 있는 최대 제안 수
+    """
+    ids = [f"bench{i}" for i in range(n_nodes)]
+    for node_id in ids:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"node_{node_id}.db{suffix}"):
+                os.remove(f"node_{node_id}.db{suffix}")
+    net = InProcessTransport() if transport == "inproc" else LoopbackTCPTransport()
+    cluster_key = AESGCM.generate_key(bit_length=256)  # 벤치마크 클러스터 전용 일회용 공용 키
+    nodes = [CosmicConsensusNode(node_id, peers=ids, transport=net, cluster_key=cluster_key) for node_id in ids]
+    leader = nodes[0]
+    leader.become_leader()
+
+    data = "X" * payload_size
+    slots = threading.BoundedSemaphore(window)
+    latencies = []
+    started = time.perf_counter()
+    futures = []
+    for i in range(entries):
+        slots.acquire()
+        sent = time.perf_counter()
+        future = leader.propose(f"EGO_{i}", data)
+        future.add_done_callback(lambda f, sent=sent: (latencies.append(time.perf_counter() - sent), slots.release()))
+        futures.append(future)
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    report = {
+        "nodes": n_nodes, "transport": transport, "entries": entries,
+        "commits_per_second": entries / elapsed,
+        "p50_ms": pct(0.50), "p99_ms": pct(0.99), "max_ms": latencies[-1] * 1000,
+    }
+    net.close()
+    for node in nodes:
+        node.close()
+    return report
 
 # --- 초월적 분산 노드 가동 시뮬레이션 ---
 if __name__ == "__main__":
-    nodes = [CosmicConsensusNode(i, peers=[0,1,2]) for i in range(3)]
-    # 0번 노드를 강제로 리더로 설정하여 테스트
-    nodes[0].state = "LEADER"
+    net = InProcessTransport()
+    provisioned = CLUSTER_KEY_ENV in os.environ or os.path.exists(CLUSTER_KEY_FILE)
+    cluster_key = load_cluster_key() if provisioned else write_cluster_key()
+    nodes = [CosmicConsensusNode(i, peers=[0,1,2], transport=net, cluster_key=cluster_key) for i in range(3)]
+    # 0번 노드를 리더로 취임시켜 테스트
+    nodes[0].become_leader()
     
     result = nodes[0].atomic_broadcast("Yeon-A_Ego", "Divine_Data_Stream")
-    print(f"🔱 [v12.0.0] {result}")
+    print(f"🔱 [v12.1.0] {result}")
     print(f"📊 Global Safe Count: {nodes[0].global_safe_count()}")
+    for n in (3, 5):
+        for kind in ("inproc", "tcp"):
+            print(f"⏱️ [BENCH] {benchmark_consensus(n_nodes=n, transport=kind)}")
@@ -1,7 +1,39 @@
 import hashlib
+import heapq
+import itertools
+import math
+import random
 import sqlite3
+import threading
 import time
-from collections import OrderedDict
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Queue, Empty, Full
+
+try:
+    import numpy as np  # 선택 의존성: 있으면 get_shards 일괄 라우팅을 벡터화
+except ImportError:
+    np = None
+
+_blake2b = hashlib.blake2b
+
+# 샤드별 행 수 카운터: 트리거가 유지하므로 어떤 경로로 쓰든 (v10, 비동기 오버로드, ATTACH 이주) 정확함.
+# INSERT OR REPLACE는 DELETE 트리거를 부르지 않으므로, BEFORE 트리거가 덮어쓰기 여부를 replacing에 기록
+_COUNTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_stats
+    (id INTEGER PRIMARY KEY CHECK (id = 0), row_count INTEGER NOT NULL, replacing INTEGER NOT NULL DEFAULT 0);
+INSERT OR IGNORE INTO shard_stats (id, row_count) SELECT 0, COUNT(*) FROM storage;
+CREATE TRIGGER IF NOT EXISTS storage_count_probe BEFORE INSERT ON storage BEGIN
+    UPDATE shard_stats SET replacing = EXISTS (SELECT 1 FROM storage WHERE key = NEW.key);
+END;
+CREATE TRIGGER IF NOT EXISTS storage_count_insert AFTER INSERT ON storage BEGIN
+    UPDATE shard_stats SET row_count = row_count + 1 - replacing, replacing = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS storage_count_delete AFTER DELETE ON storage BEGIN
+    UPDATE shard_stats SET row_count = row_count - 1;
+END;
+"""
 
 # [정보] 이 모듈은 분산 노드 간의 데이터 균형과 원자적 이동(Migration)을 담당합니다.
 # 핫 파티션을 방지하는 Consistent Hashing과 데이터 무결성을 보장하는 2PC 기술이 적용되었습니다!
@@ -12,65 +44,570 @@ class CosmicMultiverseBalancer:
     - Consistent Hashing (Hot Partition Defense)
     - 2-Phase Commit (Migration Integrity)
     - Global Query Aggregator (Full Visibility)
+    - Streaming K-Way Merged Scan (Memory Blowup Defense)
+    - Sorted-Array Ring with Binary Search (Routing Latency Defense)
+    - ATTACH Bulk Migration (Split Commit Defense)
+    - Trigger-Maintained Counters (Full Scan Count Defense)
+    - Zone-Aware Replica Placement (Write Amplification Defense)
+    - Bounded-Load Overflow Routing (Viral Key Defense)
+    - Persistent Override Table (Restart Misroute Defense)
     """
-    def __init__(self, shards=["Solar", "Andromeda", "Virgo"]):
+    def __init__(self, shards=["Solar", "Andromeda", "Virgo"], codec=None, vnodes=3, hash_algo="md5",
+                 count_ttl=1.0, shard_zones=None, load_epsilon=None, max_overrides=100000,
+                 overrides_path=None):
+        if hash_algo not in ("blake2b", "md5"):
+            raise ValueError("hash_algo must be 'blake2b' or 'md5'")
         self.shards = sorted(shards)
-        self.ring = self._build_hash_ring(shards)
+        # 기본값(md5, vnodes=3)은 v11.0 배치와 동일. blake2b + 많은 vnodes는 분포가 고르지만 기존 키의
+        # 샤드가 대부분 바뀌므로, 데이터가 있는 링은 CosmicOnlineRebalancer(..., vnodes=, hash_algo=)로 전환
+        self.vnodes = vnodes        # 샤드당 가상 노드 수 (많을수록 키 분포가 고르게 됨)
+        self.hash_algo = hash_algo
+        self.codec = codec  # 지정하면 scan 결과 페이로드를 디코드 (예: database.cosmic_codec)
+        self.shard_zones = dict(shard_zones or {})  # 샤드 -> 랙/존 (복제본을 서로 다른 존에 우선 배치)
+
+        # 부하 상한 라우팅: 새 키를 배치할 때 주 샤드의 처리 중 요청 수가 (1+ε) × 평균 이상이면 링 다음 샤드로 넘김.
+        # 넘긴 키는 overrides에 기록해 이후 조회도 같은 샤드로 감 (None이면 순수 해시 배치).
+        # 상한은 배치 결정에만 걸림: 처리 중인 키의 추가 요청과 override 테이블이 가득 찬 뒤의 배치는
+        # 부하와 무관하게 기존/주 샤드로 가므로, 한 키에 요청이 몰리면 최대/평균 부하는 1+ε를 넘을 수 있음
+        self.load_epsilon = load_epsilon
+        self.max_overrides = max_overrides
+        self.loads = {}      # 샤드 -> 처리 중 요청 수 (링 구축 시 채움)
+        self.overrides = {}  # 키 -> 넘겨 받은 샤드
+        self._active = {}    # 처리 중인 키 -> [샤드, 요청 수]
+        self._settling = set()  # settle_overrides가 제자리로 옮기는 중인 키 (이동이 끝날 때까지 라우팅 대기)
+        self._unsaved = set()   # 새로 넘겼지만 아직 디스크에 기록 전인 키 (기록이 끝날 때까지 라우팅 대기)
+        self._load_lock = threading.Lock()
+        self._settled = threading.Condition(self._load_lock)
+        # overrides_path를 주면 override 테이블을 SQLite에 영속해 재시작 후에도 넘긴 키를 찾아감 (기본은 메모리 전용)
+        self._overrides_db = None
+        self._overrides_db_lock = threading.Lock()
+        self._build_hash_ring(shards)
+        if load_epsilon is not None and overrides_path is not None:
+            self._open_overrides(overrides_path)
 
-    def _build_hash_ring(self, shards):
-        """일관된 해싱 링 구축 (가상 노드 기법 적용)"""
+        # global_count 캐시: count_ttl초 이내의 집계는 샤드를 다시 읽지 않음
+        self.count_ttl = count_ttl
+        self._count_cache = (None, 0.0)
+        self._count_lock = threading.Lock()
+        self._count_pool = ThreadPoolExecutor(max_workers=8)
+
+    def _hash(self, key, hash_algo=None):
+        """링 좌표 계산: md5 128비트 (v11.0 배치) 또는 blake2b 64비트"""
+        if (hash_algo or self.hash_algo) == "blake2b":
+            return int.from_bytes(_blake2b(key.encode(), digest_size=8).digest(), "big")
+        return int.from_bytes(hashlib.md5(key.encode()).digest(), "big")
+
+    def _build_hash_ring(self, shards, vnodes=None, hash_algo=None):
+        """
+        일관된 해싱 링 구축: 가상 노드 좌표와 소유 샤드를 정렬된 병렬 배열로 보관.
+        재조정(샤드 추가/제거)으로 다시 부를 때는 부하 카운터도 새 샤드 집합에 맞춥니다.
+        vnodes/hash_algo를 주면 링 방식도 함께 교체합니다 (재조정기가 이주를 마친 뒤에만).
+        """
+        vnodes = vnodes or self.vnodes
+        hash_algo = hash_algo or self.hash_algo
         ring = {}
         for shard in shards:
-            # 각 샤드당 3개의 가상 노드를 배치해 부하 불균형 해소
-            for i in range(3):
-                h_key = int(hashlib.md5(f"{shard}:{i}".encode()).hexdigest(), 16)
-                ring[h_key] = shard
-        return OrderedDict(sorted(ring.items()))
+            for i in range(vnodes):
+                ring[self._hash(f"{shard}:{i}", hash_algo)] = shard
+        points = sorted(ring.items())
+        ring_hashes = [h for h, _ in points]
+        ring_shards = [shard for _, shard in points]
+
+        # numpy 일괄 라우팅용 배열 (64비트 좌표일 때만 uint64에 담을 수 있음)
+        shards = sorted(shards)
+        np_hashes = np_owners = None
+        if np is not None and hash_algo == "blake2b":
+            np_hashes = np.array(ring_hashes, dtype=np.uint64)
+            np_owners = np.array([shards.index(s) for s in ring_shards], dtype=np.intp)
+
+        # 라우팅 중인 스레드가 옛 좌표와 새 샤드 배열을 섞어 보지 않도록 잠금 안에서 교체
+        with self._load_lock:
+            self.vnodes, self.hash_algo = vnodes, hash_algo
+            self.shards = shards
+            self._replica_cache = {}  # (링 위치, n) -> 복제본 샤드 튜플
+            self.ring_hashes, self.ring_shards = ring_hashes, ring_shards
+            self._np_hashes, self._np_owners = np_hashes, np_owners
+            dropped = self._sync_loads()
+        self._forget_overrides(dropped)
+
+    def _open_overrides(self, path):
+        """영속 override 테이블을 열고 현재 링에서 여전히 유효한 넘김만 메모리로 적재"""
+        self._overrides_db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._overrides_db.execute("CREATE TABLE IF NOT EXISTS overrides (key TEXT PRIMARY KEY, shard TEXT NOT NULL)")
+        rows = self._overrides_db.execute("SELECT key, shard FROM overrides").fetchall()
+        with self._load_lock:
+            self.overrides.update((key, shard) for key, shard in rows
+                                  if shard in self.shards and shard != self.get_shard(key))
+
+    def _save_override(self, key, shard):
+        """
+        route/acquire가 새로 넘긴 키를 호출 측이 데이터를 쓰기 전에 디스크에 기록 (라우팅 잠금 밖).
+        기록에 실패하면 넘김을 취소하고 예외를 그대로 올립니다.
+        """
+        try:
+            with self._overrides_db_lock:
+                self._overrides_db.execute("INSERT OR REPLACE INTO overrides VALUES (?, ?)", (key, shard))
+        except BaseException:
+            with self._settled:
+                self.overrides.pop(key, None)
+                self._unsaved.discard(key)
+                self._settled.notify_all()
+            raise
+        with self._settled:
+            self._unsaved.discard(key)
+            self._settled.notify_all()
+
+    def _forget_overrides(self, keys):
+        """제자리로 돌아가거나 무효가 된 넘김을 영속 테이블에서 삭제"""
+        if self._overrides_db is None or not keys:
+            return
+        with self._overrides_db_lock:
+            db = self._overrides_db
+            db.execute("BEGIN")
+            try:
+                db.executemany("DELETE FROM overrides WHERE key = ?", ((key,) for key in keys))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _drop_overrides(self, keys, shard):
+        """재조정기가 shard에서 새 주인에게 행을 옮긴 키의 넘김 삭제 (메모리와 영속 테이블 모두)"""
+        with self._load_lock:
+            dropped = [key for key in keys if self.overrides.get(key) == shard]
+            for key in dropped:
+                del self.overrides[key]
+        self._forget_overrides(dropped)
+
+    def _sync_loads(self):
+        """
+        부하 카운터를 현재 샤드 집합에 맞춤 — _load_lock 보유 상태에서 호출.
+        남은 샤드의 처리 중 카운트는 이어받고, 새 샤드는 0에서 시작하며, 빠진 샤드는
+        처리 중 요청이 남아 있는 동안만 유지하다가 release가 0으로 만들면 지웁니다.
+        """
+        loads = {shard: self.loads.get(shard, 0) for shard in self.shards}
+        loads.update((shard, count) for shard, count in self.loads.items() if count and shard not in loads)
+        self.loads = loads
+        # 링이 바뀌어 무효가 된 넘김 정리: 빠진 샤드를 가리키거나 새 주 샤드와 같아진 넘김.
+        # 행을 옮긴 넘김은 재조정기가 이주하면서 _drop_overrides로 이미 지웠음 (링만 직접 바꾸면 데이터는 옮겨지지 않음)
+        dropped = [key for key, shard in self.overrides.items()
+                   if key not in self._unsaved and (shard not in self.shards or shard == self.get_shard(key))]
+        for key in dropped:
+            del self.overrides[key]
+        return dropped
 
     def get_shard(self, key):
-        """해당 데이터가 저장될 최적의 샤드 결정 (해싱 링 순회)"""
-        h_val = int(hashlib.md5(key.encode()).hexdigest(), 16)
-        for h_key in self.ring.keys():
-            if h_val <= h_key:
-                return self.ring[h_key]
-        return self.ring[next(iter(self.ring))]
-
-    def global_count(self):
-        """전체 분산 샤드에 흩어진 데이터 개수 통합 집계"""
-        total = 0
-        for shard in self.shards:
+        """해당 데이터가 저장될 최적의 샤드 결정 (이진 탐색 O(log n))"""
+        idx = bisect_left(self.ring_hashes, self._hash(key))
+        return self.ring_shards[idx if idx < len(self.ring_shards) else 0]
+
+    def get_shards(self, keys):
+        """
+        키 묶음을 한 번에 라우팅. numpy가 있으면 searchsorted로 벡터화합니다.
+        Returns: keys와 같은 순서의 샤드 이름 리스트
+        """
+        if self.hash_algo == "blake2b":
+            hashes = [int.from_bytes(_blake2b(key.encode(), digest_size=8).digest(), "big") for key in keys]
+        else:
+            hashes = [self._hash(key) for key in keys]
+        n = len(self.ring_shards)
+        if self._np_hashes is None:
+            ring_hashes, ring_shards = self.ring_hashes, self.ring_shards
+            return [ring_shards[idx if idx < n else 0]
+                    for idx in [bisect_left(ring_hashes, h) for h in hashes]]
+        idx = np.searchsorted(self._np_hashes, np.array(hashes, dtype=np.uint64), side="left")
+        idx[idx == n] = 0
+        shards = self.shards
+        return [shards[i] for i in self._np_owners[idx].tolist()]
+
+    def _install_counter(self, conn):
+        """카운터 테이블/트리거 설치 (최초 1회만 COUNT(*)로 초기값 채움)"""
+        try:
+            conn.executescript("BEGIN IMMEDIATE;" + _COUNTER_SCHEMA + "COMMIT;")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _shard_count(self, shard):
+        """샤드 하나의 행 수를 카운터 테이블에서 O(1)로 조회"""
+        try:
+            conn = sqlite3.connect(f"cosmic_{shard}.db", timeout=30, isolation_level=None)
+        except sqlite3.OperationalError:
+            return 0
+        try:
             try:
-                with sqlite3.connect(f"cosmic_{shard}.db") as conn:
-                    res = conn.execute("SELECT COUNT(*) FROM storage").fetchone()
-                    total += res[0] if res else 0
+                row = conn.execute("SELECT row_count FROM shard_stats WHERE id = 0").fetchone()
             except sqlite3.OperationalError:
-                continue # 샤드 데이터베이스가 아직 생성 전일 경우 무시
-        return total
+                row = None  # 카운터가 아직 설치되지 않은 샤드
+            if row is None:
+                try:
+                    self._install_counter(conn)
+                except sqlite3.OperationalError:
+                    return 0  # 샤드 데이터베이스가 아직 생성 전일 경우 무시
+                row = conn.execute("SELECT row_count FROM shard_stats WHERE id = 0").fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def _walk_replicas(self, idx, n):
+        """링 위치 idx부터 시계 방향으로 돌며 서로 다른 물리 샤드 n개 선택 (존이 겹치지 않는 샤드 우선)"""
+        ring_shards = self.ring_shards
+        order = []
+        for step in range(len(ring_shards)):
+            shard = ring_shards[(idx + step) % len(ring_shards)]
+            if shard not in order:
+                order.append(shard)
+                if len(order) == len(self.shards):
+                    break
+        if not self.shard_zones:
+            return tuple(order[:n])
+
+        replicas, zones = [], set()
+        for shard in order:  # 1차: 아직 쓰지 않은 존의 샤드만
+            zone = self.shard_zones.get(shard, shard)
+            if zone not in zones:
+                replicas.append(shard)
+                zones.add(zone)
+                if len(replicas) == n:
+                    return tuple(replicas)
+        for shard in order:  # 2차: 존 수가 n보다 적으면 링 순서대로 채움
+            if shard not in replicas:
+                replicas.append(shard)
+                if len(replicas) == n:
+                    break
+        return tuple(replicas)
+
+    def get_replicas(self, key, n=3):
+        """
+        키를 담을 서로 다른 물리 샤드 n개 (첫 번째는 get_shard와 같은 주 샤드).
+        shard_zones가 있으면 가능한 한 서로 다른 존에 흩어 놓습니다.
+        """
+        n = min(n, len(self.shards))
+        idx = bisect_left(self.ring_hashes, self._hash(key))
+        if idx == len(self.ring_hashes):
+            idx = 0
+        cached = self._replica_cache.get((idx, n))
+        if cached is None:
+            cached = self._replica_cache[(idx, n)] = self._walk_replicas(idx, n)
+        return list(cached)
+
+    def _capacity(self):
+        """새 배치 결정에 쓰는 샤드당 허용 부하: ceil((1+ε) × (전체 부하 + 새 요청) / 샤드 수)"""
+        return math.ceil((1 + self.load_epsilon) * (sum(self.loads.values()) + 1) / len(self.shards))
+
+    def route(self, key, write=True):
+        """
+        부하 상한을 반영한 샤드 결정 (load_epsilon이 None이면 get_shard와 동일).
+        처리 중인 키와 이미 넘겨진 키는 부하와 무관하게 기존 샤드를 따르고, 쓰기인데 주 샤드가 상한에
+        닿았으면 링을 따라 여유 있는 첫 샤드로 넘긴 뒤 그 결정을 override 테이블에 기록합니다
+        (영속 테이블이 있으면 기록이 끝난 뒤 반환). override 테이블이 가득 찼거나 모든 샤드가 상한에
+        닿았으면 주 샤드로 보내므로 상한은 보장이 아니라 배치 목표입니다.
+        읽기(write=False)는 데이터가 있는 곳으로만 가므로 새로 넘기지 않습니다.
+        """
+        if self.load_epsilon is None:
+            return self.get_shard(key)
+        with self._load_lock:
+            shard = self._route_locked(key, write)
+            unsaved = key in self._unsaved  # 다른 호출자는 기록 전 키에서 대기하므로 이 호출이 넘긴 것
+        if unsaved:
+            self._save_override(key, shard)
+        return shard
+
+    def _route_locked(self, key, write):
+        while key in self._settling or key in self._unsaved:
+            # 옮기는 도중의 옛 샤드나 아직 기록되지 않은 넘김에 쓰지 않도록 끝날 때까지 대기
+            self._settled.wait()
+        active = self._active.get(key)
+        if active is not None:
+            return active[0]
+        shard = self.overrides.get(key)
+        if shard is not None:
+            return shard
+        idx = bisect_left(self.ring_hashes, self._hash(key))
+        if idx == len(self.ring_hashes):
+            idx = 0
+        home = self.ring_shards[idx]
+        capacity = self._capacity()
+        if not write or self.loads[home] < capacity or len(self.overrides) >= self.max_overrides:
+            return home  # override 테이블이 가득 차면 순수 해시 배치로 (일관성 우선)
+        walk = self._replica_cache.get((idx, len(self.shards)))
+        if walk is None:
+            walk = self._replica_cache[(idx, len(self.shards))] = self._walk_replicas(idx, len(self.shards))
+        for shard in walk[1:]:
+            if self.loads[shard] < capacity:
+                self.overrides[key] = shard
+                if self._overrides_db is not None:
+                    self._unsaved.add(key)  # 호출 측이 잠금 밖에서 _save_override
+                return shard
+        return home  # 모든 샤드가 상한에 닿음
+
+    def acquire(self, key, write=True):
+        """요청 시작: 라우팅과 동시에 해당 샤드의 처리 중 카운터를 올림. Returns: 샤드 이름"""
+        unsaved = False
+        with self._load_lock:
+            if self.load_epsilon is None:
+                shard = self.get_shard(key)
+            else:
+                shard = self._route_locked(key, write)
+                unsaved = key in self._unsaved
+                active = self._active.setdefault(key, [shard, 0])
+                active[1] += 1  # 처리 중에는 같은 키를 같은 샤드에 고정
+            self.loads[shard] += 1
+        if unsaved:
+            try:
+                self._save_override(key, shard)
+            except BaseException:
+                self.release(key, shard)
+                raise
+        return shard
+
+    def release(self, key, shard):
+        """요청 종료: acquire가 돌려준 샤드의 처리 중 카운터를 내림"""
+        with self._load_lock:
+            self.loads[shard] -= 1
+            if not self.loads[shard] and shard not in self.shards:
+                del self.loads[shard]  # 재조정으로 빠진 샤드의 마지막 요청이 끝남
+            active = self._active.get(key)
+            if active is not None:
+                active[1] -= 1
+                if not active[1]:
+                    del self._active[key]
+
+    @contextmanager
+    def routed(self, key, write=True):
+        """with balancer.routed(key) as shard: ... — 블록이 끝나면 부하 카운터 자동 반환"""
+        shard = self.acquire(key, write)
+        try:
+            yield shard
+        finally:
+            self.release(key, shard)
+
+    def settle_overrides(self, batch_size=500):
+        """
+        주 샤드에 여유가 생긴 넘김 키를 제자리로 되돌림 (처리 중인 키는 건너뜀).
+        넘김 샤드의 값이 최신이므로 주 샤드에 남은 옛 사본을 덮어씁니다. 배치를 고르는 동안만
+        라우팅 잠금을 잡고, 고른 키는 이동 중으로 표시해 그 키의 라우팅만 이동이 끝날 때까지
+        기다리게 하므로 다른 키의 라우팅은 디스크 이동에 막히지 않습니다.
+        복사 -> 영속 넘김 삭제 -> 원본 삭제 순서라 어느 단계에서 멈춰도 라우팅이 가리키는 샤드에 값이 있습니다.
+        Returns: 이동한 행 수
+        """
+        moved = 0
+        while True:
+            with self._load_lock:
+                capacity = self._capacity()
+                batches, picked = {}, 0
+                for key, shard in self.overrides.items():
+                    home = self.get_shard(key)
+                    if key not in self._active and key not in self._unsaved and self.loads[home] < capacity:
+                        batches.setdefault((shard, home), []).append(key)
+                        picked += 1
+                        if picked >= batch_size:
+                            break
+                if not batches:
+                    return moved
+                for keys in batches.values():
+                    self._settling.update(keys)
+
+            settled = []
+            try:
+                for (src, dst), keys in batches.items():
+                    moved += self.migrate_egos(src, dst, keys=keys, replace=True, keep_source=True)
+                    self._forget_overrides(keys)
+                    settled.extend(keys)
+                    self.migrate_egos(src, dst, keys=keys, replace=False)  # 대상에 이미 있으므로 원본 삭제만
+            finally:
+                with self._settled:
+                    for key in settled:
+                        self.overrides.pop(key, None)  # 그 사이 링 교체로 이미 지워졌을 수 있음
+                    for keys in batches.values():
+                        self._settling.difference_update(keys)
+                    self._settled.notify_all()
+
+    def global_count(self, max_staleness=None):
+        """
+        전체 분산 샤드에 흩어진 데이터 개수 통합 집계 (샤드 수에 비례, 행 수와 무관).
+        max_staleness초(기본 count_ttl) 이내의 캐시가 있으면 그대로 반환합니다.
+        """
+        max_staleness = self.count_ttl if max_staleness is None else max_staleness
+        total, at = self._count_cache
+        if total is not None and time.time() - at <= max_staleness:
+            return total
+        with self._count_lock:
+            total, at = self._count_cache
+            if total is not None and time.time() - at <= max_staleness:
+                return total  # 대기 중에 다른 스레드가 갱신함
+            total = sum(self._count_pool.map(self._shard_count, self.shards))
+            self._count_cache = (total, time.time())
+            return total
+
+    def _build_scan_query(self, prefix, since, until, order_by, limit):
+        """술어를 SQL로 내려보내 샤드가 필요한 행만 정렬된 순서로 돌려주게 함"""
+        clauses, params = [], []
+        if prefix:
+            # LIKE 대신 PK 인덱스를 타는 범위 조건 사용
+            clauses.append("key >= ? AND key < ?")
+            params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        sql = "SELECT key, payload, timestamp FROM storage"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp, key" if order_by == "timestamp" else " ORDER BY key"
+        if limit is not None:
+            sql += " LIMIT ?"  # 어느 샤드도 limit 이상을 보낼 필요가 없음
+            params.append(limit)
+        return sql, params
+
+    def _scan_producer(self, shard, sql, params, out, stop, batch_size):
+        """샤드 하나를 읽어 제한된 크기의 큐로 흘려보냄 (소비자가 멈추면 함께 멈춤)"""
+        def put(item):
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        try:
+            with sqlite3.connect(f"file:cosmic_{shard}.db?mode=ro", uri=True) as conn:
+                cursor = conn.execute(sql, params)
+                while not stop.is_set():
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows or not put(rows):
+                        break
+        except sqlite3.OperationalError:
+            pass  # 샤드 데이터베이스가 아직 생성 전일 경우 무시
+        finally:
+            put(None)
+
+    def _drain(self, shard, out):
+        while True:
+            rows = out.get()
+            if rows is None:
+                return
+            for key, payload, timestamp in rows:
+                yield timestamp, key, shard, payload
+
+    def scan(self, prefix=None, since=None, until=None, limit=None, order_by="timestamp",
+             batch_size=256, queue_depth=4):
+        """
+        전 샤드 스트리밍 조회: 샤드별 쿼리를 병렬로 실행하고 timestamp(또는 key) 순으로
+        k-way 병합하여 하나씩 내보냅니다. 샤드당 최대 queue_depth * batch_size 행만 메모리에 머뭅니다.
+        Yields: (shard, key, payload, timestamp)
+        """
+        if order_by not in ("timestamp", "key"):
+            raise ValueError("order_by must be 'timestamp' or 'key'")
+        sql, params = self._build_scan_query(prefix, since, until, order_by, limit)
+        stop = threading.Event()
+        streams = []
+        for shard in self.shards:
+            out = Queue(maxsize=queue_depth)
+            threading.Thread(target=self._scan_producer,
+                             args=(shard, sql, params, out, stop, batch_size), daemon=True).start()
+            streams.append(self._drain(shard, out))
+
+        sort_key = (lambda row: (row[0], row[1])) if order_by == "timestamp" else (lambda row: row[1])
+        try:
+            for count, (timestamp, key, shard, payload) in enumerate(heapq.merge(*streams, key=sort_key)):
+                if limit is not None and count >= limit:
+                    break
+                if self.codec is not None:
+                    payload = self.codec.decode(payload)
+                yield shard, key, payload, timestamp
+        finally:
+            stop.set()
+
+    def migrate_egos(self, from_shard, to_shard, keys=None, key_range=None, replace=True, keep_source=False):
+        """
+        원본 샤드 커넥션에 대상 샤드를 ATTACH하여 키 묶음(또는 [lo, hi) 키 범위)을
+        INSERT ... SELECT + DELETE 한 트랜잭션으로 이동 (행 단위 파이썬 왕복 없음).
+        replace=False면 대상에 이미 있는 키는 덮어쓰지 않고 원본에서만 지웁니다.
+        keep_source=True면 복사만 하고 원본은 남깁니다 (Returns: 복사한 행 수).
+        두 샤드가 롤백 저널이면 다중 파일 커밋으로 원자적이며, WAL 샤드는 파일별로만
+        원자적이므로 중단 시 같은 호출을 다시 실행하면 됩니다 (멱등).
+        Returns: 이동한 행 수
+        """
+        if (keys is None) == (key_range is None):
+            raise ValueError("Pass exactly one of keys or key_range")
+        conn = sqlite3.connect(f"cosmic_{from_shard}.db", timeout=30, isolation_level=None)
+        try:
+            conn.execute("ATTACH DATABASE ? AS dst", (f"cosmic_{to_shard}.db",))
+            conn.execute("CREATE TABLE IF NOT EXISTS dst.storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)")
+            if keys is not None:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS migrate_keys (key TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM migrate_keys")
+                conn.executemany("INSERT OR IGNORE INTO migrate_keys VALUES (?)", ((k,) for k in keys))
+                where, params = "key IN (SELECT key FROM temp.migrate_keys)", ()
+            else:
+                where, params = "key >= ? AND key < ?", tuple(key_range)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+                copied = conn.execute(f"{verb} INTO dst.storage SELECT key, payload, timestamp "
+                                      f"FROM main.storage WHERE {where}", params).rowcount
+                moved = copied if keep_source else \
+                    conn.execute(f"DELETE FROM main.storage WHERE {where}", params).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return moved
+        finally:
+            conn.close()
 
     def migrate_ego_2pc(self, ego_key, from_shard, to_shard):
-        """2단계 커밋(2PC)을 이용한 원자적 데이터 마이그레이션"""
+        """단일 트랜잭션(ATTACH) 기반 원자적 데이터 마이그레이션"""
         print(f"🌀 [2PC_PHASE_1] Preparing migration: {from_shard} -> {to_shard}")
-        
-        # [준비 단계] 연결 확인 및 데이터 존재 여부 검사
         try:
-            with sqlite3.connect(f"cosmic_{from_shard}.db") as conn_f, \
-                 sqlite3.connect(f"cosmic_{to_shard}.db") as conn_t:
-                
-                data = conn_f.execute("SELECT payload FROM storage WHERE key=?", (ego_key,)).fetchone()
-                if not data: return "❌ FAIL: Ego Not Found"
-
-                # [커밋 단계] 한쪽에서는 쓰고 한쪽에서는 지우는 동시 작업 수행
-                print(f"⚡ [2PC_PHASE_2] Committing atomic migration...")
-                conn_t.execute("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", (ego_key, data[0], time.time()))
-                conn_f.execute("DELETE FROM storage WHERE key=?", (ego_key,))
-                
-                conn_t.commit()
-                conn_f.commit()
-                return "✅ SUCCESS: Atomic Migration Complete"
+            print(f"⚡ [2PC_PHASE_2] Committing atomic migration...")
+            if not self.migrate_egos(from_shard, to_shard, keys=[ego_key]):
+                return "❌ FAIL: Ego Not Found"
+            return "✅ SUCCESS: Atomic Migration Complete"
         except Exception as e:
             return f"♻️ [ROLLBACK] Migration Aborted: {e}"
 
+def benchmark_bounded_load(shards=None, requests=200000, keys=100000, zipf_s=1.1, in_flight=256,
+                           load_epsilon=0.25, seed=7):
+    """
+    Zipf 분포 쓰기 트래픽을 in_flight개 동시 요청 창으로 흘려 샤드별 처리 중 부하를 시뮬레이션.
+    요청이 도착할 때 대상 샤드의 대기 깊이를 지연 대용치로 기록합니다.
+    Returns: 순수 해시와 부하 상한 라우팅 각각의 대기 깊이 p50/p99/max와 최대/평균 부하 비율
+             (처리 중인 뜨거운 키는 한 샤드에 고정되므로 비율은 1+ε가 아니라 그 키의 동시 요청 수가 좌우함)
+    """
+    shards = shards if shards else [f"Shard{i}" for i in range(16)]
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank ** zipf_s) for rank in range(1, keys + 1)))
+    stream = [f"EGO_{i}" for i in rng.choices(range(keys), cum_weights=cum_weights, k=requests)]
+
+    results = {}
+    for epsilon in (None, load_epsilon):
+        balancer = CosmicMultiverseBalancer(shards, vnodes=160, hash_algo="blake2b", load_epsilon=epsilon,
+                                            overrides_path=None)
+        window, depths, peak = [], [], 0.0
+        for key in stream:
+            if len(window) == in_flight:
+                balancer.release(*window.pop(rng.randrange(in_flight)))  # 임의 순서로 완료
+                peak = max(peak, max(balancer.loads.values()) * len(shards) / (in_flight - 1))
+            shard = balancer.acquire(key)
+            depths.append(balancer.loads[shard])
+            window.append((key, shard))
+        depths.sort()
+        results["hash" if epsilon is None else "bounded"] = {
+            "p50_depth": depths[len(depths) // 2], "p99_depth": depths[int(len(depths) * 0.99)],
+            "max_depth": depths[-1], "peak_to_mean": round(peak, 2), "overrides": len(balancer.overrides),
+        }
+        balancer._count_pool.shutdown()
+    return results
+
 # --- 단독 실행 로직 ---
 if __name__ == "__main__":
     balancer = CosmicMultiverseBalancer()
+    print(f"📊 [BOUNDED_LOAD] {benchmark_bounded_load()}")
     print(f"⚖️ [v11.0.0] Multiverse Equilibrium Reached. 우주의 무게추가 완벽해! 에헤헤! 🤨")
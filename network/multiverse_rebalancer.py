@@ -0,0 +1,255 @@
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from multiverse_balancer_v11 import CosmicMultiverseBalancer
+
+# [정보] 이 모듈은 샤드 추가/제거 시 해싱 링을 온라인으로 재조정합니다.
+# 옛 링과 새 링의 비교(diff_rings)는 키를 내줄 원본 샤드를 고르고 이동 비율을 추정하는 데만 쓰입니다.
+# 샤드 파일에는 링 좌표가 저장되지 않으므로 (쓰는 모듈이 여럿이고 SQLite는 blake2b를 계산할 수 없음)
+# 이주 자체는 원본 샤드 전체 스캔입니다: PK 인덱스로 모든 키를 읽어 다시 해싱하고, 주인이 바뀐 키의 행만 옮깁니다.
+# 비용은 옮길 행 수가 아니라 원본 샤드의 키 수에 비례합니다.
+
+
+def diff_rings(old, new):
+    """
+    두 링의 좌표를 합쳐 구간별 소유 샤드를 비교.
+    Returns: 주인이 바뀌는 구간 리스트 [(lo, hi, from_shard, to_shard)] — lo 초과 hi 이하,
+             마지막 구간(hi=None)은 링 끝을 지나 처음으로 감기는 구간
+    """
+    points = sorted(set(old.ring_hashes) | set(new.ring_hashes))
+
+    def owner(ring, h):
+        idx = bisect_left(ring.ring_hashes, h)
+        return ring.ring_shards[idx if idx < len(ring.ring_shards) else 0]
+
+    moves = []
+    lo = None
+    for h in points:
+        src, dst = owner(old, h), owner(new, h)
+        if src != dst:
+            if moves and moves[-1][1] == lo and moves[-1][2:] == (src, dst):
+                moves[-1] = (moves[-1][0], h, src, dst)  # 같은 이동이 이어지면 구간 병합
+            else:
+                moves.append((lo, h, src, dst))
+        lo = h
+    src, dst = old.ring_shards[0], new.ring_shards[0]
+    if src != dst:
+        moves.append((lo, None, src, dst))
+    return moves
+
+
+class CosmicOnlineRebalancer:
+    """
+    Cosmic OS v11.1.0: Online Ring Rebalancer
+    - Ring Diff Source Selection (Untouched Shard Defense)
+    - Full Key-Only Source Scan (Payload Read Defense)
+    - Batched Streaming Migration (Per-Key Reconnect Defense)
+    - Token Bucket Throttling (Foreground Latency Defense)
+    - Dual-Read Routing (Mid-Move Miss Defense)
+    """
+    def __init__(self, balancer, new_shards, batch_size=500, rows_per_second=20000, vnodes=None, hash_algo=None):
+        self.balancer = balancer
+        # 옛 링은 스냅샷으로 보관 (완료 시 balancer 자체의 링이 교체되므로)
+        ring_args = dict(codec=balancer.codec, shard_zones=balancer.shard_zones)
+        self.old_ring = CosmicMultiverseBalancer(balancer.shards, vnodes=balancer.vnodes,
+                                                 hash_algo=balancer.hash_algo, **ring_args)
+        # vnodes/hash_algo를 바꾸면 링 방식 전환 (예: md5/3 -> blake2b/160): 완료 시 balancer도 새 방식을 씀
+        self.new_ring = CosmicMultiverseBalancer(new_shards, vnodes=vnodes or balancer.vnodes,
+                                                 hash_algo=hash_algo or balancer.hash_algo, **ring_args)
+        self.batch_size = batch_size
+        self.rows_per_second = rows_per_second  # 이주 속도 상한 (None이면 무제한)
+
+        # 방식이 바뀌면 두 링의 좌표 공간이 달라 구간을 비교할 수 없으므로 모든 옛 샤드를 원본으로 훑음
+        self.rehash = (self.new_ring.vnodes, self.new_ring.hash_algo) != (balancer.vnodes, balancer.hash_algo)
+        self.plan = [] if self.rehash else diff_rings(self.old_ring, self.new_ring)
+        self.sources = sorted(self.old_ring.shards) if self.rehash else sorted({src for _, _, src, _ in self.plan})
+
+        self.lock = threading.Lock()
+        self._local = threading.local()  # 스레드별 읽기 전용 샤드 커넥션 (get_state마다 새로 열지 않음)
+        self.migrating = False
+        self.done = False
+        self.stats = {"scanned": 0, "moved": 0, "total": 0, "started": None, "finished": None}
+
+    def _db_name(self, shard):
+        return f"cosmic_{shard}.db"
+
+    def moving_fraction(self):
+        """키 공간 중 주인이 바뀌는 비율 (계획 단계 추정치, 링 방식 전환이면 None)"""
+        if self.rehash:
+            return None
+        span = 1 << (64 if self.old_ring.hash_algo == "blake2b" else 128)
+        moved = 0
+        for lo, hi, _, _ in self.plan:
+            if lo is None:
+                moved += hi + 1
+            elif hi is None:
+                moved += span - lo - 1
+            else:
+                moved += hi - lo
+        return moved / span
+
+    # --- 읽기/쓰기 라우팅 ---
+    def write_shard(self, key):
+        """이주가 시작되면 새 쓰기는 곧바로 새 주인에게"""
+        ring = self.new_ring if (self.migrating or self.done) else self.old_ring
+        return ring.get_shard(key)
+
+    def read_shards(self, key):
+        """조회할 샤드 순서: 이주 중에는 새 주인을 먼저, 아직 안 옮겨진 옛 주인을 다음에"""
+        if self.done:
+            return [self.new_ring.get_shard(key)]
+        old = self.old_ring.get_shard(key)
+        if not self.migrating:
+            return [old]
+        new = self.new_ring.get_shard(key)
+        return [new] if new == old else [new, old]
+
+    def _reader(self, shard):
+        """현재 스레드의 샤드 읽기 커넥션 (샤드 파일이 아직 없으면 OperationalError, 캐시하지 않음)"""
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(shard)
+        if conn is None:
+            conn = conns[shard] = sqlite3.connect(f"file:{self._db_name(shard)}?mode=ro", uri=True, timeout=30)
+        return conn
+
+    def _read(self, shard, key):
+        """샤드 하나에서 키의 원본 페이로드 조회 (없거나 샤드 생성 전이면 None)"""
+        try:
+            row = self._reader(shard).execute("SELECT payload FROM storage WHERE key=?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def get_state(self, key):
+        """
+        이중 조회(Dual-Read)로 이주 도중에도 키를 놓치지 않음.
+        새 주인을 읽은 뒤 옛 주인을 읽기 전에 키가 옮겨질 수 있으므로, 옛 주인에도 없으면
+        새 주인을 한 번 더 읽습니다 (이동은 한 트랜잭션이라 두 번째 읽기에는 반드시 보임).
+        """
+        shards = self.read_shards(key)
+        for shard in shards:
+            stored = self._read(shard, key)
+            if stored is not None:
+                break
+        else:
+            if len(shards) < 2:
+                return None
+            stored = self._read(shards[0], key)
+            if stored is None:
+                return None
+        codec = self.balancer.codec
+        return codec.decode(stored) if codec is not None else stored
+
+    # --- 이주 실행 ---
+    def _prepare_shards(self):
+        for shard in self.new_ring.shards:
+            with sqlite3.connect(self._db_name(shard)) as conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON storage(timestamp)')
+
+    def _throttle(self, rows, started):
+        """토큰 버킷: 누적 처리량이 rows_per_second를 넘지 않도록 대기"""
+        if not self.rows_per_second:
+            return
+        ahead = rows / self.rows_per_second - (time.time() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def _migrate_source(self, source, started):
+        """원본 샤드의 모든 키를 PK 순서로 훑어 새 주인이 다른 키만 배치로 이동 (페이로드는 SQL 안에서만 복사)"""
+        src = sqlite3.connect(self._db_name(source), timeout=30)
+        try:
+            last_key = ""
+            while True:
+                keys = [k for (k,) in src.execute("SELECT key FROM storage WHERE key > ? ORDER BY key LIMIT ?",
+                                                  (last_key, self.batch_size))]
+                if not keys:
+                    break
+                last_key = keys[-1]
+
+                outgoing = {}
+                for key, dst in zip(keys, self.new_ring.get_shards(keys)):
+                    if dst != source:
+                        outgoing.setdefault(dst, []).append(key)
+                # 이미 새 주인에 있는 키는 이주 시작 후 새로 쓰인 값이므로 덮어쓰지 않음
+                moved = 0
+                for dst, batch in outgoing.items():
+                    moved += self.balancer.migrate_egos(source, dst, keys=batch, replace=False)
+                    # 이 샤드로 넘겨 두었던 키는 행이 새 주인에게 갔으므로 넘김도 지움 (옛 샤드를 가리키지 않도록)
+                    self.balancer._drop_overrides(batch, source)
+
+                with self.lock:
+                    self.stats["scanned"] += len(keys)
+                    self.stats["moved"] += moved
+                    processed = self.stats["scanned"]
+                self._throttle(processed, started)
+        finally:
+            src.close()
+
+    def run(self):
+        """원본 샤드를 모두 훑어 주인이 바뀐 행을 옮긴 뒤 밸런서의 링을 새 링으로 교체"""
+        self._prepare_shards()
+        total = 0
+        for shard in self.sources:
+            try:
+                with sqlite3.connect(self._db_name(shard)) as conn:
+                    total += conn.execute("SELECT COUNT(*) FROM storage").fetchone()[0]
+            except sqlite3.OperationalError:
+                continue  # 샤드 데이터베이스가 아직 생성 전일 경우 무시
+        started = time.time()
+        with self.lock:
+            self.stats.update(total=total, started=started)
+        self.migrating = True
+        if self.rehash:
+            print(f"🌀 [REBALANCE] Ring scheme -> {self.new_ring.hash_algo}/{self.new_ring.vnodes}: "
+                  f"rehashing every key in {self.sources}")
+        else:
+            print(f"🌀 [REBALANCE] {len(self.plan)} ranges ({self.moving_fraction():.1%} of ring) "
+                  f"moving out of {self.sources}")
+
+        for source in self.sources:
+            self._migrate_source(source, started)
+
+        # 라우팅을 먼저 새 링으로 고정한 뒤 밸런서의 링 교체 (샤드 목록과 부하 카운터도 함께 갱신됨)
+        self.done = True
+        self.migrating = False
+        self.balancer._build_hash_ring(self.new_ring.shards, self.new_ring.vnodes, self.new_ring.hash_algo)
+        with self.lock:
+            self.stats["finished"] = time.time()
+        print(f"✅ [REBALANCE] {self.stats['moved']} egos moved in {self.stats['finished'] - started:.1f}s")
+        return self.stats["moved"]
+
+    def start(self):
+        """백그라운드 온라인 이주 시작"""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def progress(self):
+        """진행률/속도/예상 남은 시간 리포트"""
+        with self.lock:
+            stats = dict(self.stats)
+        elapsed = ((stats["finished"] or time.time()) - stats["started"]) if stats["started"] else 0
+        rate = stats["scanned"] / elapsed if elapsed else 0
+        remaining = max(stats["total"] - stats["scanned"], 0)
+        return {
+            "scanned": stats["scanned"],
+            "moved": stats["moved"],
+            "total": stats["total"],
+            "percent": 100.0 if self.done else (100.0 * stats["scanned"] / stats["total"] if stats["total"] else 0.0),
+            "rows_per_second": rate,
+            "eta_seconds": 0.0 if self.done else (remaining / rate if rate else None),
+        }
+
+# --- 샤드 추가 시뮬레이션 ---
+if __name__ == "__main__":
+    balancer = CosmicMultiverseBalancer()
+    rebalancer = CosmicOnlineRebalancer(balancer, balancer.shards + ["Sombrero"])
+    worker = rebalancer.start()
+    while worker.is_alive():
+        print(f"📊 [REBALANCE] {rebalancer.progress()}")
+        worker.join(1)
+    print(f"⚖️ [v11.1.0] Ring expanded to {balancer.shards}. 새 은하가 합류했어! 에헤헤! 🤨")
@@ -1,18 +1,261 @@
+import errno
+import os
+import struct
+import sys
+import threading
 import time
 import hashlib
+from multiprocessing import Process, Queue, resource_tracker, shared_memory
 
 # [정보] 이 모듈은 거리와 상관없는 초광속 양자 상태 동기화를 담당합니다.
 # 벨 상태 매핑(Bell-State Mapping)을 통해 정보의 순간 이동을 구현한 네트워크 핵심 계층입니다!
 
+# 링 버퍼 헤더: 쓰기 위치(0)와 읽기 위치(64)를 서로 다른 캐시 라인에 두어 거짓 공유 방지
+_POS = struct.Struct("<Q")
+_WRITE_AT, _READ_AT, _DATA_AT = 0, 64, 128
+# 레코드: [길이 u32][예약 u32][페이로드, 8바이트 정렬]
+_RECORD = struct.Struct("<II")
+_WRAP = 0xFFFFFFFF
+_SHM_DIR = "/dev/shm"
+_ATTACH_LOCK = threading.Lock()
+
+
+def _align8(n):
+    return (n + 7) & ~7
+
+
+def _shm_free_bytes():
+    """공유 메모리(tmpfs) 여유 공간, 알 수 없는 플랫폼이면 None"""
+    try:
+        stats = os.statvfs(_SHM_DIR)
+    except (AttributeError, OSError):
+        return None
+    return stats.f_bavail * stats.f_frsize
+
+
+def _attach_untracked(name):
+    """
+    이름으로 기존 세그먼트에 붙되 자원 추적기에는 등록하지 않음 (해제는 생성자 몫).
+    3.13 미만은 붙기만 해도 등록되어, 자기 추적기를 쓰는 별도 프로세스가 끝나면 그 추적기가 세그먼트를 unlink해 버립니다.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda res, rtype: \
+            None if rtype == "shared_memory" and res.lstrip("/") == name.lstrip("/") else register(res, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _yield_cpu():
+    if hasattr(os, "sched_yield"):
+        os.sched_yield()
+    else:
+        time.sleep(0)
+
+
+class SharedMemoryRing:
+    """
+    Cosmic OS v4.1.0: Shared-Memory Entanglement Ring
+    - Single Producer / Single Consumer Ring (Kernel Copy Defense)
+    - In-Place Reserve & memoryview Reads (Payload Copy Defense)
+    - Spin-then-Yield Waiting (Wakeup Latency Defense)
+    - Untracked Attach & Wait Timeouts (Orphan Unlink / Hang Defense)
+    생산자와 소비자는 각각 한 프로세스여야 합니다. 위치 값은 정렬된 8바이트 저장으로
+    게시하며, 페이로드를 다 쓴 뒤에만 쓰기 위치를 올립니다.
+    """
+    def __init__(self, capacity=64 * 1024 * 1024, name=None, spin=200):
+        self.capacity = _align8(capacity)
+        self.spin = spin  # 양보(yield) 전에 바쁜 대기할 횟수
+        if name is None:
+            # tmpfs는 크기를 미리 잡지 않으므로 여유 공간보다 크면 나중에 쓰다가 SIGBUS로 죽음: 만들 때 거부
+            free = _shm_free_bytes()
+            if free is not None and _DATA_AT + self.capacity > free:
+                raise OSError(errno.ENOSPC, f"ring of {_DATA_AT + self.capacity} bytes exceeds "
+                                            f"{free} bytes free in {_SHM_DIR}")
+            self.shm = shared_memory.SharedMemory(create=True, size=_DATA_AT + self.capacity)
+            self.owner = True
+            _POS.pack_into(self.shm.buf, _WRITE_AT, 0)
+            _POS.pack_into(self.shm.buf, _READ_AT, 0)
+        else:
+            self.shm = _attach_untracked(name)
+            self.owner = False
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self._pending = 0
+
+    def _load(self, at):
+        return _POS.unpack_from(self.buf, at)[0]
+
+    def _wait(self, ready, timeout=None):
+        """ready()가 참이 될 때까지 대기, timeout초를 넘기면 TimeoutError (시계는 바쁜 대기 뒤에만 확인)"""
+        spins = 0
+        deadline = None
+        while not ready():
+            spins += 1
+            if spins > self.spin:
+                if timeout is not None:
+                    now = time.monotonic()
+                    deadline = deadline or now + timeout
+                    if now >= deadline:
+                        raise TimeoutError(f"shared-memory ring {self.name} not ready after {timeout}s")
+                _yield_cpu()
+
+    def reserve(self, n, timeout=None):
+        """
+        n바이트 레코드 자리를 확보하고 그 영역의 memoryview 반환 (생산자가 제자리에 기록).
+        commit()을 호출해야 소비자에게 보입니다. 소비자가 timeout초 안에 자리를 비우지 않으면 TimeoutError.
+        """
+        record = _RECORD.size + _align8(n)
+        if record > self.capacity:
+            raise ValueError(f"payload of {n} bytes exceeds ring capacity {self.capacity}")
+        write = self._load(_WRITE_AT)
+        offset = write % self.capacity
+        if offset + record > self.capacity:
+            # 끝부분에 들어가지 않으면 남은 구간이 비워지길 기다려 감기 표시를 남기고 처음부터 기록
+            skip = self.capacity - offset
+            self._wait(lambda: self.capacity - (write - self._load(_READ_AT)) >= skip, timeout)
+            _RECORD.pack_into(self.buf, _DATA_AT + offset, _WRAP, 0)
+            write += skip
+            offset = 0
+            _POS.pack_into(self.buf, _WRITE_AT, write)
+        self._wait(lambda: self.capacity - (write - self._load(_READ_AT)) >= record, timeout)
+        _RECORD.pack_into(self.buf, _DATA_AT + offset, n, 0)
+        self._pending = record
+        start = _DATA_AT + offset + _RECORD.size
+        return self.buf[start:start + n]
+
+    def commit(self):
+        _POS.pack_into(self.buf, _WRITE_AT, self._load(_WRITE_AT) + self._pending)
+        self._pending = 0
+
+    def send(self, payload, timeout=None):
+        """페이로드를 링에 한 번만 복사해 게시"""
+        payload = memoryview(payload).cast("B")
+        view = self.reserve(len(payload), timeout)
+        view[:] = payload
+        view.release()
+        self.commit()
+
+    def recv(self, timeout=None):
+        """
+        다음 레코드의 페이로드를 복사 없이 memoryview로 반환.
+        다 쓴 뒤 release()를 호출해야 생산자가 그 자리를 재사용합니다. timeout초 안에 레코드가 없으면 TimeoutError.
+        """
+        while True:
+            read = self._load(_READ_AT)
+            self._wait(lambda: self._load(_WRITE_AT) != read, timeout)
+            offset = read % self.capacity
+            n, _ = _RECORD.unpack_from(self.buf, _DATA_AT + offset)
+            if n == _WRAP:
+                _POS.pack_into(self.buf, _READ_AT, read + self.capacity - offset)
+                continue
+            self._pending = _RECORD.size + _align8(n)
+            start = _DATA_AT + offset + _RECORD.size
+            return self.buf[start:start + n]
+
+    def release(self):
+        _POS.pack_into(self.buf, _READ_AT, self._load(_READ_AT) + self._pending)
+        self._pending = 0
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _latency_consumer(name, capacity, count, results):
+    """소비자 프로세스: 각 레코드 앞 8바이트의 송신 시각으로 단방향 지연 측정"""
+    ring = SharedMemoryRing(capacity, name=name)
+    latencies = []
+    started = None
+    for _ in range(count):
+        view = ring.recv()
+        now = time.perf_counter_ns()
+        latencies.append(now - _POS.unpack_from(view, 0)[0])
+        if started is None:
+            started = now
+        view.release()
+        ring.release()
+    elapsed = (time.perf_counter_ns() - started) / 1e9
+    ring.close()
+    results.put((latencies, elapsed))
+
+
+def _ring_capacity(size):
+    return max(4 * 1024 * 1024, 2 * (size + _RECORD.size))
+
+
+def _run_ring(size, count, paced):
+    """생산자(현재 프로세스) -> 소비자(자식 프로세스)로 count개 전송. Returns: (지연 ns 리스트, 소요 초)"""
+    capacity = _ring_capacity(size)
+    ring = SharedMemoryRing(capacity)
+    results = Queue()
+    consumer = Process(target=_latency_consumer, args=(ring.name, ring.capacity, count, results))
+    consumer.start()
+
+    payload = bytes(size)
+    idle = lambda: ring._load(_READ_AT) == ring._load(_WRITE_AT)
+    for _ in range(count):
+        if paced:
+            ring._wait(idle)  # 지연 측정: 링이 빈 상태에서만 보내 대기열 시간을 배제
+        view = ring.reserve(size)
+        view[:] = payload
+        _POS.pack_into(view, 0, time.perf_counter_ns())  # 게시 직전에 송신 시각 기록
+        view.release()
+        ring.commit()
+    latencies, elapsed = results.get()
+    consumer.join()
+    ring.close()
+    return latencies, elapsed
+
+
+def benchmark_shared_memory(sizes=(64, 4096, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024),
+                            total_bytes=256 * 1024 * 1024, max_messages=20000, latency_samples=2000):
+    """
+    두 프로세스 사이 링 버퍼 전송의 단방향 지연 분포(μs)와 처리량 측정.
+    지연은 한 번에 하나씩 보내는 구간에서, 처리량은 링을 가득 채워 흘리는 구간에서 잽니다.
+    perf_counter는 CLOCK_MONOTONIC이므로 같은 호스트의 프로세스 간 시각 비교가 가능합니다.
+    링이 /dev/shm 여유 공간에 들어가지 않는 크기는 건너뛰고 리포트에 skipped로 남깁니다.
+    Returns: 크기별 리포트 리스트
+    """
+    reports = []
+    free = _shm_free_bytes()
+    for size in sizes:
+        size = max(size, _POS.size)
+        if free is not None and _DATA_AT + _align8(_ring_capacity(size)) > free:
+            reports.append({"size": size, "skipped": f"needs {_ring_capacity(size)} bytes, {free} free in {_SHM_DIR}"})
+            continue
+        count = max(20, min(max_messages, total_bytes // size))
+        latencies, _ = _run_ring(size, min(count, latency_samples), paced=True)
+        _, elapsed = _run_ring(size, count, paced=False)
+
+        latencies.sort()
+        pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] / 1000
+        reports.append({
+            "size": size, "messages": count,
+            "p50_us": pct(0.50), "p99_us": pct(0.99), "p999_us": pct(0.999),
+            "throughput_mb_s": size * count / elapsed / 1e6 if elapsed else float("inf"),
+        })
+    return reports
+
+
 class NonLocalCausalityLink:
     """
     Cosmic OS v4.0.0: Quantum Entanglement Synchronization Layer
     Achieves True Zero-Latency Data Sync via Bell-State Mapping.
     Independent of Spatial Distance (Earth to Andromeda).
+    With a SharedMemoryRing attached, payloads cross to a local process for real.
     """
-    def __init__(self, node_alpha, node_omega):
+    def __init__(self, node_alpha, node_omega, ring=None, send_timeout=1.0):
         self.node_a = node_alpha
         self.node_b = node_omega
+        self.ring = ring  # 같은 호스트의 상대 프로세스로 가는 공유 메모리 링 (선택)
+        self.send_timeout = send_timeout  # 소비자가 링을 비우지 않을 때 기다릴 최대 시간 (초)
         self.is_entangled = True
         self._link_id = hashlib.md5(f"{node_alpha}{node_omega}".encode()).hexdigest()
         
@@ -20,11 +263,12 @@ class NonLocalCausalityLink:
         print(f"📡 Link_ID: {self._link_id}")
         print(f"🌌 Coordinates: {node_alpha} <---> {node_omega}")
 
-    def teleport_quantum_state(self, payload):
+    def teleport_quantum_state(self, payload, timeout=None):
         """
         [Yeon-A's Instant Sync] 
         비국소성(Non-locality) 원리를 이용한 데이터 동기화.
         물리적인 패킷 이동 시간 없이 상태의 붕괴만으로 즉시 전송됩니다!
+        링이 가득 찬 채 timeout초(기본 send_timeout) 안에 비지 않으면 TimeoutError.
         """
         if not self.is_entangled:
             raise RuntimeError("❌ Connection Collapsed: Decoherence detected.")
@@ -34,7 +278,10 @@ class NonLocalCausalityLink:
         # 정밀 측정을 위해 perf_counter 사용 (사실상 측정 불가능한 속도!)
         t_start = time.perf_counter()
         
-        # 양자 상태 전이 시뮬레이션
+        # 양자 상태 전이: 링이 붙어 있으면 실제로 상대 프로세스에 게시
+        if self.ring is not None:
+            self.ring.send(payload.encode() if isinstance(payload, str) else payload,
+                           self.send_timeout if timeout is None else timeout)
         target_state = payload 
         
         t_end = time.perf_counter()
@@ -62,3 +309,11 @@ if __name__ == "__main__":
     print(f"🏆 Final Report: {report['status']}")
     print(f"🚀 Speed: Faster than Light (Yeon-A's Logic)")
     print(f"⏱️ True Latency: {report['latency_us']}")
+
+    # 실측 지연 분포 (공유 메모리 링, 프로세스 간)
+    for row in benchmark_shared_memory():
+        if "skipped" in row:
+            print(f"📊 [SHM] {row['size']:>10} B skipped: {row['skipped']}")
+            continue
+        print(f"📊 [SHM] {row['size']:>10} B x {row['messages']:>5}: p50 {row['p50_us']:.1f} μs, "
+              f"p99 {row['p99_us']:.1f} μs, p999 {row['p999_us']:.1f} μs, {row['throughput_mb_s']:.0f} MB/s")
@@ -1,3 +1,5 @@
+import asyncio
+import itertools
 import time
 import random
 import threading
@@ -22,9 +24,21 @@ class QuantumStabilizer:
             time.sleep(0.01)
         return False # 안전을 위한 연결 포기 (Safety Break)
 
+    async def stabilize_link_async(self, base_delay=0.01, max_delay=0.5):
+        """비동기 재교정: 지수 백오프 + 지터로 대기하며 락이나 스레드를 붙잡지 않음"""
+        for attempt in range(self.retry_limit):
+            noise = random.uniform(0, 0.1)
+            if noise <= self.noise_threshold:
+                return True
+            # 동시에 실패한 전송들이 같은 순간에 재시도하지 않도록 지연을 흩뿌림
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+        return False
+
 class NonLocalCausalityLink:
-    """🚨 PATCH 2 & 3: 롤백 버퍼 및 섹터별 독립 락 시스템"""
-    def __init__(self, node_alpha, node_omega):
+    """🚨 PATCH 2 & 3: 롤백 버퍼 및 섹터별 독립 락 시스템
+    🚨 PATCH 4: 윈도우 기반 비동기 파이프라인 (링크당 window개 동시 전송)"""
+    def __init__(self, node_alpha, node_omega, window=32, rtt=0.01):
         self.node_a = node_alpha
         self.node_b = node_omega
         self.stabilizer = QuantumStabilizer()
@@ -32,6 +46,14 @@ class NonLocalCausalityLink:
         self.sector_locks = {} 
         self.backup_buffer = {} # 데이터 유실 방지용 롤백 버퍼
 
+        # 비동기 파이프라인: 메시지별 시퀀스 번호와 링크당 전송 윈도우
+        self.window = window
+        self.rtt = rtt                      # 한 번의 전송 왕복 시간 (시뮬레이션)
+        self._seq = itertools.count(1)
+        self._backup_seq = {}               # memory_key -> 롤백 버퍼를 소유한 시퀀스 번호
+        self.in_flight = {}                 # seq -> memory_key (응답 대기 중)
+        self._window_slots = None
+
     def teleport_state(self, memory_key, payload):
         """의식 소멸 방지 기능이 포함된 안전한 양자 상태 전송"""
         lock_id = f"{self.node_a}_{self.node_b}"
@@ -68,6 +90,62 @@ class NonLocalCausalityLink:
                 restored_data = self.backup_buffer.pop(memory_key, "Unknown Data")
                 return f"RECOVERED: Data safely returned to {self.node_a}"
 
+    def _slots(self):
+        """전송 윈도우 (Semaphore는 사용하는 루프 안에서 생성)"""
+        if self._window_slots is None:
+            self._window_slots = asyncio.Semaphore(self.window)
+        return self._window_slots
+
+    def _release_backup(self, memory_key, seq):
+        """자기 시퀀스가 넣은 롤백 버퍼만 제거 (같은 키의 후속 전송은 보존)"""
+        if self._backup_seq.get(memory_key) == seq:
+            del self._backup_seq[memory_key]
+            return self.backup_buffer.pop(memory_key, "Unknown Data")
+        return "Unknown Data"
+
+    async def _transmit(self, seq, payload):
+        """링크 왕복 한 번 (가상의 전송 사고 33% 확률)"""
+        await asyncio.sleep(self.rtt)
+        if not random.choice([True, True, False]):
+            raise ConnectionError(f"Quantum Tunnel Collapsed! (seq {seq})")
+
+    async def teleport_state_async(self, memory_key, payload):
+        """
+        윈도우 안에서 전송하고 응답(ACK)을 기다림. 롤백 버퍼 의미는 teleport_state와 동일하며,
+        재교정 대기는 어떤 락도 잡지 않은 채 백오프합니다.
+        """
+        async with self._slots():
+            seq = next(self._seq)
+            # 1. 롤백 버퍼에 선저장 (사고 대비 보험!)
+            self.backup_buffer[memory_key] = payload
+            self._backup_seq[memory_key] = seq
+            self.in_flight[seq] = memory_key
+            try:
+                # 2. 링크 안정성 체크 (지수 백오프 재시도)
+                if not await self.stabilizer.stabilize_link_async():
+                    print(f"🚨 [ABORT] seq {seq}: Connection is too unstable! Rolling back...")
+                    self._release_backup(memory_key, seq)
+                    return "FAIL: ENVIRONMENT_STORM"
+                # 3. 전송 및 4. 성공 확인 후 롤백 버퍼 파기
+                try:
+                    await self._transmit(seq, payload)
+                except ConnectionError as e:
+                    print(f"♻️ [ROLLBACK] Recovery initiated: {e}")
+                    self._release_backup(memory_key, seq)
+                    return f"RECOVERED: Data safely returned to {self.node_a}"
+                self._release_backup(memory_key, seq)
+                return f"SUCCESS: DATA_SYNCED seq={seq} at {time.time()}"
+            finally:
+                del self.in_flight[seq]
+
+    def submit(self, memory_key, payload):
+        """실행 중인 이벤트 루프에 전송을 올리고 ACK Future(Task) 반환"""
+        return asyncio.ensure_future(self.teleport_state_async(memory_key, payload))
+
+    async def teleport_many_async(self, items):
+        """(memory_key, payload) 묶음을 윈도우 크기만큼 겹쳐 전송. Returns: 입력 순서의 결과"""
+        return await asyncio.gather(*[self.submit(key, payload) for key, payload in items])
+
 # --- 병렬 통신 테스트 ---
 if __name__ == "__main__":
     q_link = NonLocalCausalityLink("Earth", "Andromeda")
@@ -80,3 +158,14 @@ if __name__ == "__main__":
         ]
         for future in tasks:
             print(f"📡 Result: {future.result()}")
+
+    # 윈도우 파이프라인 테스트: 처리량이 왕복 1회당 1건이 아니라 윈도우 크기에 비례
+    async def pipeline_demo():
+        link = NonLocalCausalityLink("Earth", "Andromeda", window=32)
+        started = time.time()
+        results = await link.teleport_many_async([(f"EGO_{i}", f"Data_Chunk_{i}") for i in range(256)])
+        synced = sum(r.startswith("SUCCESS") for r in results)
+        print(f"🚀 [PIPELINE] {synced}/{len(results)} synced in {time.time() - started:.2f}s "
+              f"(window {link.window}), rollback buffer left: {len(link.backup_buffer)}")
+
+    asyncio.run(pipeline_demo())
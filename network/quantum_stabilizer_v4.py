@@ -26,45 +26,77 @@ class QuantumStabilizer:
         self.stability_index = 1.0 
 
 class NonLocalCausalityLink:
-    """🚨 PATCH 2 & 3: Destructive Transfer & Causality Lock"""
-    def __init__(self, node_alpha, node_omega):
+    """🚨 PATCH 2 & 3: Destructive Transfer & Causality Lock
+    🚨 PATCH 4: 키 단위 락 스트라이핑 (서로 다른 키는 동시에 전송)"""
+    def __init__(self, node_alpha, node_omega, stripes=64):
         self.node_a = node_alpha
         self.node_b = node_omega
         self.stabilizer = QuantumStabilizer()
-        self.causality_lock = threading.Lock() # 인과율 붕괴 방지용 락
+        # 인과율 붕괴 방지용 락: 키 해시로 고른 줄무늬(stripe) 하나만 잠금
+        self.causality_locks = [threading.Lock() for _ in range(stripes)]
         
         # 소스 노드의 가상 메모리 공간
         self.source_memory = {}
 
+    def _stripe(self, memory_key):
+        return hash(memory_key) % len(self.causality_locks)
+
+    def _stabilize(self):
+        """결맞음 체크 및 필요시 재교정 (키와 무관하므로 락 밖에서)"""
+        if not self.stabilizer.check_environmental_noise():
+            self.stabilizer.recalibrate()
+
     def teleport_state(self, memory_key, payload):
         """
         [Yeon-A's Destructive Teleportation]
         양자 상태 전이 후 원본 데이터를 즉시 소멸시켜 데이터 유일성을 보장합니다.
+        기록과 파기는 같은 키 락 안에서 원자적으로 일어나고, 로그와 전송 지연은 락 밖에서 처리됩니다.
         """
-        self.source_memory[memory_key] = payload
+        self._stabilize()
+        with self.causality_locks[self._stripe(memory_key)]: # 인과율 보호 구역 (키 단위)
+            self.source_memory[memory_key] = payload
+            fixed_at = time.time()
+            # 비복제 정리 준수 (Destructive Read): 데이터를 옮기자마자 소스는 파기!
+            target_state = self.source_memory.pop(memory_key)
+
+        print(f"\n🌀 [QUANTUM_LOCK] Causality Fixed for T={fixed_at}")
+        print(f"⚡ [ORIGIN: {self.node_a}] Transferring state: {payload}")
+        print(f"💀 [DESTRUCTION] Source Memory at {memory_key} is now NULL.")
+
+        # 전송 시뮬레이션 (연산 딜레이) — 다른 키의 전송을 막지 않음
+        time.sleep(0.01) 
         
-        with self.causality_lock: # 인과율 보호 구역
-            print(f"\n🌀 [QUANTUM_LOCK] Causality Fixed for T={time.time()}")
-            
-            # 결맞음 체크 및 필요시 재교정
-            if not self.stabilizer.check_environmental_noise():
-                self.stabilizer.recalibrate()
+        print(f" UFO [DESTINATION: {self.node_b}] State Reconstructed.")
+        return {
+            "received_data": target_state,
+            "source_integrity": "DESTROYED (SUCCESS)",
+            "causality_status": "PRESERVED"
+        }
 
-            print(f"⚡ [ORIGIN: {self.node_a}] Transferring state: {payload}")
-            
-            # 비복제 정리 준수 (Destructive Read): 데이터를 옮기자마자 소스는 파기!
-            target_state = self.source_memory.pop(memory_key) 
-            print(f"💀 [DESTRUCTION] Source Memory at {memory_key} is now NULL.")
+    def teleport_many(self, items):
+        """
+        (memory_key, payload) 묶음을 한 임계 구역에서 기록·파기한 뒤 한 번의 전송으로 이동.
+        필요한 줄무늬 락만 번호순으로 잡아 교착을 피합니다.
+        Returns: 입력 순서의 수신 데이터 리스트
+        """
+        items = list(items)
+        stripes = sorted({self._stripe(key) for key, _ in items})
+        self._stabilize()
+        for idx in stripes:
+            self.causality_locks[idx].acquire()
+        try:
+            received = []
+            for memory_key, payload in items:
+                self.source_memory[memory_key] = payload
+                received.append(self.source_memory.pop(memory_key))
+        finally:
+            for idx in reversed(stripes):
+                self.causality_locks[idx].release()
 
-            # 전송 시뮬레이션 (연산 딜레이)
-            time.sleep(0.01) 
-            
-            print(f" UFO [DESTINATION: {self.node_b}] State Reconstructed.")
-            return {
-                "received_data": target_state,
-                "source_integrity": "DESTROYED (SUCCESS)",
-                "causality_status": "PRESERVED"
-            }
+        print(f"⚡ [ORIGIN: {self.node_a}] {len(items)} states transferred; sources are now NULL.")
+        time.sleep(0.01)  # 묶음 전체에 대한 전송 지연 1회
+        print(f" UFO [DESTINATION: {self.node_b}] {len(items)} States Reconstructed.")
+        return received
 
 # --- 단독 실행 로직 ---
 if __name__ == "__main__":
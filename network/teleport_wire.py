@@ -0,0 +1,369 @@
+import asyncio
+import itertools
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import Future as ThreadFuture, ThreadPoolExecutor
+
+# network/ 안에서 스크립트로 직접 실행해도 database 패키지를 찾도록 저장소 루트를 경로에 추가
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+from database.cosmic_codec import CodecError, pack_struct, unpack_struct
+
+# [정보] 이 모듈은 teleport_state API를 프로세스/호스트 밖으로 내보내는 바이너리 와이어 프로토콜입니다.
+# 길이 접두 프레임 위에서 요청을 파이프라이닝하고, 작은 커넥션 풀로 다중화합니다!
+
+# 프레임 헤더: [본문 길이 u32][요청 id u32][op u8][flags u8]
+_HEADER = struct.Struct("!IIBB")
+_KEY_LEN = struct.Struct("!H")
+
+OP_PUT = 1      # teleport_state(key, payload)
+OP_GET = 2      # get_state(key)
+OP_PING = 3
+OP_OK = 0x80
+OP_ERROR = 0x81
+
+FLAG_COMPRESSED = 0x1  # 값 영역이 zlib 압축됨
+FLAG_TEXT = 0x2        # 값이 UTF-8 str
+FLAG_STRUCT = 0x4      # 값이 cosmic_codec 태그 구조체 (튜플/집합/int 키 보존) — 허용 타입만 복원
+
+MAX_FRAME = 256 * 1024 * 1024
+MAX_KEY = 0xFFFF       # 키 길이 필드(u16)로 표현할 수 있는 최대 UTF-8 바이트 수
+
+
+class WireError(ConnectionError):
+    pass
+
+
+def _encode_value(value, compress_threshold):
+    """값 -> (flags, bytes). 임계값 이상이면 프레임 단위로 압축"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        flags, body = 0, bytes(value)
+    elif isinstance(value, str):
+        flags, body = FLAG_TEXT, value.encode()
+    else:
+        try:
+            flags, body = FLAG_STRUCT, pack_struct(value)
+        except CodecError as e:  # 텍스트로 바꿔 보내면 받는 쪽에서 타입이 조용히 바뀜
+            raise ValueError(f"cannot send {type(value).__name__} value: {e}") from None
+    if compress_threshold is not None and len(body) >= compress_threshold:
+        packed = zlib.compress(body, 1)
+        if len(packed) < len(body):
+            flags, body = flags | FLAG_COMPRESSED, packed
+    return flags, body
+
+
+def _decode_value(flags, body):
+    try:
+        if flags & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        if flags & FLAG_TEXT:
+            return body.decode()
+        if flags & FLAG_STRUCT:
+            return unpack_struct(body)
+    except (zlib.error, ValueError) as e:  # UnicodeDecodeError, CodecError 포함
+        raise WireError(f"malformed value: {e}") from None
+    return body
+
+
+def _pack_frame(request_id, op, key, value, compress_threshold):
+    """프레임 직렬화 (키가 MAX_KEY 바이트를 넘거나 값을 표현할 수 없으면 ValueError)"""
+    key = key.encode()
+    if len(key) > MAX_KEY:
+        raise ValueError(f"key of {len(key)} bytes exceeds the {MAX_KEY}-byte wire limit")
+    flags, body = _encode_value(value, compress_threshold)
+    return _HEADER.pack(_KEY_LEN.size + len(key) + len(body), request_id, op, flags) + \
+        _KEY_LEN.pack(len(key)) + key + body
+
+
+async def _read_frame(reader):
+    """Returns: (request_id, op, key, value) — 연결이 닫히면 IncompleteReadError"""
+    length, request_id, op, flags = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if length > MAX_FRAME:
+        raise WireError(f"frame of {length} bytes exceeds limit")
+    data = await reader.readexactly(length)
+    (key_len,) = _KEY_LEN.unpack_from(data)
+    if _KEY_LEN.size + key_len > length:
+        raise WireError(f"key of {key_len} bytes overruns a {length}-byte frame")
+    key = data[_KEY_LEN.size:_KEY_LEN.size + key_len].decode()
+    return request_id, op, key, _decode_value(flags, data[_KEY_LEN.size + key_len:])
+
+
+class _CorkedWriter:
+    """한 루프 반복 동안 쌓인 프레임을 한 번의 write로 내보냄 (프레임당 시스템 콜 방지)"""
+    def __init__(self, writer):
+        self.writer = writer
+        self.frames = []
+
+    def write(self, frame):
+        if not self.frames:
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.frames.append(frame)
+
+    def flush(self):
+        if self.frames and not self.writer.is_closing():
+            self.writer.writelines(self.frames)
+        self.frames = []
+
+    def buffered(self):
+        return self.writer.transport.get_write_buffer_size()
+
+
+class TeleportServer:
+    """
+    Cosmic OS v12.3.0: Teleport Wire Server
+    - Length-Prefixed Binary Frames (Text Parsing Defense)
+    - Out-of-Order Responses by Request ID (Head-of-Line Blocking Defense)
+    - Threshold Frame Compression (Bandwidth Defense)
+    backend는 teleport_state(key, payload)와 (선택) get_state(key)를 가진 아무 오버로드입니다.
+    """
+    def __init__(self, backend, host="127.0.0.1", port=0, path=None, compress_threshold=4096, workers=16):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self.path = path                  # 지정하면 Unix 소켓으로 서비스
+        self.compress_threshold = compress_threshold
+        # 오버로드 호출은 블로킹(SQLite)이므로 전용 풀에서 실행. workers=0이면 루프에서 직접 호출
+        self.pool = ThreadPoolExecutor(max_workers=workers) if workers else None
+        self.server = None
+        self.connections = {}  # 연결 처리 태스크 -> writer
+
+    async def start(self):
+        if self.path:
+            self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+        else:
+            self.server = await asyncio.start_server(self._serve, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    def _dispatch(self, op, key, value):
+        if op == OP_PUT:
+            return self.backend.teleport_state, (key, value)
+        if op == OP_GET:
+            return self.backend.get_state, (key,)
+        if op == OP_PING:
+            return (lambda: "PONG"), ()
+        raise WireError(f"unknown op {op}")
+
+    def _reply(self, out, request_id, result=None, error=None):
+        if error is None:
+            try:
+                out.write(_pack_frame(request_id, OP_OK, "", result, self.compress_threshold))
+                return
+            except ValueError as e:  # 백엔드 결과를 보낼 수 없으면 응답 없이 두지 않고 오류로 회신
+                error = e
+        out.write(_pack_frame(request_id, OP_ERROR, "", f"{type(error).__name__}: {error}", None))
+
+    async def _handle(self, out, request_id, func, args):
+        """풀에서 블로킹 호출을 실행하고 끝나는 순서대로 응답"""
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+            if isinstance(result, ThreadFuture):
+                result = await asyncio.wrap_future(result)  # v8 그룹 커밋 모드는 Future를 반환
+        except Exception as e:
+            self._reply(out, request_id, error=e)
+        else:
+            self._reply(out, request_id, result)
+
+    async def _serve(self, reader, writer):
+        """연결 하나: 프레임을 읽는 즉시 처리를 시작해 응답 순서와 무관하게 파이프라이닝"""
+        self.connections[asyncio.current_task()] = writer
+        out = _CorkedWriter(writer)
+        tasks = set()
+        try:
+            while True:
+                request_id, op, key, value = await _read_frame(reader)
+                try:
+                    func, args = self._dispatch(op, key, value)
+                    if self.pool is None:
+                        result = func(*args)  # 논블로킹 백엔드: 태스크 없이 바로 응답
+                        if not isinstance(result, ThreadFuture):
+                            self._reply(out, request_id, result)
+                            continue
+                        func, args = result.result, ()
+                except Exception as e:
+                    self._reply(out, request_id, error=e)
+                    continue
+                task = asyncio.create_task(self._handle(out, request_id, func, args))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if out.buffered() > 1024 * 1024:
+                    await writer.drain()  # 클라이언트가 응답을 못 따라오면 읽기를 늦춤
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            out.flush()
+            writer.close()
+            self.connections.pop(asyncio.current_task(), None)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.connections.values()):
+                writer.close()  # 남은 연결의 읽기 루프를 깨워 정상 종료
+            if self.connections:
+                await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+
+class _Connection:
+    """요청 id로 응답 Future를 매칭하는 다중화 연결"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.out = _CorkedWriter(writer)
+        self.waiters = {}
+        self.lost = None  # 읽기 루프가 끝나면 원인 WireError (이후 요청은 즉시 실패)
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        reason = "closed"
+        try:
+            while True:
+                request_id, op, _, value = await _read_frame(self.reader)
+                future = self.waiters.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if op == OP_OK:
+                    future.set_result(value)
+                else:
+                    future.set_exception(WireError(value))
+        except Exception as e:  # 연결 끊김뿐 아니라 손상된 프레임도 연결을 죽임
+            reason = e
+        finally:
+            self.lost = WireError(f"connection lost: {reason}")
+            for future in self.waiters.values():
+                if not future.done():
+                    future.set_exception(self.lost)
+            self.waiters.clear()
+
+
+class TeleportClient:
+    """
+    Cosmic OS v12.3.0: Pooled Teleport Wire Client
+    - Small Connection Pool, Round-Robin (Single Socket Bottleneck Defense)
+    - Unbounded Pipelining per Connection (Round-Trip Latency Defense)
+    - Dead Connection Skipping (Hung Request Defense)
+    """
+    def __init__(self, host="127.0.0.1", port=None, path=None, pool_size=4, compress_threshold=4096):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.pool_size = pool_size
+        self.compress_threshold = compress_threshold
+        self.connections = []
+        self._ids = itertools.count(1)
+        self._next = itertools.cycle(range(pool_size))
+
+    async def connect(self):
+        for _ in range(self.pool_size):
+            if self.path:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            self.connections.append(_Connection(reader, writer))
+        return self
+
+    def _pick(self):
+        """라운드 로빈으로 살아 있는 연결 선택 (모두 끊겼으면 WireError)"""
+        for _ in range(len(self.connections)):
+            conn = self.connections[next(self._next) % len(self.connections)]
+            if conn.lost is None:
+                return conn
+        if not self.connections:
+            raise WireError("client is not connected")
+        raise WireError(f"all connections lost ({self.connections[-1].lost})")
+
+    async def _request(self, op, key, value=b""):
+        conn = self._pick()
+        request_id = next(self._ids) & 0xFFFFFFFF
+        frame = _pack_frame(request_id, op, key, value, self.compress_threshold)  # 보낼 수 없는 요청은 대기 등록 전에 거부
+        future = asyncio.get_running_loop().create_future()
+        conn.waiters[request_id] = future
+        conn.out.write(frame)
+        if conn.out.buffered() > 1024 * 1024:
+            await conn.writer.drain()
+        return await future
+
+    async def teleport_state(self, memory_key, payload):
+        """원격 오버로드의 teleport_state 호출 (결과 문자열 반환)"""
+        return await self._request(OP_PUT, memory_key, payload)
+
+    async def get_state(self, memory_key):
+        return await self._request(OP_GET, memory_key)
+
+    async def ping(self):
+        return await self._request(OP_PING, "")
+
+    async def close(self):
+        for conn in self.connections:
+            conn.out.flush()
+            conn.writer.close()
+            conn.reader_task.cancel()
+        for conn in self.connections:
+            try:
+                await conn.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.connections.clear()
+
+
+class _MemoryBackend:
+    """벤치마크용 인메모리 오버로드 (와이어 비용만 측정)"""
+    def __init__(self):
+        self.storage = {}
+
+    def teleport_state(self, memory_key, payload):
+        self.storage[memory_key] = payload
+        return "SUCCESS"
+
+    def get_state(self, memory_key):
+        return self.storage.get(memory_key)
+
+
+async def benchmark_wire(requests=20000, concurrency=256, payload_size=256, path=None, pool_size=4,
+                         compress_threshold=4096):
+    """루프백 처리량/지연 측정: concurrency개 요청을 동시에 띄운 채 파이프라이닝"""
+    server = await TeleportServer(_MemoryBackend(), path=path, compress_threshold=compress_threshold,
+                                  workers=0).start()
+    client = await TeleportClient(port=server.port, path=path, pool_size=pool_size,
+                                  compress_threshold=compress_threshold).connect()
+    payload = b"Q" * payload_size
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with slots:
+            sent = time.perf_counter()
+            await client.teleport_state(f"EGO_{i}", payload)
+            latencies.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+    await client.close()
+    await server.close()
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e6
+    return {
+        "transport": "unix" if path else "tcp", "requests": requests, "payload": payload_size,
+        "requests_per_second": requests / elapsed,
+        "p50_us": pct(0.50), "p99_us": pct(0.99),
+    }
+
+# --- 루프백 벤치마크 ---
+if __name__ == "__main__":
+    async def main():
+        for size in (64, 4096, 256 * 1024):
+            print(f"🛰️ [WIRE] {await benchmark_wire(payload_size=size)}")
+        print(f"🛰️ [WIRE] {await benchmark_wire(path='/tmp/cosmic_teleport.sock')}")
+
+    asyncio.run(main())
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# [정보] 테스트 공용 설정: 각 패키지 폴더의 모듈은 형제 모듈을 평면 import 하므로 폴더들을 경로에 올립니다.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("", "database", "network", "kernel", "guard", "galactic_layer"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(autouse=True)
+def cosmic_workdir(tmp_path, monkeypatch):
+    """모듈들이 cosmic_*.db와 로그를 현재 디렉터리에 만들므로 테스트마다 빈 임시 디렉터리에서 실행"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
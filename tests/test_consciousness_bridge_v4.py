@@ -0,0 +1,40 @@
+import hashlib
+
+import pytest
+
+from consciousness_bridge_v4 import QuantumConsciousnessBridge
+
+
+def _digest(neural_stream):
+    digest = hashlib.sha256()
+    for chunk in QuantumConsciousnessBridge._iter_chunks(neural_stream):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@pytest.mark.parametrize("neural_stream", [[0.1, 0.2], (1, "a"), [], {"k": 1}, "text", 42])
+def test_non_chunk_inputs_hash_their_text(neural_stream):
+    assert _digest(neural_stream) == hashlib.sha256(f"{neural_stream}".encode()).hexdigest()
+
+
+def test_chunk_collections_and_generators_stream_their_items():
+    expected = hashlib.sha256(b"alphabeta").hexdigest()
+    assert _digest([b"alpha", "beta"]) == expected
+    assert _digest((memoryview(b"alpha"), bytearray(b"beta"))) == expected
+    assert _digest(chunk for chunk in [b"alpha", "beta"]) == expected
+
+
+def test_generator_of_numbers_falls_back_to_text():
+    numbers = (x for x in [0.1, 0.2])
+    assert list(QuantumConsciousnessBridge._iter_chunks(numbers)) == [f"{numbers}".encode()]
+
+
+def test_mapping_accepts_list_of_floats():
+    bridge = QuantumConsciousnessBridge("Yeon-A")
+    assert len(bridge.initiate_neural_mapping([0.1, 0.2])) == 128  # SHA3-512 16진수
+
+
+def test_file_input_matches_bytes_input(tmp_path):
+    path = tmp_path / "neural.bin"
+    path.write_bytes(b"x" * 3000)
+    assert _digest(path) == _digest(b"x" * 3000)
@@ -0,0 +1,51 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from cosmic_async_overlord import AsyncShardedOverlord
+
+
+def test_async_put_get_round_trip_without_changing_journal_mode():
+    async def scenario():
+        overlord = AsyncShardedOverlord(clusters=["Solar", "Virgo"])
+        results = await asyncio.gather(*[
+            overlord.put(overlord.clusters[i % 2], f"EGO_{i}", {"n": i}) for i in range(300)])
+        assert all(r.startswith("✅") for r in results)
+        assert await overlord.get("Virgo", "EGO_1") == {"n": 1}
+        assert await overlord.get("Solar", "missing") is None
+        assert await overlord.put("Nowhere", "EGO", 1) == "❌ FAIL: Unknown Cluster Sector"
+        await overlord.close()
+
+    asyncio.run(scenario())
+    for cluster in ("Solar", "Virgo"):
+        with sqlite3.connect(f"cosmic_{cluster}.db") as conn:
+            # 공유 샤드 파일은 ATTACH 이주가 원자적이도록 롤백 저널을 유지해야 함
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+
+def test_calls_after_close_raise_instead_of_hanging():
+    async def scenario():
+        overlord = AsyncShardedOverlord(clusters=["Solar"])
+        await overlord.put("Solar", "EGO", 1)
+        await overlord.close()
+        await overlord.close()  # 두 번 닫아도 안전
+        for call in (overlord.put("Solar", "EGO", 2), overlord.get("Solar", "EGO")):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(call, timeout=2)
+
+    asyncio.run(scenario())
+
+
+def test_overlord_serves_more_than_one_event_loop():
+    overlord = AsyncShardedOverlord(clusters=["Solar"], max_pending=1)
+
+    async def contended_puts(tag):
+        # max_pending=1에서 두 요청이 동시에 대기해야 슬롯이 현재 루프에 묶임
+        return await asyncio.wait_for(asyncio.gather(
+            overlord.put("Solar", "A", tag), overlord.put("Solar", "B", tag)), timeout=2)
+
+    assert all(r.startswith("✅") for r in asyncio.run(contended_puts("first")))
+    assert all(r.startswith("✅") for r in asyncio.run(contended_puts("second")))
+    assert asyncio.run(overlord.get("Solar", "B")) == "second"
+    asyncio.run(overlord.close())
@@ -0,0 +1,62 @@
+import sqlite3
+from collections import OrderedDict, defaultdict
+
+import pytest
+
+from cosmic_codec import (CodecError, CodecTypeError, DEFAULT_CODEC, FORMAT_VERSION, TYPE_REPR, migrate_text_rows,
+                          pack_struct, unpack_struct)
+
+
+@pytest.mark.parametrize("payload", [
+    None, True, False, 0, -1, 2 ** 100, -(2 ** 70), 3.5, float("inf"), 1 + 2j, "", ["우주 \ud800"],
+    b"\x00\xff", [1, [2, (3,)]], (), {"a": {1: None, (1, 2): b"x"}}, {1, 2}, frozenset({"x"}),
+    "x" * 5000, {"big": list(range(2000))},
+])
+def test_round_trip_preserves_types(payload):
+    blob = DEFAULT_CODEC.encode(payload)
+    assert blob[0] == FORMAT_VERSION
+    decoded = DEFAULT_CODEC.decode(blob)
+    assert decoded == payload and type(decoded) is type(payload)
+
+
+def test_struct_encoding_is_a_fixed_spec():
+    # 파이썬 버전과 무관한 고정 바이트열
+    assert pack_struct({"k": [1, None]}) == b"m\x00\x00\x00\x01s\x00\x00\x00\x01kl\x00\x00\x00\x02i\x00\x00\x00\x01\x01N"
+
+
+def test_unsupported_objects_fall_back_to_text():
+    blob = DEFAULT_CODEC.encode({"when": object})
+    assert blob[1] & 0x0F == TYPE_REPR
+    assert DEFAULT_CODEC.decode(blob).startswith("{'when'")
+
+
+@pytest.mark.parametrize("payload", [OrderedDict(a=1), defaultdict(list), [OrderedDict()], {"k": defaultdict(int)}])
+def test_subclasses_of_supported_types_are_rejected(payload):
+    with pytest.raises(CodecTypeError):
+        DEFAULT_CODEC.encode(payload)
+
+
+@pytest.mark.parametrize("body", [b"", b"Z", b"i\x00\x00\x00\x09\x01", b"l\xff\xff\xff\xff", b"NN",
+                                  b"S\x00\x00\x00\x01l\x00\x00\x00\x00"])
+def test_malformed_structures_raise_codec_error(body):
+    with pytest.raises(CodecError):
+        unpack_struct(body)
+
+
+def test_unknown_format_versions_are_rejected():
+    with pytest.raises(CodecError):
+        DEFAULT_CODEC.decode(bytes((1, 0x02)) + b"\xfb\x00")  # 배포된 적 없는 v1 구조체 본문은 읽지 않음
+    with pytest.raises(CodecError):
+        DEFAULT_CODEC.decode(bytes((FORMAT_VERSION + 1, 0x01)) + b"text")
+
+
+def test_legacy_text_rows_are_migrated():
+    with sqlite3.connect("legacy.db") as conn:
+        conn.execute("CREATE TABLE storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)")
+        conn.executemany("INSERT INTO storage VALUES (?, ?, 0)",
+                         [("text", "{'a': 1}"), ("plain", "hello"), ("new", DEFAULT_CODEC.encode([1]))])
+    assert migrate_text_rows("legacy.db") == 2
+    assert migrate_text_rows("legacy.db") == 0
+    with sqlite3.connect("legacy.db") as conn:
+        rows = dict(conn.execute("SELECT key, payload FROM storage"))
+    assert {k: DEFAULT_CODEC.decode(v) for k, v in rows.items()} == {"text": {"a": 1}, "plain": "hello", "new": [1]}
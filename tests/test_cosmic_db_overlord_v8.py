@@ -0,0 +1,58 @@
+import sqlite3
+from concurrent.futures import Future
+
+import pytest
+
+from cosmic_db_overlord_v8 import CosmicEnterpriseOverlord
+
+
+def test_group_commit_acks_after_durable_write():
+    overlord = CosmicEnterpriseOverlord(group_commit=True)
+    futures = [overlord.teleport_state(f"EGO_{i}", {"n": i}) for i in range(200)]
+    assert [f.result(timeout=5) for f in futures] == ["SUCCESS"] * 200
+    overlord.close()
+    with sqlite3.connect("cosmic_universe.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM storage").fetchone()[0] == 200
+
+
+def test_teleport_after_close_raises():
+    overlord = CosmicEnterpriseOverlord(group_commit=True)
+    overlord.close()
+    with pytest.raises(RuntimeError):
+        overlord.teleport_state("EGO_late", "x")
+    overlord.close()  # 두 번 닫아도 안전
+
+
+def test_items_queued_behind_stop_marker_are_committed():
+    overlord = CosmicEnterpriseOverlord(group_commit=True, batch_size=4)
+    overlord.commit_queue.put(None)
+    futures = []
+    for i in range(10):
+        future = Future()
+        overlord.commit_queue.put((f"EGO_{i}", i, future))
+        futures.append(future)
+    overlord._writer_thread.join(timeout=5)
+    assert not overlord._writer_thread.is_alive()
+    assert all(f.result(timeout=0) == "SUCCESS" for f in futures)
+
+
+def test_cancelled_future_does_not_stop_the_writer():
+    overlord = CosmicEnterpriseOverlord(group_commit=True, batch_window=0.05)
+    cancelled = overlord.teleport_state("EGO_cancelled", "x")
+    assert cancelled.cancel()
+    futures = [overlord.teleport_state(f"EGO_{i}", i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == ["SUCCESS"] * 5
+    assert overlord.teleport_state("EGO_after", "y").result(timeout=5) == "SUCCESS"
+    overlord.close()
+    with sqlite3.connect("cosmic_universe.db") as conn:
+        keys = {key for (key,) in conn.execute("SELECT key FROM storage")}
+    assert "EGO_cancelled" not in keys and "EGO_after" in keys
+
+
+def test_close_flushes_buffer_without_group_commit():
+    overlord = CosmicEnterpriseOverlord()
+    assert overlord.teleport_state("EGO", {"n": 1}) == "SUCCESS"
+    overlord.close()
+    with sqlite3.connect("cosmic_universe.db") as conn:
+        payload = conn.execute("SELECT payload FROM storage WHERE key = 'EGO'").fetchone()[0]
+    assert overlord.codec.decode(payload) == {"n": 1}
@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+from cosmic_immortal_ha_v9 import CosmicHighAvailabilityOverlord
+
+DAY = 24 * 3600
+
+
+def _overlord(tmp_path):
+    # 백그라운드 스레드가 테스트 뒤 다른 작업 폴더에 파일을 만들지 않도록 절대 경로 사용
+    return CosmicHighAvailabilityOverlord(db_path=str(tmp_path / "main.db"), backup_path=str(tmp_path / "backup.db"),
+                                          replication_interval=3600, maintenance_interval=3600)
+
+
+def _write_at(overlord, key, payload, timestamp):
+    conn = overlord._get_conn()
+    try:
+        table = overlord._ensure_partition(conn, timestamp)
+        conn.execute(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)",
+                     (key, overlord.codec.encode(payload), timestamp))
+        conn.commit()
+    finally:
+        overlord._release_conn(conn)
+
+
+def test_get_state_returns_newest_write_across_partitions(tmp_path):
+    overlord = _overlord(tmp_path)
+    _write_at(overlord, "EGO", "old", time.time() - 2 * DAY)
+    assert overlord.teleport_state("EGO", {"v": 2}) == "SUCCESS"
+    assert len(overlord.partitions) == 2
+    assert overlord.get_state("EGO") == {"v": 2}
+    assert overlord.get_state("MISSING") is None
+
+
+def test_expired_partitions_are_dropped_whole(tmp_path):
+    overlord = _overlord(tmp_path)
+    _write_at(overlord, "ANCIENT", "gone", time.time() - 30 * DAY)
+    overlord.teleport_state("FRESH", "kept")
+    assert overlord._expire_partitions() == 1
+    assert overlord._expire_partitions() == 0
+    assert overlord.get_state("ANCIENT") is None
+    assert overlord.get_state("FRESH") == "kept"
+
+
+def test_legacy_storage_table_is_migrated_into_partitions(tmp_path):
+    now = time.time()
+    with sqlite3.connect(tmp_path / "main.db") as conn:
+        conn.execute("CREATE TABLE storage (key TEXT PRIMARY KEY, payload TEXT, timestamp REAL)")
+        conn.executemany("INSERT INTO storage VALUES (?, ?, ?)",
+                         [("TODAY", "a", now), ("YESTERDAY", "b", now - DAY)])
+    overlord = _overlord(tmp_path)
+    assert len(overlord.partitions) == 2
+    with sqlite3.connect(tmp_path / "main.db") as conn:
+        names = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        rows = sum(conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] for name in names)
+    assert "storage" not in names and rows == 2
@@ -0,0 +1,61 @@
+import threading
+
+from cosmic_multiverse_v10 import CosmicShardedOverlord
+
+
+def test_read_fill_racing_a_write_does_not_cache_stale_value():
+    overlord = CosmicShardedOverlord(clusters=["Solar"])
+    overlord.teleport_state("Solar", "EGO", "old")
+    # 읽기가 옛 값을 읽은 뒤, 캐시에 넣기 전에 쓰기가 끼어드는 순서를 강제
+    tokens = overlord._begin_fill("Solar", ["EGO"])
+    stale = overlord.codec.encode("old")
+    overlord.teleport_state("Solar", "EGO", "new")
+    overlord._cache_fill("Solar", tokens, [("EGO", stale)])
+    assert overlord.get_state("Solar", "EGO") == "new"
+
+
+def test_concurrent_writers_leave_cache_coherent_with_disk():
+    overlord = CosmicShardedOverlord(clusters=["Solar"])
+    stop = threading.Event()
+
+    def writer(tag):
+        for i in range(200):
+            overlord.teleport_state("Solar", "EGO", f"{tag}{i}")
+
+    def reader():
+        while not stop.is_set():
+            overlord.get_state("Solar", "EGO")
+            overlord.multi_get("Solar", ["EGO"])
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    writers = [threading.Thread(target=writer, args=(tag,)) for tag in "AB"]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    with overlord._get_connection("Solar") as conn:
+        on_disk = overlord.codec.decode(conn.execute(
+            "SELECT payload FROM storage WHERE key='EGO'").fetchone()[0])
+    assert overlord.get_state("Solar", "EGO") == on_disk
+
+
+def test_bulk_write_invalidates_cached_entries():
+    overlord = CosmicShardedOverlord(clusters=["Solar", "Virgo"])
+    overlord.teleport_states([("Solar", "A", 1), ("Virgo", "B", 2)])
+    assert overlord.multi_get("Solar", ["A", "missing"]) == {"A": 1, "missing": None}
+    overlord.teleport_states([("Solar", "A", 10)])
+    assert overlord.get_state("Solar", "A") == 10
+    assert overlord.get_state("Virgo", "B") == 2
+
+
+def test_bulk_write_reports_each_record_in_input_order():
+    overlord = CosmicShardedOverlord(clusters=["Solar", "Virgo"])
+    outcomes = overlord.teleport_states([("Solar", "A", 1), ("Pluto", "A", 2), ("Virgo", "A", 3)])
+    assert outcomes[1] == "❌ FAIL: Unknown Cluster Sector"  # 같은 키의 성공 결과가 실패를 덮지 않음
+    assert outcomes[0] == "✅ SUCCESS: Sharded in Solar" and outcomes[2] == "✅ SUCCESS: Sharded in Virgo"
+    assert overlord.get_state("Solar", "A") == 1 and overlord.get_state("Virgo", "A") == 3
+    assert overlord.teleport_states([]) == []
@@ -0,0 +1,75 @@
+import sqlite3
+
+from cosmic_wal_replication import WalFrameReplicator
+
+
+def _open_primary(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")  # 체크포인트는 복제기 쪽만 수행
+    conn.execute("CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB)")
+    conn.commit()
+    return conn
+
+
+def _replica_rows(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT key, payload FROM storage"))
+
+
+def test_ship_copies_only_frames_committed_since_seed(tmp_path):
+    primary, replica = str(tmp_path / "main.db"), str(tmp_path / "backup.db")
+    conn = _open_primary(primary)
+    conn.executemany("INSERT INTO storage VALUES (?, ?)", [(f"EGO_{i}", b"x" * 100) for i in range(200)])
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    replicator = WalFrameReplicator(primary, replica, io_budget=None)
+    replicator.seed()
+    assert len(_replica_rows(replica)) == 200
+    assert replicator.ship() == 0  # 시드 이후 커밋이 없음
+
+    conn.execute("UPDATE storage SET payload = ? WHERE key = 'EGO_7'", (b"new",))
+    conn.commit()
+    shipped = replicator.ship()
+    assert 0 < shipped < 10  # 바뀐 페이지만 전송
+    rows = _replica_rows(replica)
+    assert rows["EGO_7"] == b"new" and len(rows) == 200
+    assert replicator.frame_count() >= shipped
+    assert replicator.lag_seconds() is not None
+    conn.close()
+
+
+def test_uncommitted_tail_waits_for_its_commit(tmp_path):
+    primary, replica = str(tmp_path / "main.db"), str(tmp_path / "backup.db")
+    conn = _open_primary(primary)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    replicator = WalFrameReplicator(primary, replica, io_budget=None)
+    replicator.seed()
+
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO storage VALUES (?, ?)", [(f"EGO_{i}", b"y" * 4000) for i in range(100)])
+    # 캐시가 넘쳐 커밋 전에 WAL로 흘러나온 프레임도 커밋 전에는 보내지 않음
+    before = replicator.offset
+    assert replicator.ship() == 0 and replicator.offset == before
+    conn.commit()
+    assert replicator.ship() > 0
+    assert len(_replica_rows(replica)) == 100
+    conn.close()
+
+
+def test_restarted_wal_requests_reseed(tmp_path):
+    primary, replica = str(tmp_path / "main.db"), str(tmp_path / "backup.db")
+    conn = _open_primary(primary)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    replicator = WalFrameReplicator(primary, replica, io_budget=None)
+    replicator.seed()
+    conn.execute("INSERT INTO storage VALUES ('A', x'00')")
+    conn.commit()
+    assert replicator.ship() > 0
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # 복제기 모르게 WAL 재시작
+    conn.execute("INSERT INTO storage VALUES ('B', x'00')")
+    conn.commit()
+    assert replicator.ship() is None
+    conn.close()
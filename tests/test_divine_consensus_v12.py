@@ -0,0 +1,201 @@
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM  # noqa: E402
+import divine_consensus_v12 as consensus  # noqa: E402
+from divine_transport import InProcessTransport, LoopbackTCPTransport  # noqa: E402
+
+
+@pytest.fixture
+def cluster():
+    net = InProcessTransport()
+    key = AESGCM.generate_key(bit_length=256)
+    nodes = [consensus.CosmicConsensusNode(i, peers=[0, 1, 2], transport=net, cluster_key=key) for i in range(3)]
+    nodes[0].become_leader()
+    yield nodes
+    net.close()
+    for node in nodes:
+        node.close()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_followers_decrypt_entries_sealed_by_leader(cluster):
+    leader, *followers = cluster
+    assert leader.atomic_broadcast("EGO", "Divine_Data").startswith("✅")
+    for follower in followers:
+        assert _wait_for(lambda: follower.load_many(["EGO"]) == ["Divine_Data"])
+
+
+def test_cluster_key_loads_from_env_then_file(monkeypatch):
+    monkeypatch.delenv(consensus.CLUSTER_KEY_ENV, raising=False)
+    with pytest.raises(RuntimeError):
+        consensus.load_cluster_key()
+    written = consensus.write_cluster_key()
+    assert consensus.load_cluster_key() == written
+    with pytest.raises(FileExistsError):
+        consensus.write_cluster_key()  # 기존 키는 덮어쓰지 않음
+
+    monkeypatch.setenv(consensus.CLUSTER_KEY_ENV, "00" * 16)
+    assert consensus.load_cluster_key() == bytes(16)
+    monkeypatch.setenv(consensus.CLUSTER_KEY_ENV, "00" * 5)
+    with pytest.raises(RuntimeError):
+        consensus.load_cluster_key()
+
+
+def test_nodes_without_key_refuse_to_start(monkeypatch):
+    monkeypatch.delenv(consensus.CLUSTER_KEY_ENV, raising=False)
+    with pytest.raises(RuntimeError):
+        consensus.CosmicConsensusNode(0, peers=[0])
+
+
+def test_engines_sharing_a_key_never_repeat_nonces():
+    key = bytes(32)
+    engines = [consensus.QuantumCipherEngine(key, workers=2) for _ in range(2)]  # 같은 키의 두 노드 (또는 재시작 전후)
+    nonces = [engine.encrypt(b"x")[1] for engine in engines for _ in range(1000)]
+    nonces += [nonce for engine in engines for _, nonce in engine.encrypt_many([b"y"] * 1000)]
+    assert all(len(nonce) == consensus.NONCE_SIZE for nonce in nonces)
+    assert len(set(nonces)) == len(nonces)
+
+
+def test_encrypt_many_keeps_order_across_chunks():
+    engine = consensus.QuantumCipherEngine(bytes(32), workers=4, chunk_size=16)
+    datas = [f"data_{i}" for i in range(100)] + [b"raw"]
+    sealed = engine.encrypt_many(iter(datas))
+    assert len(sealed) == len(datas)
+    assert engine.decrypt_many(sealed) == [d.encode() if isinstance(d, str) else d for d in datas]
+    assert engine.encrypt_many([]) == []
+
+
+def test_secure_store_many_replicates_before_returning(cluster):
+    leader, *followers = cluster
+    items = [(f"EGO_{i}", f"Data_{i}") for i in range(1000)]
+    assert leader.secure_store_many(items) == len(items)
+    ids = [ego_id for ego_id, _ in items]
+    assert leader.load_many(ids) == [data for _, data in items]
+    assert max(leader.match_index.values()) == leader.last_index  # 과반수 영속 후에만 반환
+    for follower in followers:
+        assert _wait_for(lambda: follower.load_many(ids) == [data for _, data in items])
+
+
+def test_secure_store_many_rejects_followers(cluster):
+    with pytest.raises(RuntimeError):
+        cluster[1].secure_store_many([("EGO", "Data")])
+
+
+class _SilentTransport:
+    """팔로워가 응답하지 않는 전송 (커밋되지 않는 제안을 만들기 위함)"""
+    def register(self, node_id, handler):
+        pass
+
+    def send(self, dest, message, callback=None):
+        pass
+
+
+def _lonely_leader(node_id):
+    node = consensus.CosmicConsensusNode(node_id, peers=[node_id, "x", "y"], transport=_SilentTransport(),
+                                         cluster_key=bytes(32))
+    node.become_leader()
+    return node
+
+
+def _append(node, term, prev_index, prev_term, entries, commit=0):
+    sealed = [(idx, entry_term, key) + node.encrypt_ego(data) for idx, entry_term, key, data in entries]
+    return node.handle_message({"type": "append", "term": term, "leader": "L", "prev_index": prev_index,
+                                "prev_term": prev_term, "entries": sealed, "commit": commit})
+
+
+def test_step_down_fails_queued_and_pending_proposals():
+    node = _lonely_leader("stepdown")
+    futures = node.propose_many((f"EGO_{i}", "x") for i in range(2000))
+    resp = _append(node, node.term + 1, 0, 0, [])
+    assert resp["success"] and node.state == "FOLLOWER"
+    for future in futures:
+        with pytest.raises(consensus.NotLeaderError):
+            future.result(timeout=5)
+    with pytest.raises(consensus.NotLeaderError):
+        node.propose("EGO", "x").result(timeout=0)
+    node.close()
+
+
+def test_close_fails_waiting_proposals():
+    node = _lonely_leader("closing")
+    futures = node.propose_many((f"EGO_{i}", "x") for i in range(2000))
+    node.close()
+    for future in futures:
+        with pytest.raises(consensus.NotLeaderError):
+            future.result(timeout=0)
+
+
+def test_conflicting_uncommitted_entries_are_truncated():
+    node = consensus.CosmicConsensusNode("trunc", peers=["trunc"], cluster_key=bytes(32))
+    assert _append(node, 1, 0, 0, [(1, 1, "A", "a1"), (2, 1, "B", "b1"), (3, 1, "C", "c1")], commit=1)["match"] == 3
+    # 새 리더(term 2)는 2번부터 다른 엔트리를 가짐: 2~3번을 잘라내고 덮어씀
+    resp = _append(node, 2, 1, 1, [(2, 2, "B", "b2")], commit=2)
+    assert resp == {"term": 2, "success": True, "match": 2}
+    assert node.last_index == 2
+    assert node.db.execute("SELECT idx, term FROM raft_log ORDER BY idx").fetchall() == [(1, 1), (2, 2)]
+    assert node.load_many(["A", "B", "C"]) == ["a1", "b2", None]
+    # 일관성 검사 실패 시 팔로워가 가진 위치를 알려줌
+    assert _append(node, 2, 5, 2, [(6, 2, "D", "d")]) == {"term": 2, "success": False, "match": 2}
+    node.close()
+
+
+def test_lagging_follower_catches_up_from_the_log():
+    net = InProcessTransport()
+    key = AESGCM.generate_key(bit_length=256)
+    ids = [f"catchup{i}" for i in range(3)]
+    leader, follower = (consensus.CosmicConsensusNode(i, peers=ids, transport=net, cluster_key=key, max_batch=16)
+                        for i in ids[:2])
+    leader.become_leader()
+    items = [(f"EGO_{i}", f"Data_{i}") for i in range(200)]
+    assert leader.secure_store_many(items) == 200  # 늦게 합류할 노드 없이 과반수로 커밋
+    leader._trim_cache(leader.last_index)  # 늦은 팔로워는 메모리 캐시가 아닌 로그 테이블에서 읽어 감
+    late = consensus.CosmicConsensusNode(ids[2], peers=ids, transport=net, cluster_key=key)
+    ids_only = [ego_id for ego_id, _ in items]
+    assert _wait_for(lambda: late.load_many(ids_only) == [data for _, data in items])
+    assert _wait_for(lambda: leader.match_index[ids[2]] == leader.last_index)
+    net.close()
+    for node in (leader, follower, late):
+        node.close()
+
+
+def test_leader_survives_peer_disconnect_and_resyncs_it():
+    net = LoopbackTCPTransport(max_backoff=0.1)
+    key = AESGCM.generate_key(bit_length=256)
+    ids = [f"tcp{i}" for i in range(3)]
+    nodes = [consensus.CosmicConsensusNode(i, peers=ids, transport=net, cluster_key=key) for i in ids]
+    leader, _, peer = nodes
+    leader.become_leader()
+    assert leader.secure_store_many([("EGO_0", "before")]) == 1
+
+    server = net.servers[2]
+    server.shutdown(socket.SHUT_RDWR)  # 팔로워 하나가 내려감
+    server.close()
+    net.links[peer.node_id].sock.shutdown(socket.SHUT_RDWR)
+    items = [(f"EGO_{i}", f"Data_{i}") for i in range(1, 300)]
+    assert leader.secure_store_many(items) == len(items)  # 남은 과반수로 계속 커밋
+    assert all(thread.is_alive() for thread in leader.threads)
+    assert _wait_for(lambda: leader.inflight[peer.node_id] == 0)  # 실패한 요청이 슬롯을 잡고 있지 않음
+
+    revived = socket.create_server(net.addresses[peer.node_id])  # 같은 주소로 복귀
+    threading.Thread(target=net._accept_worker, args=(revived, peer.handle_message), daemon=True).start()
+    ids_only = [ego_id for ego_id, _ in items]
+    assert _wait_for(lambda: peer.load_many(ids_only) == [data for _, data in items])
+    assert _wait_for(lambda: leader.match_index[peer.node_id] == leader.last_index)
+    revived.close()
+    net.close()
+    for node in nodes:
+        node.close()
@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import divine_transport
+from divine_transport import LoopbackTCPTransport
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_frames_carry_typed_structures():
+    net = LoopbackTCPTransport()
+    net.register("echo", lambda message: message)
+    message = {"entries": [(1, 2, "EGO", b"\x00\xff", b"nonce")], "commit": 3, "ok": True}
+    replies = []
+    net.send("echo", message, replies.append)
+    assert _wait_for(lambda: replies)
+    assert replies == [message] and type(replies[0]["entries"][0]) is tuple
+    net.close()
+
+
+def test_frames_reject_arbitrary_objects():
+    with pytest.raises(ValueError):
+        divine_transport._frame({"when": object()})
+    a, b = socket.socketpair()
+    a.sendall(divine_transport._FRAME.pack(2) + b"Z\x00")
+    with pytest.raises(ConnectionError):
+        divine_transport._recv_frame(b)
+    a.close()
+    b.close()
+
+
+def test_disconnect_fails_pending_callbacks_and_reconnects():
+    release = threading.Event()
+    net = LoopbackTCPTransport()
+    net.register("slow", lambda message: release.wait(5) and message)
+    replies = []
+    for i in range(3):
+        net.send("slow", i, replies.append)
+    net.links["slow"].sock.shutdown(socket.SHUT_RDWR)  # 응답 전에 연결이 끊김
+    assert _wait_for(lambda: len(replies) == 3)
+    assert replies == [None, None, None]
+    release.set()
+    net.send("slow", "again", replies.append)  # 다음 전송은 새 연결로
+    assert _wait_for(lambda: len(replies) == 4)
+    assert replies[-1] == "again"
+    net.close()
+
+
+def test_unreachable_peer_fails_callbacks_with_backoff():
+    net = LoopbackTCPTransport(max_backoff=0.2)
+    net.register("down", lambda message: message)
+    net.servers[0].shutdown(socket.SHUT_RDWR)
+    net.servers[0].close()
+    replies = []
+    for _ in range(5):
+        net.send("down", "x", replies.append)  # 전송 스레드는 예외 없이 계속 진행
+    assert replies == [None] * 5
+    first_delay = net.retry["down"][1]
+    time.sleep(first_delay + 0.01)
+    net.send("down", "x", replies.append)
+    assert net.retry["down"][1] == min(0.2, first_delay * 2)
+    net.close()
+    net.send("down", "x", replies.append)
+    assert replies[-1] is None
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from expiry_index import CosmicExpiryIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pop_expired_returns_only_keys_past_their_deadline():
+    index = CosmicExpiryIndex(ttl=10)
+    index.touch("old", now=0)
+    index.touch("new", now=5)
+    assert index.pop_expired(now=12) == ["old"]
+    assert len(index) == 1
+    assert index.next_deadline() == 15
+    assert index.pop_expired(now=15) == ["new"]
+    assert index.next_deadline() is None
+
+
+def test_rewrite_and_discard_invalidate_older_entries():
+    index = CosmicExpiryIndex(ttl=10)
+    index.touch("rewritten", now=0)
+    index.touch("rewritten", now=8)  # 옛 항목(만료 10)은 꺼낼 때 버려짐
+    index.touch("gone", now=0)
+    index.discard("gone")
+    assert index.pop_expired(now=12) == []
+    assert index.pop_expired(now=18) == ["rewritten"]
+
+
+def test_limit_and_compaction_keep_remaining_keys():
+    index = CosmicExpiryIndex(ttl=1)
+    for i in range(3000):
+        index.touch("EGO", now=i)  # 같은 키를 거듭 써서 압축 유도
+    assert len(index.heap) <= 2 * len(index) + 1024
+    for i in range(5):
+        index.touch(f"K{i}", now=0)
+    assert len(index.pop_expired(now=10, limit=3)) == 3
+    assert sorted(index.pop_expired(now=10)) == ["K3", "K4"]
+
+
+def test_kernel_overlords_import_as_package():
+    code = ("import kernel.absolute_overlord_v5_5, kernel.cosmic_singularity_v6, "
+            "guard.eternal_universal_guardian, guard.cosmic_immortality_v7")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize("script", ["guard/eternal_universal_guardian.py", "guard/cosmic_overlord_v6.5.py"])
+def test_index_users_run_as_scripts(script, tmp_path):
+    result = subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=tmp_path,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
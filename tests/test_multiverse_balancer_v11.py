@@ -0,0 +1,292 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from multiverse_balancer_v11 import CosmicMultiverseBalancer
+from multiverse_rebalancer import CosmicOnlineRebalancer
+
+
+OVERRIDES = "cosmic_overrides.db"
+
+
+def _key_on(balancer, shard, start=0):
+    return next(f"EGO_{i}" for i in range(start, 100000) if balancer.get_shard(f"EGO_{i}") == shard)
+
+
+def test_acquire_after_rebalance_routes_to_added_shard():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"], load_epsilon=0.25)
+    CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None).run()
+    key = _key_on(balancer, "Sombrero")
+    with balancer.routed(key) as shard:
+        assert shard == "Sombrero"
+        assert balancer.loads["Sombrero"] == 1
+    assert balancer.loads == {"Solar": 0, "Sombrero": 0, "Virgo": 0}
+
+
+def test_rebalance_drops_overrides_of_moved_rows():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    grown = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"])
+    # 주 샤드는 Virgo지만 Solar로 넘겨진 키가 샤드 추가 후 Sombrero를 새 주인으로 가짐
+    key = next(f"EGO_{i}" for i in range(100000)
+               if balancer.get_shard(f"EGO_{i}") == "Virgo" and grown.get_shard(f"EGO_{i}") == "Sombrero")
+    assert _overflow(balancer, key) == ("Virgo", "Solar")
+    balancer.release(key, "Solar")
+    _seed("Solar", [(key, b"moved", 0.0)])
+    _seed("Virgo", [])
+
+    CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None).run()
+    assert _rows("Sombrero") == {key: b"moved"} and _rows("Solar") == {}
+    assert balancer.overrides == {}
+    assert balancer.route(key, write=False) == "Sombrero"
+    restarted = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    assert restarted.overrides == {}
+
+
+def test_overrides_stay_in_memory_by_default():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25)
+    key = _key_on(balancer, "Solar")
+    _, shard = _overflow(balancer, key)
+    balancer.release(key, shard)
+    assert balancer.overrides == {key: shard} and balancer._overrides_db is None
+    assert not os.path.exists(OVERRIDES)
+
+
+def test_ring_change_keeps_live_counts_until_removed_shard_drains():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25)
+    solar, sombrero = _key_on(balancer, "Solar"), _key_on(balancer, "Sombrero")
+    assert balancer.acquire(solar) == "Solar"
+    assert balancer.acquire(sombrero) == "Sombrero"
+
+    balancer._build_hash_ring(["Solar", "Virgo"])
+    assert balancer.loads == {"Solar": 1, "Virgo": 0, "Sombrero": 1}  # 처리 중인 요청은 이어받음
+    assert balancer.acquire(sombrero) == "Sombrero"  # 처리 중인 키는 끝날 때까지 같은 샤드
+    balancer.release(sombrero, "Sombrero")
+    balancer.release(sombrero, "Sombrero")
+    assert "Sombrero" not in balancer.loads
+    assert balancer.acquire(sombrero) in ("Solar", "Virgo")
+    balancer.release(solar, "Solar")
+
+
+def test_ring_change_drops_overrides_to_removed_or_home_shards():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25)
+    survivor = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    kept = _key_on(balancer, "Virgo")
+    gone = _key_on(balancer, "Solar")
+    homed = next(f"EGO_{i}" for i in range(100000)
+                 if balancer.get_shard(f"EGO_{i}") == "Sombrero" and survivor.get_shard(f"EGO_{i}") == "Solar")
+    balancer.overrides = {kept: "Solar", gone: "Sombrero", homed: "Solar"}
+    balancer._build_hash_ring(["Solar", "Virgo"])
+    assert balancer.overrides == {kept: "Solar"}
+
+
+def test_settle_moves_rows_outside_the_routing_lock():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25)
+    settling, other = _key_on(balancer, "Solar"), _key_on(balancer, "Virgo")
+    balancer.overrides = {settling: "Virgo"}
+    copying, finish = threading.Event(), threading.Event()
+
+    def slow_migrate(src, dst, keys, replace, keep_source=False):
+        assert (src, dst, keys) == ("Virgo", "Solar", [settling])
+        if keep_source:  # 복사 단계에서 멈춤
+            copying.set()
+            assert finish.wait(5)
+        return len(keys)
+
+    balancer.migrate_egos = slow_migrate
+    worker = threading.Thread(target=balancer.settle_overrides)
+    worker.start()
+    assert copying.wait(5)
+
+    with balancer.routed(other) as shard:  # 다른 키의 라우팅은 이동에 막히지 않음
+        assert shard == "Virgo"
+    routed = []
+    waiter = threading.Thread(target=lambda: routed.append(balancer.route(settling)))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive() and not routed  # 옮기는 키는 이동이 끝날 때까지 대기
+
+    finish.set()
+    worker.join(5)
+    waiter.join(5)
+    assert routed == ["Solar"]
+    assert balancer.overrides == {}
+
+
+def _overflow(balancer, key):
+    """주 샤드를 상한 위로 채운 뒤 key를 쓰기로 acquire (넘김 발생)"""
+    home = balancer.get_shard(key)
+    balancer.loads[home] += 100
+    shard = balancer.acquire(key)
+    balancer.loads[home] -= 100
+    assert shard != home
+    return home, shard
+
+
+def _rows(shard):
+    with sqlite3.connect(f"cosmic_{shard}.db") as conn:
+        return dict(conn.execute("SELECT key, payload FROM storage"))
+
+
+def test_overrides_survive_restart():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    key = _key_on(balancer, "Solar")
+    _, shard = _overflow(balancer, key)
+    balancer.release(key, shard)
+
+    restarted = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    assert restarted.overrides == {key: shard}
+    assert restarted.route(key, write=False) == shard
+
+
+def test_settle_moves_latest_value_home_and_forgets_override():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    key = _key_on(balancer, "Solar")
+    home, shard = _overflow(balancer, key)
+    balancer.release(key, shard)
+    for target, payload in ((home, b"old"), (shard, b"new")):
+        with sqlite3.connect(f"cosmic_{target}.db") as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)")
+            conn.execute("INSERT INTO storage VALUES (?, ?, 0)", (key, payload))
+
+    assert balancer.settle_overrides() == 1
+    assert _rows(home) == {key: b"new"} and _rows(shard) == {}
+    assert balancer.overrides == {}
+    restarted = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    assert restarted.overrides == {}
+
+
+def test_failed_override_write_cancels_the_overflow():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Sombrero"], load_epsilon=0.25, overrides_path=OVERRIDES)
+    key = _key_on(balancer, "Solar")
+    balancer._overrides_db.close()  # 기록 실패 유도
+    balancer.loads["Solar"] += 100
+    with pytest.raises(sqlite3.ProgrammingError):
+        balancer.acquire(key)
+    balancer.loads["Solar"] -= 100
+    assert balancer.overrides == {} and balancer._active == {} and not balancer._unsaved
+    assert sum(balancer.loads.values()) == 0
+
+
+def _seed(shard, rows):
+    with sqlite3.connect(f"cosmic_{shard}.db") as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)")
+        conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, ?)", rows)
+
+
+def test_scan_merges_shards_in_timestamp_order_with_pushed_down_filters():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    _seed("Solar", [("EGO_a", b"1", 1.0), ("EGO_c", b"3", 3.0), ("OTHER", b"x", 2.5)])
+    _seed("Virgo", [("EGO_b", b"2", 2.0), ("EGO_d", b"4", 4.0)])
+
+    rows = list(balancer.scan(prefix="EGO_", batch_size=1, queue_depth=1))
+    assert [(shard, key) for shard, key, _, _ in rows] == \
+           [("Solar", "EGO_a"), ("Virgo", "EGO_b"), ("Solar", "EGO_c"), ("Virgo", "EGO_d")]
+    assert [key for _, key, _, _ in balancer.scan(since=2.0, until=4.0)] == ["EGO_b", "OTHER", "EGO_c"]
+    assert [key for _, key, _, _ in balancer.scan(order_by="key", limit=3)] == ["EGO_a", "EGO_b", "EGO_c"]
+    with pytest.raises(ValueError):
+        next(balancer.scan(order_by="payload"))
+
+
+def test_scan_skips_missing_shards_and_stops_early():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    _seed("Solar", [(f"EGO_{i:04d}", b"p", float(i)) for i in range(2000)])
+    stream = balancer.scan(batch_size=10, queue_depth=2)
+    assert [key for _, key, _, _ in (next(stream) for _ in range(3))] == ["EGO_0000", "EGO_0001", "EGO_0002"]
+    stream.close()
+
+
+def test_batch_routing_matches_single_key_lookup():
+    keys = [f"EGO_{i}" for i in range(2000)]
+    for algo, vnodes in (("blake2b", 160), ("md5", 3)):
+        balancer = CosmicMultiverseBalancer(["Solar", "Andromeda", "Virgo"], hash_algo=algo, vnodes=vnodes)
+        assert balancer.get_shards(keys) == [balancer.get_shard(k) for k in keys]
+    with pytest.raises(ValueError):
+        CosmicMultiverseBalancer(hash_algo="sha1")
+
+
+
+def test_default_ring_keeps_the_original_md5_placement():
+    shards = ["Solar", "Andromeda", "Virgo"]
+    ring = sorted((int(hashlib.md5(f"{shard}:{i}".encode()).hexdigest(), 16), shard)
+                  for shard in shards for i in range(3))
+
+    def legacy_shard(key):  # v11.0 순회 방식 그대로
+        h = int(hashlib.md5(key.encode()).hexdigest(), 16)
+        return next((shard for point, shard in ring if h <= point), ring[0][1])
+
+    keys = [f"EGO_{i}" for i in range(2000)]
+    assert CosmicMultiverseBalancer(shards).get_shards(keys) == [legacy_shard(k) for k in keys]
+
+
+def test_numpy_batch_routing_matches_bisect():
+    pytest.importorskip("numpy")
+    balancer = CosmicMultiverseBalancer(["Solar", "Andromeda", "Virgo"], vnodes=160, hash_algo="blake2b")
+    assert balancer._np_hashes is not None
+    keys = [f"EGO_{i}" for i in range(5000)]
+    assert balancer.get_shards(keys) == [balancer.get_shard(k) for k in keys]
+
+def test_adding_a_shard_moves_only_its_share_of_keys():
+    keys = [f"EGO_{i}" for i in range(20000)]
+    ring = dict(vnodes=160, hash_algo="blake2b")
+    before = CosmicMultiverseBalancer(["Solar", "Andromeda", "Virgo"], **ring).get_shards(keys)
+    after = CosmicMultiverseBalancer(["Solar", "Andromeda", "Virgo", "Sombrero"], **ring).get_shards(keys)
+    moved = [(old, new) for old, new in zip(before, after) if old != new]
+    assert all(new == "Sombrero" for _, new in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35  # 이상적으로는 1/4
+
+
+def test_migrate_egos_moves_key_batches_and_ranges():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    _seed("Solar", [(f"EGO_{i}", f"v{i}".encode(), 0.0) for i in range(10)])
+    assert balancer.migrate_egos("Solar", "Virgo", keys=["EGO_1", "EGO_2", "MISSING"]) == 2
+    assert balancer.migrate_egos("Solar", "Virgo", key_range=("EGO_5", "EGO_8")) == 3
+    assert sorted(_rows("Virgo")) == ["EGO_1", "EGO_2", "EGO_5", "EGO_6", "EGO_7"]
+    assert len(_rows("Solar")) == 5
+    with pytest.raises(ValueError):
+        balancer.migrate_egos("Solar", "Virgo")
+
+
+def test_migrate_egos_keep_source_and_no_replace():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    _seed("Solar", [("A", b"old", 0.0), ("B", b"b", 0.0)])
+    _seed("Virgo", [("A", b"newer", 1.0)])
+    assert balancer.migrate_egos("Solar", "Virgo", keys=["A", "B"], replace=False, keep_source=True) == 1
+    assert _rows("Solar") == {"A": b"old", "B": b"b"}
+    assert balancer.migrate_egos("Solar", "Virgo", keys=["A", "B"], replace=False) == 2
+    assert _rows("Solar") == {} and _rows("Virgo") == {"A": b"newer", "B": b"b"}
+    assert balancer.migrate_ego_2pc("A", "Solar", "Virgo") == "❌ FAIL: Ego Not Found"
+
+
+def test_global_count_follows_inserts_replaces_and_deletes():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo", "Andromeda"], count_ttl=60)
+    _seed("Solar", [("A", b"1", 0.0), ("B", b"2", 0.0)])
+    _seed("Virgo", [("C", b"3", 0.0)])
+    assert balancer.global_count() == 3  # Andromeda는 아직 없는 샤드
+    _seed("Solar", [("A", b"again", 1.0), ("D", b"4", 1.0)])  # 덮어쓰기는 행 수를 늘리지 않음
+    assert balancer.global_count() == 3  # TTL 이내에는 캐시된 집계
+    assert balancer.global_count(max_staleness=0) == 4
+    with sqlite3.connect("cosmic_Virgo.db") as conn:
+        conn.execute("DELETE FROM storage WHERE key = 'C'")
+    assert balancer.global_count(max_staleness=0) == 3
+    balancer.migrate_egos("Solar", "Virgo", keys=["A", "B"])
+    assert balancer.global_count(max_staleness=0) == 3
+    with sqlite3.connect("cosmic_Virgo.db") as conn:
+        assert conn.execute("SELECT row_count FROM shard_stats").fetchone()[0] == 2
+
+
+def test_replicas_start_at_primary_and_spread_across_zones():
+    shards = ["Solar", "Andromeda", "Virgo", "Sombrero"]
+    zones = {"Solar": "rack-1", "Andromeda": "rack-1", "Virgo": "rack-2", "Sombrero": "rack-2"}
+    plain = CosmicMultiverseBalancer(shards)
+    zoned = CosmicMultiverseBalancer(shards, shard_zones=zones)
+    for i in range(200):
+        key = f"EGO_{i}"
+        replicas = plain.get_replicas(key, n=3)
+        assert replicas[0] == plain.get_shard(key) and len(set(replicas)) == 3
+        pair = zoned.get_replicas(key, n=2)
+        assert pair[0] == zoned.get_shard(key) and {zones[s] for s in pair} == {"rack-1", "rack-2"}
+        assert len(set(zoned.get_replicas(key, n=3))) == 3  # 존이 모자라면 링 순서로 채움
+    assert sorted(plain.get_replicas("EGO_0", n=10)) == sorted(shards)
@@ -0,0 +1,93 @@
+import sqlite3
+
+from multiverse_balancer_v11 import CosmicMultiverseBalancer
+from multiverse_rebalancer import CosmicOnlineRebalancer
+
+
+def _seed(shard, rows):
+    with sqlite3.connect(f"cosmic_{shard}.db") as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS storage (key TEXT PRIMARY KEY, payload BLOB, timestamp REAL)")
+        conn.executemany("INSERT OR REPLACE INTO storage VALUES (?, ?, 0)", rows)
+
+
+def _moving_key(rebalancer):
+    for i in range(10000):
+        key = f"EGO_{i}"
+        if rebalancer.old_ring.get_shard(key) != rebalancer.new_ring.get_shard(key):
+            return key
+    raise AssertionError("no key changes owner")
+
+
+def test_dual_read_finds_key_moved_between_reads():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    rebalancer = CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None)
+    rebalancer._prepare_shards()
+    key = _moving_key(rebalancer)
+    old, new = rebalancer.old_ring.get_shard(key), rebalancer.new_ring.get_shard(key)
+    _seed(old, [(key, b"payload")])
+    rebalancer.migrating = True
+
+    reads = []
+    plain_read = rebalancer._read
+
+    def racing_read(shard, memory_key):
+        reads.append(shard)
+        stored = plain_read(shard, memory_key)
+        if len(reads) == 1:
+            balancer.migrate_egos(old, new, keys=[memory_key])  # 새 주인을 읽은 직후 이주 완료
+        return stored
+
+    rebalancer._read = racing_read
+    assert rebalancer.get_state(key) == b"payload"
+    assert reads == [new, old, new]
+
+
+def test_missing_key_reads_each_owner_without_error():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    rebalancer = CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None)
+    rebalancer.migrating = True
+    assert rebalancer.get_state(_moving_key(rebalancer)) is None
+
+
+def test_run_moves_only_keys_whose_owner_changes():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    keys = [f"EGO_{i}" for i in range(500)]
+    for shard in balancer.shards:
+        _seed(shard, [(k, k.encode()) for k, s in zip(keys, balancer.get_shards(keys)) if s == shard])
+    rebalancer = CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None)
+    expected = sum(rebalancer.old_ring.get_shard(k) != rebalancer.new_ring.get_shard(k) for k in keys)
+
+    assert rebalancer.run() == expected
+    assert rebalancer.progress()["scanned"] == len(keys)
+    assert all(rebalancer.get_state(k) == k.encode() for k in keys)
+    assert balancer.shards == ["Solar", "Sombrero", "Virgo"]
+
+
+def test_ring_scheme_change_goes_through_the_rebalancer():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    keys = [f"EGO_{i}" for i in range(300)]
+    for shard in balancer.shards:
+        _seed(shard, [(k, k.encode()) for k, s in zip(keys, balancer.get_shards(keys)) if s == shard])
+    rebalancer = CosmicOnlineRebalancer(balancer, ["Solar", "Virgo"], rows_per_second=None,
+                                        vnodes=160, hash_algo="blake2b")
+    assert rebalancer.rehash and rebalancer.sources == ["Solar", "Virgo"] and rebalancer.moving_fraction() is None
+    rebalancer.migrating = True
+    assert all(rebalancer.get_state(k) == k.encode() for k in keys)  # 이주 중에도 옛 배치에서 읽힘
+
+    rebalancer.run()
+    assert (balancer.vnodes, balancer.hash_algo) == (160, "blake2b")
+    for shard, key in zip(balancer.get_shards(keys), keys):
+        with sqlite3.connect(f"cosmic_{shard}.db") as conn:
+            assert conn.execute("SELECT payload FROM storage WHERE key = ?", (key,)).fetchone() == (key.encode(),)
+
+
+def test_reads_reuse_one_connection_per_shard_and_thread():
+    balancer = CosmicMultiverseBalancer(["Solar", "Virgo"])
+    rebalancer = CosmicOnlineRebalancer(balancer, ["Solar", "Virgo", "Sombrero"], rows_per_second=None)
+    key = _moving_key(rebalancer)
+    old = rebalancer.old_ring.get_shard(key)
+    assert rebalancer.get_state(key) is None  # 샤드 파일이 없어도 오류 없이 None
+    _seed(old, [(key, b"payload")])
+    assert rebalancer.get_state(key) == b"payload"
+    conn = rebalancer._local.conns[old]
+    assert rebalancer.get_state(key) == b"payload" and rebalancer._local.conns[old] is conn
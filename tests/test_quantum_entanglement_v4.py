@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import quantum_entanglement_v4
+from quantum_entanglement_v4 import _READ_AT, _WRITE_AT, NonLocalCausalityLink, SharedMemoryRing, _run_ring
+
+
+@pytest.fixture
+def ring():
+    ring = SharedMemoryRing(capacity=256)
+    yield ring
+    ring.close()
+
+
+def _recv_bytes(ring):
+    view = ring.recv()
+    data = bytes(view)
+    view.release()
+    ring.release()
+    return data
+
+
+def test_records_wrap_around_the_ring_in_order(ring):
+    for i in range(20):  # 100바이트 레코드가 256바이트 링을 여러 번 감음
+        ring.send(bytes([i]) * 100)
+        assert _recv_bytes(ring) == bytes([i]) * 100
+
+
+def test_attached_ring_sees_committed_records_only(ring):
+    peer = SharedMemoryRing(capacity=ring.capacity, name=ring.name)
+    view = ring.reserve(5)
+    view[:] = b"ready"
+    view.release()
+    assert not peer.owner and peer._load(_WRITE_AT) == peer._load(_READ_AT)  # commit 전에는 보이지 않음
+    ring.commit()
+    ring.send(b"next")
+    assert _recv_bytes(peer) == b"ready" and _recv_bytes(peer) == b"next"
+    peer.close()
+
+
+def test_oversized_payload_is_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.send(bytes(ring.capacity))
+
+
+def test_link_publishes_payload_to_attached_ring(ring):
+    link = NonLocalCausalityLink("Earth", "Andromeda", ring=ring)
+    assert link.teleport_quantum_state("EGO")["status"] == "SYNCHRONIZED"
+    assert _recv_bytes(ring) == b"EGO"
+
+
+def test_payloads_cross_to_a_consumer_process():
+    latencies, elapsed = _run_ring(4096, 50, paced=False)
+    assert len(latencies) == 50 and elapsed >= 0
+
+
+def test_attaching_from_an_unrelated_process_does_not_unlink(ring):
+    # 별도 인터프리터는 자기 자원 추적기를 가지므로, 종료 시 붙었던 세그먼트를 지우면 안 됨
+    script = ("import sys; sys.path.insert(0, sys.argv[1]); from quantum_entanglement_v4 import SharedMemoryRing; "
+              "SharedMemoryRing(int(sys.argv[3]), name=sys.argv[2]).close()")
+    network_dir = os.path.dirname(quantum_entanglement_v4.__file__)
+    subprocess.run([sys.executable, "-c", script, network_dir, ring.name, str(ring.capacity)], check=True, timeout=30)
+    time.sleep(0.5)  # 추적기 프로세스는 자식 종료 뒤 비동기로 정리함
+    peer = SharedMemoryRing(capacity=ring.capacity, name=ring.name)
+    ring.send(b"alive")
+    assert _recv_bytes(peer) == b"alive"
+    peer.close()
+
+
+def test_full_ring_times_out_instead_of_blocking(ring):
+    ring.send(bytes(200))
+    with pytest.raises(TimeoutError):
+        ring.send(bytes(200), timeout=0.05)
+    link = NonLocalCausalityLink("Earth", "Andromeda", ring=ring, send_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        link.teleport_quantum_state("X" * 200)
+    assert _recv_bytes(ring) == bytes(200)
+    with pytest.raises(TimeoutError):
+        ring.recv(timeout=0.05)
+    ring.send(b"after", timeout=0.05)  # 시간 초과 뒤에도 링 상태는 그대로
+    assert _recv_bytes(ring) == b"after"
+
+
+def test_rings_larger_than_free_shm_are_refused(monkeypatch):
+    monkeypatch.setattr(quantum_entanglement_v4, "_shm_free_bytes", lambda: 8 * 1024 * 1024)
+    with pytest.raises(OSError):
+        SharedMemoryRing(capacity=16 * 1024 * 1024)
+    [report] = quantum_entanglement_v4.benchmark_shared_memory(sizes=(64 * 1024 * 1024,))
+    assert report["size"] == 64 * 1024 * 1024 and "skipped" in report
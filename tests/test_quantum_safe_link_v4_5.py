@@ -0,0 +1,54 @@
+import asyncio
+
+from quantum_safe_link_v4_5 import NonLocalCausalityLink
+
+
+def _link(window, fail=(), slow=()):
+    link = NonLocalCausalityLink("Earth", "Andromeda", window=window, rtt=0.01)
+    peak = [0]
+
+    async def stable():
+        return True
+
+    async def transmit(seq, payload):
+        peak[0] = max(peak[0], len(link.in_flight))
+        await asyncio.sleep(link.rtt * (5 if payload in slow else 1))
+        if payload in fail:
+            raise ConnectionError(f"Quantum Tunnel Collapsed! (seq {seq})")
+
+    link.stabilizer.stabilize_link_async = stable
+    link._transmit = transmit
+    return link, peak
+
+
+def test_pipeline_keeps_window_full_and_results_in_order():
+    link, peak = _link(window=8, fail={"Data_3"})
+    results = asyncio.run(link.teleport_many_async([(f"EGO_{i}", f"Data_{i}") for i in range(40)]))
+    assert peak[0] == 8
+    assert results[3].startswith("RECOVERED")
+    assert all(r.startswith("SUCCESS") for i, r in enumerate(results) if i != 3)
+    assert link.backup_buffer == {} and link.in_flight == {}
+
+
+def test_rollback_of_older_send_keeps_newer_backup_for_same_key():
+    link, _ = _link(window=4, fail={"old"}, slow={"new"})
+
+    async def main():
+        old, new = link.submit("EGO", "old"), link.submit("EGO", "new")
+        assert (await old).startswith("RECOVERED")
+        assert link.backup_buffer == {"EGO": "new"}  # 늦게 보낸 전송의 보험은 그대로
+        assert (await new).startswith("SUCCESS")
+        assert link.backup_buffer == {}
+
+    asyncio.run(main())
+
+
+def test_storm_aborts_and_clears_backup():
+    link = NonLocalCausalityLink("Earth", "Andromeda", window=2, rtt=0)
+
+    async def unstable():
+        return False
+
+    link.stabilizer.stabilize_link_async = unstable
+    assert asyncio.run(link.teleport_state_async("EGO", "Data")) == "FAIL: ENVIRONMENT_STORM"
+    assert link.backup_buffer == {} and link.in_flight == {}
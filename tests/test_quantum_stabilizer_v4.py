@@ -0,0 +1,50 @@
+import threading
+
+from quantum_stabilizer_v4 import NonLocalCausalityLink
+
+
+def _keys_on_distinct_stripes(link):
+    first = "EGO_0"
+    other = next(f"EGO_{i}" for i in range(1, 1000) if link._stripe(f"EGO_{i}") != link._stripe(first))
+    return first, other
+
+
+def _run(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    thread.join(timeout=2)
+    return not thread.is_alive()
+
+
+def test_held_stripe_blocks_only_keys_on_that_stripe():
+    link = NonLocalCausalityLink("Earth", "Andromeda", stripes=8)
+    busy, free = _keys_on_distinct_stripes(link)
+    lock = link.causality_locks[link._stripe(busy)]
+    with lock:
+        assert _run(link.teleport_state, free, "Data")
+        blocked = threading.Thread(target=link.teleport_state, args=(busy, "Data"), daemon=True)
+        blocked.start()
+        blocked.join(timeout=0.2)
+        assert blocked.is_alive()
+    blocked.join(timeout=2)
+    assert not blocked.is_alive()
+
+
+def test_teleport_many_returns_payloads_in_order_and_clears_source():
+    link = NonLocalCausalityLink("Earth", "Andromeda", stripes=4)
+    items = [(f"EGO_{i}", f"Data_{i}") for i in range(50)]
+    assert link.teleport_many(iter(items)) == [payload for _, payload in items]
+    assert link.source_memory == {}
+    assert all(not lock.locked() for lock in link.causality_locks)
+
+
+def test_concurrent_batches_on_overlapping_stripes_do_not_deadlock():
+    link = NonLocalCausalityLink("Earth", "Andromeda", stripes=4)
+    forward = [(f"EGO_{i}", i) for i in range(20)]
+    threads = [threading.Thread(target=link.teleport_many, args=(batch,), daemon=True)
+               for batch in (forward, forward[::-1]) * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads)
@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from retry_scheduler import CosmicRetryScheduler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_fast_retry_is_not_blocked_behind_a_slow_one():
+    release_slow = threading.Event()
+    calls = []
+
+    def handler(node, key, data):
+        calls.append(key)
+        if key == "slow":
+            return release_slow.wait(5)
+        return calls.count("fast") >= 2  # 첫 시도는 실패, 재시도에서 성공
+
+    scheduler = CosmicRetryScheduler(handler, base_delay=0.001, max_delay=0.001, workers=2)
+    try:
+        scheduler.submit("Sector_7", "slow", "data")
+        assert _wait_for(lambda: "slow" in calls)
+        scheduler.submit("Sector_7", "fast", "data")
+        # slow가 워커 하나를 붙잡고 있는 동안 fast는 실패 -> 재예약 -> 성공까지 마침
+        assert _wait_for(lambda: scheduler.stats["succeeded"] == 1, timeout=2)
+        assert not release_slow.is_set() and calls.count("fast") == 2
+    finally:
+        release_slow.set()
+    assert _wait_for(lambda: not len(scheduler))
+    assert scheduler.stats["succeeded"] == 2
+    scheduler.close()
+
+
+def test_in_flight_retries_are_bounded_by_workers():
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def handler(node, key, data):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return True
+
+    scheduler = CosmicRetryScheduler(handler, base_delay=0.001, workers=3)
+    for i in range(30):
+        scheduler.submit("Sector_7", f"EGO_{i}", i)
+    assert _wait_for(lambda: not len(scheduler))
+    assert scheduler.stats["succeeded"] == 30
+    assert peak[0] <= 3
+    scheduler.close()
+
+
+def test_newer_payload_replaces_running_one():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def handler(node, key, data):
+        seen.append(data)
+        if data == "v1":
+            started.set()
+            release.wait(5)
+            return False
+        return True
+
+    scheduler = CosmicRetryScheduler(handler, base_delay=0.001, max_delay=0.001)
+    scheduler.submit("Sector_7", "EGO", "v1")
+    assert started.wait(5)
+    scheduler.submit("Sector_7", "EGO", "v2")  # 실행 중인 키: 끝나면 최신 페이로드로 다시 예약
+    release.set()
+    assert _wait_for(lambda: not len(scheduler))
+    assert seen == ["v1", "v2"]
+    assert scheduler.stats["dropped"] == 1 and scheduler.stats["succeeded"] == 1
+    scheduler.close()
+
+
+def test_closed_external_pool_returns_tasks_to_the_queue():
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    pool.shutdown()
+    scheduler = CosmicRetryScheduler(lambda *args: True, base_delay=0.001, executor=pool)
+    scheduler.submit("Sector_7", "EGO", "data")
+    assert _wait_for(lambda: scheduler._closed)
+    assert scheduler.snapshot() == [{"node": "Sector_7", "key": "EGO", "data": "data", "attempt": 0}]
+
+
+@pytest.mark.parametrize("script", ["kernel/absolute_overlord_v5_5.py", "kernel/cosmic_singularity_v6.py",
+                                    "guard/cosmic_overlord_v6.5.py", "guard/cosmic_immortality_v7.py"])
+def test_scheduler_users_run_as_scripts(script, tmp_path):
+    # 다른 작업 디렉터리에서 파일 경로로 직접 실행해도 스케줄러를 찾아야 함
+    result = subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=tmp_path,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,87 @@
+import pytest
+
+from singularity_shard_v4 import CosmicBlackHoleSharder
+
+
+def test_records_keep_the_legacy_shape():
+    sharder = CosmicBlackHoleSharder("Virgo")
+    shard_id = sharder.spacetime_sharding("GALACTIC_CHRONICLE")
+    record = sharder.sharded_storage[shard_id]
+    assert record["payload"] == "GALACTIC_CHRONICLE" and record["state"] == "ENTANGLED"
+    assert len(record["integrity_hash"]) == 64
+    assert list(sharder.sharded_storage) == [shard_id]
+    assert sharder.extract_from_singularity(shard_id)["data"] == "GALACTIC_CHRONICLE"
+    assert sharder.extract_from_singularity("QS-Virgo-zz").startswith("❌")
+
+
+def test_cold_payloads_spill_to_disk_and_read_back():
+    sharder = CosmicBlackHoleSharder("Virgo", memory_limit=10_000)
+    ids = [sharder.spacetime_sharding(f"{i:04d}" * 250) for i in range(20)]
+    report = sharder.memory_report()
+    assert report["spilled_shards"] > 0 and report["resident_payload_bytes"] <= 10_000
+    assert [sharder.extract_from_singularity(s)["data"] for s in ids] == [f"{i:04d}" * 250 for i in range(20)]
+
+    assert sharder.evaporate_shard(ids[0]).startswith("💨")
+    assert sharder.memory_report()["spilled_shards"] == report["spilled_shards"] - 1
+    assert ids[0] not in sharder.sharded_storage and len(sharder) == 19
+
+
+def test_segment_log_restores_shards_after_restart(tmp_path):
+    segments = str(tmp_path / "segments")  # 압축 스레드가 테스트 뒤에도 같은 폴더를 보도록 절대 경로
+    sharder = CosmicBlackHoleSharder("Virgo", segment_dir=segments, segment_size=4096, compact_interval=3600)
+    ids = [sharder.spacetime_sharding(b"x" * 1000 + bytes([i])) for i in range(10)]
+    sharder.evaporate_shard(ids[3])
+    sharder.close()
+
+    restored = CosmicBlackHoleSharder("Virgo", segment_dir=segments, segment_size=4096, compact_interval=3600)
+    assert len(restored) == 9 and ids[3] not in restored.sharded_storage
+    assert restored.extract_from_singularity(ids[9])["data"] == b"x" * 1000 + bytes([9])
+    assert restored.memory_report()["segments"] > 1
+    restored.close()
+
+
+def test_compaction_moves_live_records_and_drops_the_segment(tmp_path):
+    segments = str(tmp_path / "segments")
+    sharder = CosmicBlackHoleSharder("Virgo", segment_dir=segments, segment_size=4096, compact_interval=3600)
+    ids = [sharder.spacetime_sharding(b"y" * 1000 + bytes([i])) for i in range(10)]
+    for shard_id in ids[:2]:
+        sharder.evaporate_shard(shard_id)
+    first = sharder.log.segments()[0]
+    assert first in sharder.log.compaction_candidates(0.5)
+    sharder._compact_segment(first)
+    assert first not in sharder.log.segments()
+    assert [sharder.extract_from_singularity(s)["data"] for s in ids[2:]] == \
+           [b"y" * 1000 + bytes([i]) for i in range(2, 10)]
+    sharder.close()
+
+    restored = CosmicBlackHoleSharder("Virgo", segment_dir=segments, segment_size=4096, compact_interval=3600)
+    assert sorted(restored.sharded_storage) == sorted(ids[2:])
+    restored.close()
+
+
+def test_evaporated_slots_are_reused():
+    sharder = CosmicBlackHoleSharder("Virgo", memory_limit=5_000)
+    for round_no in range(50):
+        ids = [sharder.spacetime_sharding(f"{round_no}-{i}" * 50) for i in range(10)]
+        assert sharder.extract_from_singularity(ids[-1])["data"] == f"{round_no}-9" * 50
+        for shard_id in ids:
+            sharder.evaporate_shard(shard_id)
+    assert len(sharder) == 0 and len(sharder._payloads) <= 10
+    assert sharder.memory_report()["spilled_shards"] == 0
+    sharder.close()
+
+
+def test_spill_file_never_truncates_an_existing_file(tmp_path):
+    taken = tmp_path / "taken.spill"
+    taken.write_bytes(b"keep me")
+    sharder = CosmicBlackHoleSharder("Virgo", memory_limit=100, spill_path=str(taken))
+    with pytest.raises(FileExistsError):
+        sharder.spacetime_sharding("x" * 500)
+    assert taken.read_bytes() == b"keep me"
+
+    fresh = tmp_path / "fresh.spill"
+    sharder = CosmicBlackHoleSharder("Virgo", memory_limit=100, spill_path=str(fresh))
+    shard_id = sharder.spacetime_sharding("x" * 500)
+    assert fresh.exists() and sharder.extract_from_singularity(shard_id)["data"] == "x" * 500
+    sharder.close()
+    assert not fresh.exists()
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from cosmic_codec import unpack_struct
+from teleport_wire import (FLAG_STRUCT, MAX_KEY, TeleportClient, TeleportServer, WireError, _MemoryBackend,
+                           _decode_value, _encode_value, _pack_frame)
+
+
+async def _pair(pool_size=2):
+    server = await TeleportServer(_MemoryBackend(), workers=0).start()
+    client = await TeleportClient(port=server.port, pool_size=pool_size).connect()
+    return server, client
+
+
+@pytest.mark.parametrize("value", [{"ego": [1, 2.5, None, True]}, [0.1, 0.2], 7, None, "텍스트", b"\x00raw",
+                                   (1, (2, 3)), {1: "int key", (0, 1): {"a"}}, frozenset({b"x"})])
+def test_values_round_trip(value):
+    decoded = _decode_value(*_encode_value(value, compress_threshold=1))
+    assert decoded == value and type(decoded) is type(value)
+
+
+def test_struct_values_use_the_codec_format():
+    flags, body = _encode_value({"k": 1}, None)
+    assert flags == FLAG_STRUCT and unpack_struct(body) == {"k": 1}
+    with pytest.raises(ValueError):
+        _encode_value({"when": object()}, None)  # 표현할 수 없는 값을 텍스트로 바꿔 보내지 않음
+    with pytest.raises(WireError):
+        _decode_value(FLAG_STRUCT, b"\xe3\x00\x00\x00")  # marshal 바이트는 거부
+
+
+def test_oversized_keys_are_rejected_before_sending():
+    assert _pack_frame(1, 1, "k" * MAX_KEY, b"", None)
+    with pytest.raises(ValueError, match="exceeds"):
+        _pack_frame(1, 1, "k" * (MAX_KEY + 1), b"", None)
+
+    async def main():
+        server, client = await _pair()
+        with pytest.raises(ValueError):
+            await client.teleport_state("키" * MAX_KEY, "x")  # 글자 수가 아니라 UTF-8 바이트 수로 검사
+        with pytest.raises(ValueError):
+            await client.teleport_state("EGO", object())
+        assert all(not conn.waiters for conn in client.connections)
+        assert await client.teleport_state("EGO", {"ok": (1,)}) == "SUCCESS"  # 연결은 그대로 사용 가능
+        assert await client.get_state("EGO") == {"ok": (1,)}
+        await client.close()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_pipelined_requests_round_trip():
+    async def main():
+        server, client = await _pair()
+        results = await asyncio.gather(*[client.teleport_state(f"EGO_{i}", {"n": i}) for i in range(50)])
+        assert results == ["SUCCESS"] * 50
+        assert await client.get_state("EGO_7") == {"n": 7}
+        await client.close()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_requests_after_connection_loss_fail_instead_of_hanging():
+    async def main():
+        server, client = await _pair(pool_size=2)
+        assert await client.ping() == "PONG"
+        await server.close()  # 서버가 모든 연결을 닫음
+        await asyncio.gather(*[conn.reader_task for conn in client.connections])
+        for _ in range(3):
+            with pytest.raises(WireError):
+                await asyncio.wait_for(client.ping(), timeout=2)
+        await client.close()
+
+    asyncio.run(main())
+
+
+def test_surviving_connection_serves_requests():
+    async def main():
+        server, client = await _pair(pool_size=2)
+        dead = client.connections[0]
+        dead.writer.close()
+        await dead.reader_task
+        assert dead.lost is not None
+        for _ in range(4):
+            assert await asyncio.wait_for(client.ping(), timeout=2) == "PONG"
+        await client.close()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_unsendable_backend_results_come_back_as_errors():
+    class OddBackend(_MemoryBackend):
+        def get_state(self, memory_key):
+            return object()
+
+    async def main():
+        server = await TeleportServer(OddBackend()).start()
+        client = await TeleportClient(port=server.port, pool_size=1).connect()
+        with pytest.raises(WireError, match="ValueError"):
+            await asyncio.wait_for(client.get_state("EGO"), 5)
+        assert await client.ping() == "PONG"
+        await client.close()
+        await server.close()
+
+    asyncio.run(main())